@@ -1,54 +1,614 @@
-from crewai import Agent
+from crewai import Agent, Task, Crew
 from langchain_community.chat_models import ChatLiteLLM
-from typing import Optional
-from dotenv import load_dotenv
+from langchain_core.globals import get_llm_cache, set_llm_cache
+from langchain_core.load import dumps
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration
+from pydantic import ValidationError
+from typing import Optional, Dict, Any, List, Tuple, Awaitable, Iterable, Callable
 import os
+import copy
+import random
+import asyncio
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from functools import cached_property
+
+from ...core.config import settings
+from ...utils.json_parser import robust_json_parser, JsonObjectStream, JsonArrayItemStream
+from ...api.v1.schemas import ErrorSchema
+from .result_cache import result_cache
+from .semantic_cache import semantic_index
 
 # Configure logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Response format for answers that must be JSON but are too free-form for a schema:
+# the provider's plain JSON mode (Gemini response_mime_type="application/json")
+JSON_OBJECT_FORMAT: Dict[str, Any] = {"name": "json_object"}
+
+# Appended to the task description when the previous answer was unusable
+FORMAT_REMINDER_JSON = ("\n\nIMPORTANT: Your previous response was not valid JSON. "
+                        "Reply with ONLY a JSON value matching the expected output, with no other text.")
+FORMAT_REMINDER_STRUCTURE = ("\n\nIMPORTANT: Your previous response did not have the required structure. "
+                             "Reply with ONLY JSON containing every field of the expected output.")
+
+# Set while an agent call runs with use_cache=False, so streamed runs skip the LLM response cache too
+_skip_llm_cache_lookup: ContextVar[bool] = ContextVar("skip_llm_cache_lookup", default=False)
+
+# Caps concurrent LLM calls across all agents; created on first use, inside the running event loop
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """Get the process-wide semaphore bounding concurrent LLM calls (MAX_LLM_CONCURRENCY)."""
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(settings.MAX_LLM_CONCURRENCY)
+    return _llm_semaphore
+
+# Crew kickoffs block for the whole LLM round trip, so they get their own pool instead of
+# competing with everything else for asyncio's small default executor
+_kickoff_executor: Optional[ThreadPoolExecutor] = None
+
+def get_kickoff_executor() -> ThreadPoolExecutor:
+    """Get the process-wide thread pool that runs crew kickoffs (CREW_KICKOFF_WORKERS threads)."""
+    global _kickoff_executor
+    if _kickoff_executor is None:
+        _kickoff_executor = ThreadPoolExecutor(
+            max_workers=settings.CREW_KICKOFF_WORKERS,
+            thread_name_prefix="crew-kickoff"
+        )
+    return _kickoff_executor
+
+def shutdown_kickoff_executor() -> None:
+    """Release the kickoff thread pool without waiting for runs that are still in progress."""
+    global _kickoff_executor
+    if _kickoff_executor is not None:
+        _kickoff_executor.shutdown(wait=False, cancel_futures=True)
+        _kickoff_executor = None
+
+async def run_many(coros: Iterable[Awaitable[Any]], batch_size: Optional[int] = None,
+                   delay: Optional[float] = None) -> List[Any]:
+    """
+    Await independent LLM-bound coroutines concurrently, a batch at a time.
+    
+    Each batch runs with asyncio.gather; waiting `delay` seconds between batches keeps
+    bursts within the provider's requests-per-minute limit.
+    
+    Args:
+        coros (Iterable[Awaitable]): Coroutines to run
+        batch_size (int, optional): Coroutines per batch, defaults to MAX_LLM_CONCURRENCY
+        delay (float, optional): Pause between batches in seconds, defaults to LLM_BATCH_DELAY_SECONDS
+        
+    Returns:
+        List[Any]: Results in the same order as the input coroutines
+    """
+    coros = list(coros)
+    batch_size = batch_size or settings.MAX_LLM_CONCURRENCY
+    delay = settings.LLM_BATCH_DELAY_SECONDS if delay is None else delay
+    
+    results: List[Any] = []
+    for start in range(0, len(coros), batch_size):
+        if start and delay:
+            await asyncio.sleep(delay)
+        results.extend(await asyncio.gather(*coros[start:start + batch_size]))
+    return results
+
+try:
+    from litellm.exceptions import (
+        APIConnectionError, InternalServerError, RateLimitError, ServiceUnavailableError, Timeout
+    )
+    _TRANSIENT_LLM_ERRORS: Tuple[type, ...] = (
+        asyncio.TimeoutError, ConnectionError,
+        APIConnectionError, InternalServerError, RateLimitError, ServiceUnavailableError, Timeout
+    )
+except ImportError:
+    _TRANSIENT_LLM_ERRORS = (asyncio.TimeoutError, ConnectionError)
+
+async def call_with_retries(attempt: Callable[[], Awaitable[Any]], description: str = "LLM call",
+                            bounded: bool = True) -> Any:
+    """
+    Run an LLM-bound coroutine with a timeout, retrying transient failures with backoff.
+    
+    Each attempt is bounded by LLM_TIMEOUT_SECONDS. Timeouts, connection errors and the
+    provider's rate-limit/overload errors are retried up to LLM_MAX_ATTEMPTS times in total,
+    waiting an exponentially growing, jittered delay (1s, 2s, 4s... capped at 10s) between
+    attempts. Any other exception is raised immediately.
+    
+    Args:
+        attempt (Callable): Creates a fresh coroutine for each attempt
+        description (str, optional): What is being called, for log messages
+        bounded (bool, optional): Set to False when the attempt enforces its own timeouts,
+            e.g. between the chunks of a stream
+        
+    Returns:
+        Any: The result of the first successful attempt
+    """
+    for number in range(1, settings.LLM_MAX_ATTEMPTS + 1):
+        try:
+            if not bounded:
+                return await attempt()
+            return await asyncio.wait_for(attempt(), timeout=settings.LLM_TIMEOUT_SECONDS)
+        except _TRANSIENT_LLM_ERRORS as e:
+            if number >= settings.LLM_MAX_ATTEMPTS:
+                raise
+            delay = min(10.0, 2 ** (number - 1)) * random.uniform(0.5, 1.0)
+            logger.warning("%s failed on attempt %d (%s: %s); retrying in %.1fs", description, number, type(e).__name__, e, delay)
+            await asyncio.sleep(delay)
+
+def validation_error_paths(error: ValidationError) -> str:
+    """Summarize a validation error as 'path: message' pairs for the logs."""
+    return "; ".join(".".join(str(part) for part in item["loc"]) + ": " + item["msg"] for item in error.errors())
+
+def mark_cached_prefix(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    Mark the leading system message for explicit prompt caching when LLM_PROMPT_CACHE_CONTROL is on.
+    
+    Callers keep everything that is the same on every call in that system message, so it is
+    a byte-identical prefix the provider can cache (implicitly, or explicitly once marked).
+    """
+    if not settings.LLM_PROMPT_CACHE_CONTROL or not messages or not isinstance(messages[0], SystemMessage):
+        return messages
+    system = messages[0]
+    if isinstance(system.content, str):
+        system = SystemMessage(content=[{"type": "text", "text": system.content, "cache_control": {"type": "ephemeral"}}])
+    return [system, *messages[1:]]
+
+def _configure_llm_cache() -> None:
+    """
+    Install a process-wide LangChain LLM cache so identical prompts skip the provider round-trip.
+    
+    The backend is selected with LLM_CACHE_BACKEND ("sqlite", "redis" or "none").
+    SQLite is the default and needs no extra services; Redis (REDIS_URL) is meant for
+    production deployments where several workers should share the same cache.
+    """
+    if get_llm_cache() is not None:
+        return
+        
+    backend = settings.LLM_CACHE_BACKEND
+    if backend == "none":
+        return
+        
+    try:
+        if backend == "redis":
+            import redis
+            from langchain_community.cache import RedisCache
+            
+            set_llm_cache(RedisCache(redis_=redis.Redis.from_url(settings.REDIS_URL or "redis://localhost:6379/0")))
+        else:
+            from langchain_community.cache import SQLiteCache
+            
+            cache_path = settings.LLM_CACHE_PATH
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+            set_llm_cache(SQLiteCache(database_path=cache_path))
+        logger.info("LLM response cache enabled with backend: %s", backend)
+    except Exception as e:
+        logger.error("Error configuring LLM cache (%s): %s", backend, e)
+        logger.error("Continuing without LLM response caching.")
+
 class AgentBase:
     """Base class for all agents with common initialization and LLM setup."""
     
+    # LLM clients are shared by every agent instance: one per model tier and response
+    # schema name, with None for the plain free-text client
+    _llms: Dict[Tuple[str, Optional[str]], Optional[ChatLiteLLM]] = {}
+    # Futures of cacheable agent calls currently running, by cache key
+    _inflight: Dict[str, asyncio.Future] = {}
+    
     def __init__(self):
         self._load_environment()
-        self.llm = self._initialize_llm()
+        self.llm = self._get_llm()
     
     def _load_environment(self) -> None:
-        """Load environment variables."""
-        # Get the project root directory (backend_2)
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
-        env_path = os.path.join(project_root, '.env')
-        
-        # Load environment variables from .env file
-        load_dotenv(env_path)
-        
-        # Try both GEMINI_API_KEY and GOOGLE_API_KEY
-        self.api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
+        """Resolve the LLM API key from the application settings."""
+        # GEMINI_API_KEY or GOOGLE_API_KEY, resolved once when settings were loaded
+        self.api_key = settings.get_llm_api_key()
         if not self.api_key:
             logger.warning("Neither GEMINI_API_KEY nor GOOGLE_API_KEY found in environment variables.")
     
-    def _initialize_llm(self) -> Optional[ChatLiteLLM]:
-        """Initialize the LLM with error handling."""
+    def _initialize_llm(self, response_schema: Optional[Dict[str, Any]] = None,
+                        tier: str = "strong") -> Optional[ChatLiteLLM]:
+        """
+        Initialize the LLM with error handling.
+        
+        Args:
+            response_schema (Dict, optional): A ``{"name": ..., "schema": ...}`` JSON schema definition.
+                When given, the provider is asked for JSON-only output matching the schema
+                (Gemini ``response_mime_type``/``response_schema`` via LiteLLM's ``response_format``).
+                JSON_OBJECT_FORMAT asks for JSON output without constraining its shape.
+            tier (str, optional): "strong" for LLM_MODEL or "fast" for the cheaper LLM_FAST_MODEL
+        """
         if not self.api_key:
             logger.error("No API key available. LLM initialization skipped.")
             return None
             
+        _configure_llm_cache()
+        
+        model_kwargs = {}
+        if response_schema is JSON_OBJECT_FORMAT:
+            model_kwargs["response_format"] = {"type": "json_object"}
+        elif response_schema is not None:
+            model_kwargs["response_format"] = {
+                "type": "json_schema",
+                "json_schema": response_schema
+            }
+            
+        model = settings.LLM_FAST_MODEL if tier == "fast" else settings.LLM_MODEL
         try:
             llm = ChatLiteLLM(
-                model="gemini/gemini-2.0-flash",
-                max_tokens=8000  # Increase output token limit
+                model=model,
+                max_tokens=8000,  # Increase output token limit
+                model_kwargs=model_kwargs
             )
-            logger.info("LLM initialized successfully with model: gemini/gemini-2.0-flash and max_tokens=8000")
+            logger.info("LLM initialized successfully with model: %s and max_tokens=8000", model)
             return llm
         except Exception as e:
-            logger.error(f"Error initializing LLM: {e}")
+            logger.error("Error initializing LLM: %s", e)
             logger.error("Please ensure required packages are installed and API key is valid.")
             return None
     
-    def create_agent(self, role: str, goal: str, backstory: str) -> Agent:
+    def _get_llm(self, response_schema: Optional[Dict[str, Any]] = None,
+                 tier: str = "strong") -> Optional[ChatLiteLLM]:
+        """Get the shared LLM client for the given tier and response schema, initializing it on first use."""
+        key = (tier, response_schema["name"] if response_schema else None)
+        if key not in AgentBase._llms:
+            AgentBase._llms[key] = self._initialize_llm(response_schema, tier)
+        return AgentBase._llms[key]
+    
+    def get_structured_llm(self, response_schema: Dict[str, Any]) -> Optional[ChatLiteLLM]:
+        """
+        Get an LLM constrained to JSON output for the given schema, creating it on first use.
+        
+        Args:
+            response_schema (Dict): A ``{"name": ..., "schema": ...}`` JSON schema definition
+            
+        Returns:
+            Optional[ChatLiteLLM]: The structured-output LLM, or None if no LLM is available
+        """
+        return self._get_llm(response_schema)
+    
+    def get_json_llm(self) -> Optional[ChatLiteLLM]:
+        """Get an LLM in the provider's JSON mode, for answers with no fixed schema."""
+        return self._get_llm(JSON_OBJECT_FORMAT)
+    
+    def reset_agents(self, reload_llm: bool = False) -> None:
+        """
+        Drop the agents cached on this instance so they are rebuilt on next use.
+        
+        Args:
+            reload_llm (bool, optional): Also discard the shared LLM clients and re-resolve the
+                API key, for when the model or credentials have changed
+        """
+        if reload_llm:
+            AgentBase._llms.clear()
+            self._load_environment()
+            self.llm = self._get_llm()
+        for cls in type(self).__mro__:
+            for name, attr in vars(cls).items():
+                if isinstance(attr, cached_property):
+                    self.__dict__.pop(name, None)
+    
+    async def _kickoff(self, crew: Crew) -> Any:
+        """
+        Run a crew without blocking the event loop.
+        
+        crew.kickoff() is synchronous, so it runs on the dedicated kickoff thread pool; the
+        shared LLM semaphore keeps the number of in-flight calls within the provider's quota.
+        Runs are bounded and retried by call_with_retries. A timed-out thread cannot be
+        killed, so it keeps its semaphore slot until it actually finishes; otherwise the
+        retries would run alongside it and exceed MAX_LLM_CONCURRENCY.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = get_llm_semaphore()
+        
+        def release(_: Any) -> None:
+            # Runs on the kickoff thread when the run finishes, however long after its timeout
+            try:
+                loop.call_soon_threadsafe(semaphore.release)
+            except RuntimeError:
+                pass # The event loop has closed
+                
+        async def attempt() -> Any:
+            await semaphore.acquire()
+            try:
+                future = get_kickoff_executor().submit(crew.kickoff)
+            except BaseException:
+                semaphore.release()
+                raise
+            future.add_done_callback(release)
+            return await asyncio.wrap_future(future)
+        return await call_with_retries(attempt, "Crew kickoff")
+    
+    @staticmethod
+    def _agent_messages(agent: Agent, description: str, expected_output: str) -> List[BaseMessage]:
+        """
+        Render an agent and its task as chat messages, in the same wording CrewAI prompts them.
+        
+        Everything that is the same on every call (persona, goal, expected output and its
+        example) goes in the system message, ahead of the per-call task description, so
+        repeated runs share a prompt prefix the provider can cache. With
+        LLM_PROMPT_CACHE_CONTROL the prefix is also marked for explicit caching.
+        """
+        system_prompt = (f"You are {agent.role}. {agent.backstory}\nYour personal goal is: {agent.goal}\n\n"
+                         f"This is the expected criteria for your final answer: {expected_output}\n"
+                         f"you MUST return the actual complete content as the final answer, not a summary.")
+        return mark_cached_prefix([
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=f"Current Task: {description}")
+        ])
+
+    async def _stream_json_object(self, messages: List[BaseMessage], llm: ChatLiteLLM,
+                                  item_key: Optional[str] = None,
+                                  on_item: Optional[Callable[[Any], None]] = None) -> str:
+        """
+        Stream a completion and return as soon as the first complete JSON object or array has arrived.
+        
+        Closing the stream early stops generation, so trailing commentary after the JSON
+        is never paid for. LLM_TIMEOUT_SECONDS bounds the wait for the first chunk and between
+        chunks rather than the whole completion, so a long answer that keeps streaming is not
+        cut off, while a stalled stream is abandoned and retried. Streaming does not go through the global LLM cache, so the cache
+        is consulted and filled here under the same key the model itself would use. Inside an
+        agent call made with use_cache=False the lookup is skipped, but the fresh answer is stored.
+        
+        Args:
+            messages (List[BaseMessage]): Chat messages to send
+            llm (ChatLiteLLM): The client to stream from
+            item_key (str, optional): Key of a top-level array of objects in the answer
+            on_item (Callable, optional): Called with each parsed item of that array as soon as
+                it has streamed in. Items are reported again if the call is retried, and not
+                at all when the answer comes from the cache
+            
+        Returns:
+            str: The JSON text, or the whole completion if no complete object or array was seen
+        """
+        cache = get_llm_cache()
+        prompt_key = dumps(messages)
+        llm_string = llm._get_llm_string()
+        
+        if cache is not None and not _skip_llm_cache_lookup.get():
+            cached = await cache.alookup(prompt_key, llm_string)
+            if cached:
+                return cached[0].text
+        
+        async def attempt() -> Tuple[Optional[str], str]:
+            scanner = JsonObjectStream()
+            items = JsonArrayItemStream(item_key) if on_item is not None else None
+            chunks = []
+            async with get_llm_semaphore():
+                stream = llm.astream(messages)
+                try:
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(anext(stream), timeout=settings.LLM_TIMEOUT_SECONDS)
+                        except StopAsyncIteration:
+                            break
+                        chunks.append(chunk.content)
+                        if items is not None:
+                            for item in items.feed(chunk.content):
+                                on_item(item)
+                        if scanner.feed(chunk.content) is not None:
+                            break # The object is complete; don't wait for the tail of the completion
+                finally:
+                    await stream.aclose()
+            return scanner.result, "".join(chunks)
+            
+        result, completion = await call_with_retries(attempt, "LLM stream", bounded=False)
+        if result is None:
+            return completion
+            
+        if cache is not None:
+            await cache.aupdate(prompt_key, llm_string, [ChatGeneration(message=AIMessage(content=result))])
+        return result
+
+    async def _run_agent_task(self, agent: Agent, description: str, expected_output: str,
+                              context: str, agent_type: str,
+                              validate: Optional[Callable[[Any, str], dict]] = None,
+                              response_schema: Optional[Dict[str, Any]] = None,
+                              tier: str = "strong", max_attempts: Optional[int] = None,
+                              item_key: Optional[str] = None,
+                              on_item: Optional[Callable[[Any], None]] = None) -> dict:
+        """
+        Run an agent on a single task and parse its JSON answer.
+        
+        With AGENT_STREAMING the agent's prompt is streamed straight from the LLM and cut off
+        once the JSON object closes; otherwise the task runs through a one-agent Crew.
+        An answer that does not parse or fails validation is asked for again, with a reminder
+        about the format appended to the description, up to AGENT_FORMAT_ATTEMPTS times.
+        
+        Args:
+            agent (Agent): The agent to run the task (a per-run copy, not a shared instance)
+            description (str): The task description
+            expected_output (str): The expected output description and example
+            context (str): Human-readable name of the operation, used in logs and errors
+            agent_type (str): Agent identifier reported in error responses
+            validate (Callable, optional): Checks the parsed JSON against the raw output and
+                returns either the result or an ErrorSchema dict
+            response_schema (Dict, optional): JSON schema the answer is constrained to through
+                the provider's structured output mode
+            tier (str, optional): Model tier to run on, "strong" (default) or "fast"
+            max_attempts (int, optional): Overrides AGENT_FORMAT_ATTEMPTS
+            item_key (str, optional): Key of a top-level array of objects in the answer
+            on_item (Callable, optional): Called with each item of that array as it streams in;
+                see _stream_json_object. Only used with AGENT_STREAMING
+            
+        Returns:
+            dict: The (validated) parsed result, or an ErrorSchema dict on failure
+        """
+        max_attempts = max_attempts or settings.AGENT_FORMAT_ATTEMPTS
+        llm = self._get_llm(response_schema, tier)
+        if llm is not agent.llm:
+            agent = agent.model_copy(update={"llm": llm})
+            
+        async def run(prompt: str) -> str:
+            if settings.AGENT_STREAMING:
+                return await self._stream_json_object(
+                    self._agent_messages(agent, prompt, expected_output), llm, item_key, on_item
+                )
+            task = Task(
+                description=prompt,
+                agent=agent,
+                expected_output=expected_output
+            )
+            crew = Crew(
+                agents=[agent],
+                tasks=[task],
+                verbose=0
+            )
+            return str(await self._kickoff(crew))
+            
+        try:
+            prompt = description
+            for attempt in range(1, max_attempts + 1):
+                raw_output = await run(prompt)
+                parsed_json = robust_json_parser(raw_output, context=context)
+                if parsed_json:
+                    result = validate(parsed_json, raw_output) if validate else parsed_json
+                    if not result.get("error"):
+                        if attempt > 1:
+                            logger.info("%s produced a valid answer on attempt %d", context, attempt)
+                        return result
+                    reminder = FORMAT_REMINDER_STRUCTURE
+                else:
+                    logger.error("Failed to parse JSON from %s. Raw output: %.500s", context.lower(), raw_output)
+                    result = ErrorSchema(
+                        error="JSON Parsing Error",
+                        message=f"Failed to parse JSON output from {agent.role} Agent.",
+                        agent_type=agent_type,
+                        raw_output=raw_output
+                    ).model_dump(exclude_none=True)
+                    reminder = FORMAT_REMINDER_JSON
+                    
+                if attempt < max_attempts:
+                    logger.warning("%s answer was unusable on attempt %d; asking again with a format reminder", context, attempt)
+                    prompt = description + reminder
+            return result
+                
+        except Exception as e:
+            # The traceback only at DEBUG: during a provider outage every call fails the same way
+            logger.error("Error during %s: %s: %s", context.lower(), type(e).__name__, e)
+            logger.debug("%s traceback", context, exc_info=True)
+            return ErrorSchema(
+                error="Agent Execution Error",
+                message=f"An unexpected error occurred during {context.lower()}: {str(e)}",
+                agent_type=agent_type
+            ).model_dump(exclude_none=True)
+    
+    async def _run_agent_task_routed(self, simple: bool, **kwargs: Any) -> dict:
+        """
+        Run _run_agent_task on the fast tier first when the request is simple.
+        
+        The fast tier's answer is kept only if it parses and passes validation; otherwise
+        the task is escalated to the strong tier. Requests that are not simple, or all
+        requests when LLM_TIER_ROUTING is off, go straight to the strong tier.
+        
+        Args:
+            simple (bool): Whether the caller judges the request easy enough for the fast tier
+            **kwargs: Arguments for _run_agent_task
+            
+        Returns:
+            dict: The (validated) parsed result, or an ErrorSchema dict on failure
+        """
+        if simple and settings.LLM_TIER_ROUTING and self._get_llm(tier="fast") is not None:
+            # A single attempt: escalating is the better retry for a confused fast model
+            result = await self._run_agent_task(**kwargs, tier="fast", max_attempts=1)
+            if not result.get("error"):
+                return result
+            logger.info("Fast tier failed for %s; escalating to the strong tier", kwargs.get('context', 'agent task'))
+        return await self._run_agent_task(**kwargs)
+    
+    async def _cached_result(self, operation: str, inputs: Dict[str, Any],
+                             compute: Callable[[], Awaitable[dict]], use_cache: bool = True,
+                             similarity_text: Optional[str] = None) -> dict:
+        """
+        Return the cached result for identical inputs, or compute and cache it.
+        
+        Error results are never cached, so a failed run is retried on the next call. Concurrent
+        calls with identical inputs share one computation.
+        
+        Args:
+            operation (str): Name of the agent operation, part of the cache key
+            inputs (Dict[str, Any]): Everything the result depends on, part of the cache key
+            compute (Callable): Produces the result on a cache miss
+            use_cache (bool, optional): Set to False to bypass the cache entirely, along with
+                the LLM response cache for the calls compute streams
+            similarity_text (str, optional): Short text that determines the result. With AGENT_SEMANTIC_CACHE
+                on, a miss falls back to the result of the most similar earlier text of this operation;
+                texts too long to embed whole only get exact hits
+            
+        Returns:
+            dict: The agent result
+        """
+        if not use_cache:
+            token = _skip_llm_cache_lookup.set(True)
+            try:
+                return await compute()
+            finally:
+                _skip_llm_cache_lookup.reset(token)
+            
+        key = result_cache.make_key(operation, inputs)
+        cached = result_cache.get(key)
+        if cached is not None:
+            logger.info("Reusing cached result for %s", operation)
+            return cached
+            
+        vector = None
+        if (similarity_text and settings.AGENT_SEMANTIC_CACHE and semantic_index.available
+                and semantic_index.accepts(similarity_text)):
+            vector = await asyncio.to_thread(semantic_index.embed, similarity_text)
+            similar_key = semantic_index.nearest(operation, vector)
+            cached = result_cache.get(similar_key) if similar_key else None
+            if cached is not None:
+                return cached
+            
+        # Single flight: an identical call already running is awaited rather than repeated
+        inflight = AgentBase._inflight.get(key)
+        if inflight is not None:
+            logger.info("Joining in-flight %s call with identical inputs", operation)
+            return copy.deepcopy(await asyncio.shield(inflight))
+            
+        future = asyncio.get_running_loop().create_future()
+        AgentBase._inflight[key] = future
+        try:
+            result = await compute()
+            future.set_result(result)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved; it only matters if someone joined
+            raise
+        finally:
+            del AgentBase._inflight[key]
+            
+        # Some agents report success with an explicit "error": None
+        if isinstance(result, dict) and not result.get("error"):
+            result_cache.set(key, result)
+            if vector is not None:
+                semantic_index.add(operation, vector, key)
+        return result
+    
+    def _split_batch_output(self, parsed_json: Any, count: int) -> Optional[List[Optional[dict]]]:
+        """
+        Map a batched JSON array back to its inputs by the '#n' ids given in the prompt.
+        
+        Returns:
+            Optional[List[Optional[dict]]]: One entry per input (None where the LLM skipped it),
+            or None if the output is not an array at all
+        """
+        if not isinstance(parsed_json, list):
+            return None
+        entries: List[Optional[dict]] = [None] * count
+        for entry in parsed_json:
+            if not isinstance(entry, dict):
+                continue
+            entry = dict(entry)
+            item_id = str(entry.pop("id", "")).lstrip("#")
+            if item_id.isdigit() and 1 <= int(item_id) <= count:
+                entries[int(item_id) - 1] = entry
+        return entries
+    
+    def create_agent(self, role: str, goal: str, backstory: str,
+                     response_schema: Optional[Dict[str, Any]] = None) -> Agent:
         """
         Create a CrewAI agent with common configuration.
         
@@ -56,6 +616,8 @@ class AgentBase:
             role (str): The role of the agent (e.g., "Product Manager", "Tech Lead")
             goal (str): The specific goal or objective of the agent
             backstory (str): The agent's background and expertise
+            response_schema (Dict, optional): JSON schema the agent's answers must follow;
+                enables the provider's native JSON mode instead of free-text output
             
         Returns:
             Agent: Configured CrewAI agent instance
@@ -70,7 +632,7 @@ class AgentBase:
             backstory=backstory,
             verbose=True,
             allow_delegation=False,
-            llm=self.llm
+            llm=self.get_structured_llm(response_schema) if response_schema else self.llm
         )
     
     def has_valid_llm(self) -> bool:
@@ -1,16 +1,213 @@
 from typing import Optional, Dict, Any, List, Union # Added Union
+from functools import cached_property
 from crewai import Agent, Task, Crew
-import json
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
+import asyncio
 import logging
-from ..agent_base import AgentBase
-from ....utils.json_parser import robust_json_parser # Import the new parser
+from ..agent_base import AgentBase, run_many, JSON_OBJECT_FORMAT, validation_error_paths
+from ....utils.json_parser import robust_json_parser, dumps_compact # Import the new parser
 from ....api.v1.schemas import ErrorSchema # Import ErrorSchema for typing and structure
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_TEAM_VELOCITY = {
+    "sprint_length_weeks": 2,
+    "avg_velocity_points": 30,
+    "team_size": 5,
+    "avg_hours_per_point": 4
+}
+
+DEFAULT_SCALE_REQUIREMENTS = {
+    "expected_users": 1000,
+    "peak_concurrent": 100,
+    "data_storage_gb": 50,
+    "availability_target": 0.99
+}
+
+# Only these task fields inform a timeline or an infrastructure plan; free-text descriptions
+# are dropped from prompts, which keeps input tokens roughly flat per task
+TIMELINE_TASK_FIELDS = ("id", "title", "type", "estimated_hours", "dependencies")
+INFRASTRUCTURE_TASK_FIELDS = ("id", "title", "type")
+
+def project_tasks(tasks: List[Any], fields: tuple = TIMELINE_TASK_FIELDS) -> List[Any]:
+    """Keep only the given fields of each task dict; anything that is not a dict is passed through."""
+    return [
+        {key: task[key] for key in fields if key in task} if isinstance(task, dict) else task
+        for task in tasks
+    ]
+
+def slim_requirements(technical_requirements: Dict) -> Dict:
+    """Project the task list inside a task breakdown, leaving the other requirements intact."""
+    if not isinstance(technical_requirements, dict) or not isinstance(technical_requirements.get("tasks"), list):
+        return technical_requirements
+    return {
+        **technical_requirements,
+        "tasks": project_tasks(technical_requirements["tasks"], INFRASTRUCTURE_TASK_FIELDS)
+    }
+
+class _TimelineOutput(BaseModel):
+    """Minimum shape of a timeline estimate; anything beyond it is passed through untouched."""
+    model_config = ConfigDict(extra="allow")
+    
+    timeline: Dict[str, Any]
+
+class _InfrastructureSection(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    compute: Any
+    storage: Any
+
+class _InfrastructureOutput(BaseModel):
+    """Minimum shape of an infrastructure plan; section contents vary too much to type them."""
+    model_config = ConfigDict(extra="allow")
+    
+    infrastructure: _InfrastructureSection
+    ci_cd: Any
+    monitoring: Any
+    security_measures: Any
+
+# Validators are compiled once at import and run in pydantic-core
+_TIMELINE_ADAPTER = TypeAdapter(_TimelineOutput)
+_INFRASTRUCTURE_ADAPTER = TypeAdapter(_InfrastructureOutput)
+
+# Prompt text is built once at import. Only the variable parts are filled in per call, so the
+# constant instructions and examples are the same bytes on every request (and prompt-cacheable).
+TIMELINE_DESCRIPTION = ("Estimate timeline for these tasks considering team velocity:\n"
+                        "Tasks: {tasks}\n"
+                        "Team Velocity: {team_velocity}\n"
+                        "Context: {context}\n"
+                        "Create a JSON object with timeline estimates and recommendations.")
+TIMELINE_EXPECTED_OUTPUT = ("A JSON object with the timeline (total weeks, total story points and the "
+                            "tasks and story points of each sprint), the delivery risks and your recommendations.")
+# Structured output schema for single estimates; the provider enforces it, so the prompt
+# no longer needs a full example of the answer
+TIMELINE_SCHEMA = {
+    "name": "timeline_estimate",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "timeline": {
+                "type": "object",
+                "properties": {
+                    "total_weeks": {"type": "number"},
+                    "total_story_points": {"type": "number"},
+                    "sprints": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "sprint": {"type": "integer"},
+                                "tasks": {"type": "array", "items": {"type": "string"}},
+                                "story_points": {"type": "integer"}
+                            },
+                            "required": ["sprint", "tasks", "story_points"]
+                        }
+                    }
+                },
+                "required": ["total_weeks", "total_story_points", "sprints"]
+            },
+            "risks": {"type": "array", "items": {"type": "string"}},
+            "recommendations": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["timeline", "risks", "recommendations"]
+    }
+}
+
+INFRASTRUCTURE_DESCRIPTION = ("Design infrastructure and CI/CD pipeline for this feature:\n"
+                              "Feature: {feature}\n"
+                              "Technical Requirements: {technical_requirements}\n"
+                              "Scale Requirements: {scale_requirements}\n"
+                              "Context: {context}\n"
+                              "Create a JSON object with infrastructure and pipeline design.")
+INFRASTRUCTURE_EXPECTED_OUTPUT = ('A JSON object containing infrastructure plan. Example:\n'
+                                  '{\n'
+                                  '  "infrastructure": {\n'
+                                  '    "compute": {\n'
+                                  '      "type": "kubernetes",\n'
+                                  '      "sizing": {\n'
+                                  '        "initial_nodes": 2,\n'
+                                  '        "autoscaling": {"min": 2, "max": 5}\n'
+                                  '      }\n'
+                                  '    },\n'
+                                  '    "storage": {\n'
+                                  '      "type": "managed_sql",\n'
+                                  '      "backup_strategy": "daily"\n'
+                                  '    }\n'
+                                  '  },\n'
+                                  '  "ci_cd": {\n'
+                                  '    "pipeline_stages": ["build", "test", "deploy"],\n'
+                                  '    "deployment_strategy": "blue-green"\n'
+                                  '  },\n'
+                                  '  "monitoring": ["cpu_usage", "error_rates"],\n'
+                                  '  "security_measures": ["waf", "ssl_termination"]\n'
+                                  '}')
+
+TIMELINE_BATCH_ITEM = "#{number}: {tasks}"
+TIMELINE_BATCH_DESCRIPTION = ("Estimate a separate timeline for each of these {count} task groups "
+                              "considering team velocity:\n"
+                              "{listing}\n"
+                              "Team Velocity: {team_velocity}\n"
+                              "Context: {context}\n"
+                              "Create a JSON array with one object per task group, tagged with its id.")
+TIMELINE_BATCH_EXPECTED_OUTPUT = ('A JSON array with one timeline estimate per task group. Example:\n'
+                                  '[\n'
+                                  '  {\n'
+                                  '    "id": "#1",\n'
+                                  '    "timeline": {\n'
+                                  '      "total_weeks": 6,\n'
+                                  '      "total_story_points": 90,\n'
+                                  '      "sprints": [{"sprint": 1, "tasks": ["BE-1", "BE-2"], "story_points": 30}]\n'
+                                  '    },\n'
+                                  '    "risks": ["Dependencies might delay delivery"],\n'
+                                  '    "recommendations": ["Consider parallel development"]\n'
+                                  '  }\n'
+                                  ']')
+
+# Batched variant: one entry per task group, matched back to it by 'id'
+TIMELINE_BATCH_SCHEMA = {
+    "name": "timeline_estimate_batch",
+    "schema": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"id": {"type": "string"}, **TIMELINE_SCHEMA["schema"]["properties"]},
+            "required": ["id", *TIMELINE_SCHEMA["schema"]["required"]]
+        }
+    }
+}
+
+INFRASTRUCTURE_BATCH_ITEM = ("#{number}:\n"
+                             "Feature: {feature}\n"
+                             "Technical Requirements: {technical_requirements}\n"
+                             "Scale Requirements: {scale_requirements}\n"
+                             "Context: {context}")
+INFRASTRUCTURE_BATCH_DESCRIPTION = ("Design infrastructure and CI/CD pipeline separately for each of these "
+                                    "{count} features:\n"
+                                    "{listing}\n"
+                                    "Create a JSON array with one infrastructure and pipeline design per feature, "
+                                    "tagged with its id.")
+INFRASTRUCTURE_BATCH_EXPECTED_OUTPUT = ('A JSON array with one infrastructure plan per feature. Example:\n'
+                                        '[\n'
+                                        '  {\n'
+                                        '    "id": "#1",\n'
+                                        '    "infrastructure": {\n'
+                                        '      "compute": {"type": "kubernetes", "sizing": {"initial_nodes": 2, "autoscaling": {"min": 2, "max": 5}}},\n'
+                                        '      "storage": {"type": "managed_sql", "backup_strategy": "daily"}\n'
+                                        '    },\n'
+                                        '    "ci_cd": {"pipeline_stages": ["build", "test", "deploy"], "deployment_strategy": "blue-green"},\n'
+                                        '    "monitoring": ["cpu_usage", "error_rates"],\n'
+                                        '    "security_measures": ["waf", "ssl_termination"]\n'
+                                        '  }\n'
+                                        ']')
+
 class OperationsAgents(AgentBase):
     """Operations agents for project planning and DevOps tasks."""
 
+    # Items per batched prompt; beyond this, answer quality drops faster than the shared prompt saves
+    MAX_BATCH_SIZE = 8
+    # Largest task list estimate_timeline tries on the fast model tier before the strong one
+    SIMPLE_TIMELINE_MAX_TASKS = 5
+
     def make_project_manager(self) -> Agent:
         """
         Create a project manager agent focused on time estimation and planning.
@@ -45,8 +242,58 @@ class OperationsAgents(AgentBase):
                      "monitoring, and maintainability in your solutions."
         )
 
+    def _validate_timeline(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check a parsed timeline estimate, returning it or an ErrorSchema dict."""
+        try:
+            _TIMELINE_ADAPTER.validate_python(parsed_json)
+            return parsed_json
+        except ValidationError as e:
+            logger.warning("Parsed JSON for timeline estimation failed validation: %s. Output: %.500s", validation_error_paths(e), raw_output)
+            return ErrorSchema(
+                error="Invalid JSON Structure",
+                message="Parsed JSON for timeline estimation is missing 'timeline' dict or has incorrect type.",
+                agent_type="project_manager",
+                raw_output=raw_output
+            ).model_dump(exclude_none=True)
+
+    def _validate_infrastructure(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check a parsed infrastructure plan, returning it or an ErrorSchema dict."""
+        # The Pydantic model `InfrastructureConfig` will do the finer-grained validation later.
+        if isinstance(parsed_json, dict) and "error" in parsed_json: # Check for LLM-generated error field
+            logger.warning("Parsed JSON for infrastructure plan contains an error field. Output: %.500s", raw_output)
+            return ErrorSchema(
+                error="Invalid JSON Structure or LLM Error",
+                message="Parsed JSON for infrastructure plan contains an error indicator from the LLM.",
+                agent_type="devops_specialist",
+                raw_output=raw_output
+            ).model_dump(exclude_none=True)
+        try:
+            _INFRASTRUCTURE_ADAPTER.validate_python(parsed_json)
+            return parsed_json # This is the successful data
+        except ValidationError as e:
+            logger.warning("Parsed JSON for infrastructure plan failed validation: %s. Output: %.500s", validation_error_paths(e), raw_output)
+            return ErrorSchema(
+                error="Invalid JSON Structure",
+                message="Parsed JSON for infrastructure plan is missing some expected keys (e.g., infrastructure.compute, ci_cd).",
+                agent_type="devops_specialist",
+                raw_output=raw_output
+            ).model_dump(exclude_none=True)
+
+    # The agents are pure configuration, so each is validated and built once per instance.
+    # Runs use a shallow model_copy: cheap, and it keeps per-run executor state out of the
+    # cached agent when several crews execute concurrently.
+    @cached_property
+    def project_manager(self) -> Agent:
+        """Cached project manager agent; copy it before handing it to a crew."""
+        return self.make_project_manager()
+
+    @cached_property
+    def devops_specialist(self) -> Agent:
+        """Cached DevOps specialist agent; copy it before handing it to a crew."""
+        return self.make_devops_specialist()
+
     async def estimate_timeline(self, tasks: List[Dict], team_velocity: Dict = None,
-                            context: str = "") -> dict:
+                            context: str = "", use_cache: bool = True) -> dict:
         """
         Estimate project timeline based on tasks using the project manager agent.
         
@@ -54,6 +301,7 @@ class OperationsAgents(AgentBase):
             tasks (List[Dict]): Technical tasks to estimate
             team_velocity (Dict, optional): Information about team's velocity and capacity
             context (str, optional): Additional context about the project
+            use_cache (bool, optional): Reuse the result of an identical earlier estimate
             
         Returns:
             dict: Timeline estimates and scheduling recommendations
@@ -66,83 +314,40 @@ class OperationsAgents(AgentBase):
                 agent_type="project_manager"
             ).model_dump(exclude_none=True)
 
-        pm = self.make_project_manager()
+        pm = self.project_manager.model_copy()
         
+        # Default velocity and a short task list: the fast tier usually gets this right
+        simple = team_velocity is None and len(tasks) <= self.SIMPLE_TIMELINE_MAX_TASKS
         if team_velocity is None:
-            team_velocity = {
-                "sprint_length_weeks": 2,
-                "avg_velocity_points": 30,
-                "team_size": 5,
-                "avg_hours_per_point": 4
-            }
+            team_velocity = DEFAULT_TEAM_VELOCITY
         
-        estimation_task = Task(
-            description=f"Estimate timeline for these tasks considering team velocity:\n"
-                      f"Tasks: {json.dumps(tasks, indent=2)}\n"
-                      f"Team Velocity: {json.dumps(team_velocity, indent=2)}\n"
-                      f"Context: {context}\n"
-                      f"Create a JSON object with timeline estimates and recommendations.",
-            agent=pm,
-            expected_output='A JSON object containing timeline estimates. Example:\n'
-                          '{\n'
-                          '  "timeline": {\n'
-                          '    "total_weeks": 6,\n'
-                          '    "total_story_points": 90,\n'
-                          '    "sprints": [\n'
-                          '      {\n'
-                          '        "sprint": 1,\n'
-                          '        "tasks": ["BE-1", "BE-2"],\n'
-                          '        "story_points": 30\n'
-                          '      }\n'
-                          '    ]\n'
-                          '  },\n'
-                          '  "risks": ["Dependencies might delay delivery"],\n'
-                          '  "recommendations": ["Consider parallel development"]\n'
-                          '}'
-        )
+        async def run() -> dict:
+            logger.info("Estimating project timeline...")
+            return await self._run_agent_task_routed(
+                simple,
+                agent=pm,
+                description=TIMELINE_DESCRIPTION.format(
+                    tasks=dumps_compact(project_tasks(tasks)),
+                    team_velocity=dumps_compact(team_velocity),
+                    context=context
+                ),
+                expected_output=TIMELINE_EXPECTED_OUTPUT,
+                context="Timeline Estimation",
+                agent_type="project_manager",
+                validate=self._validate_timeline,
+                response_schema=TIMELINE_SCHEMA
+            )
 
-        crew = Crew(
-            agents=[pm],
-            tasks=[estimation_task],
-            verbose=0
+        return await self._cached_result(
+            "estimate_timeline",
+            {"tasks": project_tasks(tasks), "velocity": team_velocity, "context": context},
+            run,
+            use_cache
         )
 
-        try:
-            logger.info("Estimating project timeline...")
-            result = crew.kickoff()
-            
-            parsed_json = robust_json_parser(str(result), context="Timeline Estimation")
-            if parsed_json:
-                # Basic validation: check if 'timeline' key exists (as per example output)
-                if "timeline" in parsed_json and isinstance(parsed_json["timeline"], dict):
-                    return parsed_json
-                else:
-                    logger.warning(f"Parsed JSON for timeline estimation is missing 'timeline' dict. Output: {str(result)[:500]}")
-                    return ErrorSchema(
-                        error="Invalid JSON Structure",
-                        message="Parsed JSON for timeline estimation is missing 'timeline' dict or has incorrect type.",
-                        agent_type="project_manager",
-                        raw_output=str(result)
-                    ).model_dump(exclude_none=True)
-            else:
-                logger.error(f"Failed to parse JSON from timeline estimation. Raw output: {str(result)[:500]}")
-                return ErrorSchema(
-                    error="JSON Parsing Error",
-                    message="Failed to parse JSON output from Project Manager Agent.",
-                    agent_type="project_manager",
-                    raw_output=str(result)
-                ).model_dump(exclude_none=True)
-                
-        except Exception as e:
-            logger.error(f"Error during timeline estimation: {e}", exc_info=True)
-            return ErrorSchema(
-                error="Agent Execution Error",
-                message=f"An unexpected error occurred during timeline estimation: {str(e)}",
-                agent_type="project_manager"
-            ).model_dump(exclude_none=True)
-
     async def plan_infrastructure(self, feature_description: str, technical_requirements: Dict,
-                              scale_requirements: Dict = None, context: str = "") -> Union[dict, ErrorSchema]:
+                              scale_requirements: Dict = None, context: str = "",
+                              use_cache: bool = True) -> Union[dict, ErrorSchema]:
         """
         Plan infrastructure and CI/CD requirements using the DevOps specialist agent.
         
@@ -151,6 +356,7 @@ class OperationsAgents(AgentBase):
             technical_requirements (Dict): Technical specifications and requirements
             scale_requirements (Dict, optional): Scaling and performance requirements
             context (str, optional): Additional context about the project
+            use_cache (bool, optional): Reuse the result of an identical earlier plan
             
         Returns:
             dict: Infrastructure plan and CI/CD pipeline design
@@ -163,150 +369,221 @@ class OperationsAgents(AgentBase):
                 agent_type="devops_specialist"
             ).model_dump(exclude_none=True)
 
-        devops = self.make_devops_specialist()
+        devops = self.devops_specialist.model_copy()
         
         if scale_requirements is None:
-            scale_requirements = {
-                "expected_users": 1000,
-                "peak_concurrent": 100,
-                "data_storage_gb": 50,
-                "availability_target": 0.99
-            }
+            scale_requirements = DEFAULT_SCALE_REQUIREMENTS
         
-        planning_task = Task(
-            description=f"Design infrastructure and CI/CD pipeline for this feature:\n"
-                      f"Feature: {feature_description}\n"
-                      f"Technical Requirements: {json.dumps(technical_requirements, indent=2)}\n"
-                      f"Scale Requirements: {json.dumps(scale_requirements, indent=2)}\n"
-                      f"Context: {context}\n"
-                      f"Create a JSON object with infrastructure and pipeline design.",
-            agent=devops,
-            expected_output='A JSON object containing infrastructure plan. Example:\n'
-                          '{\n'
-                          '  "infrastructure": {\n'
-                          '    "compute": {\n'
-                          '      "type": "kubernetes",\n'
-                          '      "sizing": {\n'
-                          '        "initial_nodes": 2,\n'
-                          '        "autoscaling": {"min": 2, "max": 5}\n'
-                          '      }\n'
-                          '    },\n'
-                          '    "storage": {\n'
-                          '      "type": "managed_sql",\n'
-                          '      "backup_strategy": "daily"\n'
-                          '    }\n'
-                          '  },\n'
-                          '  "ci_cd": {\n'
-                          '    "pipeline_stages": ["build", "test", "deploy"],\n'
-                          '    "deployment_strategy": "blue-green"\n'
-                          '  },\n'
-                          '  "monitoring": ["cpu_usage", "error_rates"],\n'
-                          '  "security_measures": ["waf", "ssl_termination"]\n'
-                          '}'
+        async def run() -> dict:
+            logger.info("Planning infrastructure for: %.50s...", feature_description)
+            return await self._run_agent_task(
+                devops,
+                description=INFRASTRUCTURE_DESCRIPTION.format(
+                    feature=feature_description,
+                    technical_requirements=dumps_compact(slim_requirements(technical_requirements)),
+                    scale_requirements=dumps_compact(scale_requirements),
+                    context=context
+                ),
+                expected_output=INFRASTRUCTURE_EXPECTED_OUTPUT,
+                context="Infrastructure Planning",
+                agent_type="devops_specialist",
+                validate=self._validate_infrastructure,
+                response_schema=JSON_OBJECT_FORMAT
+            )
+
+        return await self._cached_result(
+            "plan_infrastructure",
+            {
+                "feature": feature_description,
+                "technical_requirements": slim_requirements(technical_requirements),
+                "scale_requirements": scale_requirements,
+                "context": context
+            },
+            run,
+            use_cache
+        )
+
+    async def run_operations_bundle(self, tasks: List[Dict], feature_description: str,
+                                    technical_requirements: Dict, team_velocity: Dict = None,
+                                    scale_requirements: Dict = None, context: str = "",
+                                    use_cache: bool = True) -> Dict[str, dict]:
+        """
+        Estimate the timeline and plan the infrastructure for a feature concurrently.
+        
+        The two agents do not depend on each other, so their crews run side by side and the
+        bundle takes as long as the slower of the two rather than their sum.
+        
+        Args:
+            tasks (List[Dict]): Technical tasks to estimate
+            feature_description (str): Description of the feature to implement
+            technical_requirements (Dict): Technical specifications and requirements
+            team_velocity (Dict, optional): Information about team's velocity and capacity
+            scale_requirements (Dict, optional): Scaling and performance requirements
+            context (str, optional): Additional context about the project
+            use_cache (bool, optional): Reuse results made for identical inputs earlier
+            
+        Returns:
+            Dict[str, dict]: 'timeline_estimate' and 'infrastructure_plan', each the agent's
+            result or an ErrorSchema dict
+        """
+        timeline, infrastructure = await asyncio.gather(
+            self.estimate_timeline(tasks, team_velocity, context, use_cache),
+            self.plan_infrastructure(feature_description, technical_requirements, scale_requirements, context, use_cache)
+        )
+        return {
+            "timeline_estimate": timeline,
+            "infrastructure_plan": infrastructure
+        }
+
+    async def estimate_timeline_batch(self, task_groups: List[List[Dict]], team_velocity: Dict = None,
+                                      context: str = "") -> List[dict]:
+        """
+        Estimate timelines for several task groups, sharing one prompt per batch of MAX_BATCH_SIZE.
+        
+        Args:
+            task_groups (List[List[Dict]]): One list of technical tasks per project/feature
+            team_velocity (Dict, optional): Information about team's velocity and capacity
+            context (str, optional): Additional context shared by all task groups
+            
+        Returns:
+            List[dict]: One timeline estimate (or ErrorSchema dict) per task group, in input order
+        """
+        chunks = [task_groups[i:i + self.MAX_BATCH_SIZE] for i in range(0, len(task_groups), self.MAX_BATCH_SIZE)]
+        results = await run_many(
+            self._estimate_timeline_chunk(chunk, team_velocity, context) for chunk in chunks
+        )
+        return [estimate for chunk_results in results for estimate in chunk_results]
+
+    async def _estimate_timeline_chunk(self, task_groups: List[List[Dict]], team_velocity: Optional[Dict],
+                                       context: str) -> List[dict]:
+        """Estimate one batch of task groups with a single crew run, falling back to per-item calls."""
+        if len(task_groups) == 1 or not self.has_valid_llm():
+            return await run_many(
+                self.estimate_timeline(tasks, team_velocity, context) for tasks in task_groups
+            )
+
+        pm = self.project_manager.model_copy(update={"llm": self.get_structured_llm(TIMELINE_BATCH_SCHEMA)})
+        # team_velocity itself stays as given: the per-item fallback only routes a default
+        # velocity (None) to the fast tier
+        velocity = DEFAULT_TEAM_VELOCITY if team_velocity is None else team_velocity
+            
+        listing = "\n".join(
+            TIMELINE_BATCH_ITEM.format(number=number, tasks=dumps_compact(project_tasks(tasks)))
+            for number, tasks in enumerate(task_groups, 1)
+        )
+        estimation_task = Task(
+            description=TIMELINE_BATCH_DESCRIPTION.format(
+                count=len(task_groups),
+                listing=listing,
+                team_velocity=dumps_compact(velocity),
+                context=context
+            ),
+            agent=pm,
+            expected_output=TIMELINE_BATCH_EXPECTED_OUTPUT
         )
 
         crew = Crew(
-            agents=[devops],
-            tasks=[planning_task],
+            agents=[pm],
+            tasks=[estimation_task],
             verbose=0
         )
 
+        entries = None
         try:
-            logger.info(f"Planning infrastructure for: {feature_description[:50]}...")
-            result = crew.kickoff()
-            
-            parsed_json = robust_json_parser(str(result), context="Infrastructure Plan")
-            if parsed_json:
-                # Check for successful structure AND absence of an 'error' key from LLM
-                # The original check was quite specific; let's simplify to ensure the main 'infrastructure' key is present
-                # and it's a dictionary, and no 'error' key from LLM.
-                # The Pydantic model `InfrastructureConfig` will do the finer-grained validation later.
-                if ("infrastructure" in parsed_json and 
-                    isinstance(parsed_json["infrastructure"], dict) and
-                    "error" not in parsed_json): # Check for LLM-generated error field
-                    # Further check for essential sub-keys based on InfrastructureConfig and example
-                    if (all(k in parsed_json for k in ["ci_cd", "monitoring", "security_measures"]) and
-                        all(k in parsed_json["infrastructure"] for k in ["compute", "storage"])):
-                        return parsed_json # This is the successful data
-                    else:
-                        logger.warning(f"Parsed JSON for infrastructure plan is missing some expected sub-keys. Output: {str(result)[:500]}")
-                        return ErrorSchema(
-                            error="Invalid JSON Structure",
-                            message="Parsed JSON for infrastructure plan is missing some expected sub-keys (e.g., infrastructure.compute, ci_cd).",
-                            agent_type="devops_specialist",
-                            raw_output=str(result)
-                        ).model_dump(exclude_none=True)
-                else:
-                    logger.warning(f"Parsed JSON for infrastructure plan is invalid or contains an error field. Output: {str(result)[:500]}")
-                    return ErrorSchema(
-                        error="Invalid JSON Structure or LLM Error",
-                        message="Parsed JSON for infrastructure plan is missing 'infrastructure' dict, has incorrect type, or contains an error indicator from the LLM.",
-                        agent_type="devops_specialist",
-                        raw_output=str(result)
-                    ).model_dump(exclude_none=True)
-            else:
-                # robust_json_parser failed
-                logger.error(f"Failed to parse JSON from infrastructure plan. Raw output: {str(result)[:500]}")
-                return ErrorSchema(
-                    error="JSON Parsing Error",
-                    message="Failed to parse JSON output from DevOps Specialist Agent.",
-                    agent_type="devops_specialist",
-                    raw_output=str(result)
-                ).model_dump(exclude_none=True)
-                
+            logger.info("Estimating timelines for a batch of %d task groups...", len(task_groups))
+            result = await self._kickoff(crew)
+            raw_output = str(result)
+            entries = self._split_batch_output(
+                robust_json_parser(raw_output, context="Timeline Estimation Batch"), len(task_groups)
+            )
         except Exception as e:
-            logger.error(f"Error during infrastructure planning: {e}", exc_info=True)
-            return ErrorSchema(
-                error="Agent Execution Error",
-                message=f"An unexpected error occurred during infrastructure planning: {str(e)}",
-                agent_type="devops_specialist"
-            ).model_dump(exclude_none=True)
-
-if __name__ == "__main__":
-    import asyncio
-    
-    async def test_operations_agents():
-        agents = OperationsAgents()
-        
-        if not agents.has_valid_llm():
-            print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
-            return
+            logger.error("Error during batched timeline estimation: %s: %s", type(e).__name__, e)
+            logger.debug("Batched timeline estimation traceback", exc_info=True)
             
-        # Test data for timeline estimation
-        tasks = [
-            {
-                "id": "BE-1",
-                "title": "Implement user preferences model",
-                "type": "backend",
-                "estimated_hours": 8
-            },
-            {
-                "id": "BE-2",
-                "title": "Create API endpoints",
-                "type": "backend",
-                "estimated_hours": 12
-            }
+        if entries is None:
+            logger.warning("Batched timeline estimation failed; falling back to per-item calls")
+            entries = [None] * len(task_groups)
+            
+        # Items the batch did not answer are estimated individually
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        retried = await run_many(
+            self.estimate_timeline(task_groups[i], team_velocity, context) for i in missing
+        )
+        results = [
+            self._validate_timeline(entry, raw_output) if entry is not None else None
+            for entry in entries
         ]
+        for i, estimate in zip(missing, retried):
+            results[i] = estimate
+        return results
+
+    async def plan_infrastructure_batch(self, features: List[Dict[str, Any]]) -> List[dict]:
+        """
+        Plan infrastructure for several features, sharing one prompt per batch of MAX_BATCH_SIZE.
         
-        # Test timeline estimation
-        timeline = await agents.estimate_timeline(tasks)
-        print("\nTimeline Estimation Result:")
-        print(json.dumps(timeline, indent=2))
-        
-        # Test infrastructure planning
-        if not timeline.get("error"):
-            tech_requirements = {
-                "backend": "Python/FastAPI",
-                "database": "PostgreSQL",
-                "authentication": "JWT"
-            }
+        Args:
+            features (List[Dict[str, Any]]): One dict per feature with 'feature_description' and
+                'technical_requirements', and optional 'scale_requirements' and 'context'
             
-            infra_plan = await agents.plan_infrastructure(
-                feature_description="User preferences system with authentication",
-                technical_requirements=tech_requirements
+        Returns:
+            List[dict]: One infrastructure plan (or ErrorSchema dict) per feature, in input order
+        """
+        chunks = [features[i:i + self.MAX_BATCH_SIZE] for i in range(0, len(features), self.MAX_BATCH_SIZE)]
+        results = await run_many(self._plan_infrastructure_chunk(chunk) for chunk in chunks)
+        return [plan for chunk_results in results for plan in chunk_results]
+
+    async def _plan_infrastructure_chunk(self, features: List[Dict[str, Any]]) -> List[dict]:
+        """Plan one batch of features with a single crew run, falling back to per-item calls."""
+        if len(features) == 1 or not self.has_valid_llm():
+            return await run_many(self.plan_infrastructure(**feature) for feature in features)
+
+        devops = self.devops_specialist.model_copy(update={"llm": self.get_json_llm()})
+        
+        listing = "\n".join(
+            INFRASTRUCTURE_BATCH_ITEM.format(
+                number=number,
+                feature=feature["feature_description"],
+                technical_requirements=dumps_compact(slim_requirements(feature["technical_requirements"])),
+                scale_requirements=dumps_compact(feature.get("scale_requirements") or DEFAULT_SCALE_REQUIREMENTS),
+                context=feature.get("context", "")
             )
-            print("\nInfrastructure Planning Result:")
-            print(json.dumps(infra_plan, indent=2))
+            for number, feature in enumerate(features, 1)
+        )
+        planning_task = Task(
+            description=INFRASTRUCTURE_BATCH_DESCRIPTION.format(count=len(features), listing=listing),
+            agent=devops,
+            expected_output=INFRASTRUCTURE_BATCH_EXPECTED_OUTPUT
+        )
+
+        crew = Crew(
+            agents=[devops],
+            tasks=[planning_task],
+            verbose=0
+        )
+
+        entries = None
+        try:
+            logger.info("Planning infrastructure for a batch of %d features...", len(features))
+            result = await self._kickoff(crew)
+            raw_output = str(result)
+            entries = self._split_batch_output(
+                robust_json_parser(raw_output, context="Infrastructure Plan Batch"), len(features)
+            )
+        except Exception as e:
+            logger.error("Error during batched infrastructure planning: %s: %s", type(e).__name__, e)
+            logger.debug("Batched infrastructure planning traceback", exc_info=True)
             
-    # Run the test
-    asyncio.run(test_operations_agents())
+        if entries is None:
+            logger.warning("Batched infrastructure planning failed; falling back to per-item calls")
+            entries = [None] * len(features)
+            
+        # Items the batch did not answer are planned individually
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        retried = await run_many(self.plan_infrastructure(**features[i]) for i in missing)
+        results = [
+            self._validate_infrastructure(entry, raw_output) if entry is not None else None
+            for entry in entries
+        ]
+        for i, plan in zip(missing, retried):
+            results[i] = plan
+        return results
@@ -1,16 +1,119 @@
-from typing import Optional, Dict, Any, List, Union # Added List, Union
+from typing import Optional, Dict, Any, List, Union, Callable # Added List, Union
+from functools import cached_property
 from crewai import Agent, Task, Crew
-import json
 import logging
-from ..agent_base import AgentBase
-from ....utils.json_parser import robust_json_parser # Import the new parser
+from ..agent_base import AgentBase, run_many
+from ..batch import BatchProcessor
+from ....utils.json_parser import robust_json_parser, dumps_compact # Import the new parser
 from ....api.v1.schemas import ErrorSchema # Import ErrorSchema for typing and structure
 
 logger = logging.getLogger(__name__)
 
+# Prompt text is built once at import; each call only fills in its inputs
+STORIES_DESCRIPTION = ("Generate user stories for the following feature: \n"
+                       "Feature: {feature}\n"
+                       "Context: {context}\n"
+                       "Create a JSON object containing an array of user stories, where each story has "
+                       "'role', 'goal', 'benefit', and 'acceptance_criteria' fields.")
+STORIES_EXPECTED_OUTPUT = ("A JSON object with a 'user_stories' array; each story has a role, a goal, "
+                           "a benefit and a list of acceptance criteria.")
+# Structured output schemas for the single-feature calls; the provider enforces them, so the
+# prompts no longer need a full example of the answer
+STORIES_SCHEMA = {
+    "name": "user_stories",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "user_stories": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "role": {"type": "string"},
+                        "goal": {"type": "string"},
+                        "benefit": {"type": "string"},
+                        "acceptance_criteria": {"type": "array", "items": {"type": "string"}}
+                    },
+                    "required": ["role", "goal", "benefit", "acceptance_criteria"]
+                }
+            }
+        },
+        "required": ["user_stories"]
+    }
+}
+
+STORIES_BATCH_ITEM = ("#{number}:\n"
+                      "Feature: {feature}\n"
+                      "Context: {context}")
+STORIES_BATCH_DESCRIPTION = ("Generate user stories separately for each of these {count} features:\n"
+                             "{listing}\n"
+                             "Create a JSON array with one object per feature, tagged with its id, each containing "
+                             "an array of user stories with 'role', 'goal', 'benefit', and 'acceptance_criteria' fields.")
+STORIES_BATCH_EXPECTED_OUTPUT = ('A JSON array with one set of user stories per feature. Example:\n'
+                                 '[\n'
+                                 '  {\n'
+                                 '    "id": "#1",\n'
+                                 '    "user_stories": [\n'
+                                 '      {\n'
+                                 '        "role": "registered user",\n'
+                                 '        "goal": "reset my password",\n'
+                                 '        "benefit": "regain access to my account",\n'
+                                 '        "acceptance_criteria": ["Can request reset via email", "..."]\n'
+                                 '      }\n'
+                                 '    ]\n'
+                                 '  }\n'
+                                 ']')
+
+# Batched variant: one entry per feature, matched back to it by 'id'
+STORIES_BATCH_SCHEMA = {
+    "name": "user_stories_batch",
+    "schema": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"id": {"type": "string"}, **STORIES_SCHEMA["schema"]["properties"]},
+            "required": ["id", *STORIES_SCHEMA["schema"]["required"]]
+        }
+    }
+}
+
+UX_DESCRIPTION = ("Analyze the UX implications of this feature and provide recommendations:\n"
+                  "Feature: {feature}\n"
+                  "User Stories: {user_stories}\n"
+                  "Context: {context}\n"
+                  "Provide a JSON object with UX recommendations and potential issues.")
+UX_EXPECTED_OUTPUT = ("A JSON object with 'recommendations' (each naming the aspect, the suggestion and "
+                      "its rationale), 'potential_issues' and 'accessibility_considerations'.")
+UX_SCHEMA = {
+    "name": "ux_analysis",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "recommendations": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "aspect": {"type": "string"},
+                        "suggestion": {"type": "string"},
+                        "rationale": {"type": "string"}
+                    },
+                    "required": ["aspect", "suggestion", "rationale"]
+                }
+            },
+            "potential_issues": {"type": "array", "items": {"type": "string"}},
+            "accessibility_considerations": {"type": "array", "items": {"type": "string"}}
+        },
+        "required": ["recommendations", "potential_issues", "accessibility_considerations"]
+    }
+}
+
 class ProductAgents(AgentBase):
     """Product-focused agents for user stories and design."""
 
+    # Features per batched prompt; beyond this, answer quality drops faster than the shared prompt saves
+    MAX_BATCH_SIZE = 8
+
     def make_product_manager(self) -> Agent:
         """
         Create a product manager agent focused on user story generation.
@@ -47,17 +150,57 @@ class ProductAgents(AgentBase):
                      "design trends in your recommendations."
         )
 
-    async def generate_user_stories(self, feature_description: str, context: str = "") -> dict:
+    # Built once per instance like the operations agents; each run gets a shallow copy
+    @cached_property
+    def product_manager(self) -> Agent:
+        """Cached product manager agent; copy it before handing it to a crew."""
+        return self.make_product_manager()
+
+    @cached_property
+    def ux_designer(self) -> Agent:
+        """Cached UX designer agent; copy it before handing it to a crew."""
+        return self.make_ux_designer()
+
+    def _validate_user_stories(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check parsed user stories, returning them or an ErrorSchema dict."""
+        # Basic validation: check if 'user_stories' key exists
+        if isinstance(parsed_json, dict) and isinstance(parsed_json.get("user_stories"), list):
+            return parsed_json
+        logger.warning("Parsed JSON for user stories is missing 'user_stories' list. Output: %.500s", raw_output)
+        return ErrorSchema(
+            error="Invalid JSON Structure",
+            message="Parsed JSON for user stories is missing 'user_stories' list or has incorrect type.",
+            agent_type="product_manager",
+            raw_output=raw_output
+        ).model_dump(exclude_none=True)
+
+    async def generate_user_stories(self, feature_description: str, context: str = "",
+                                    use_cache: bool = True,
+                                    on_story: Optional[Callable[[dict], None]] = None) -> dict:
         """
         Generate user stories for a given feature using the product manager agent.
         
         Args:
             feature_description (str): Description of the feature to analyze
             context (str, optional): Additional context about the feature or project
+            use_cache (bool, optional): Reuse the stories generated for identical inputs earlier
+            on_story (Callable, optional): Called with each story as soon as it has streamed in,
+                for progress reporting; the returned result is still the authoritative list
             
         Returns:
             dict: User stories and acceptance criteria
         """
+        return await self._cached_result(
+            "generate_user_stories",
+            {"feature": feature_description, "context": context},
+            lambda: self._generate_user_stories(feature_description, context, on_story),
+            use_cache,
+            similarity_text=f"{feature_description}\n{context}"
+        )
+
+    async def _generate_user_stories(self, feature_description: str, context: str,
+                                     on_story: Optional[Callable[[dict], None]] = None) -> dict:
+        """Run the product manager agent; see generate_user_stories."""
         if not self.has_valid_llm():
             logger.warning("Product manager agent has no valid LLM configuration")
             return ErrorSchema(
@@ -66,24 +209,80 @@ class ProductAgents(AgentBase):
                 agent_type="product_manager"
             ).model_dump(exclude_none=True)
 
-        pm_agent = self.make_product_manager()
+        logger.info("Generating user stories for: %.50s...", feature_description)
+        return await self._run_agent_task(
+            self.product_manager.model_copy(),
+            description=STORIES_DESCRIPTION.format(feature=feature_description, context=context),
+            expected_output=STORIES_EXPECTED_OUTPUT,
+            context="User Stories Generation",
+            agent_type="product_manager",
+            validate=self._validate_user_stories,
+            response_schema=STORIES_SCHEMA,
+            item_key="user_stories",
+            on_item=on_story
+        )
+
+    async def generate_user_stories_batch(self, features: List[Dict[str, str]]) -> List[dict]:
+        """
+        Generate user stories for several features, sharing one prompt per batch of MAX_BATCH_SIZE.
         
+        Args:
+            features (List[Dict[str, str]]): One dict per feature with 'feature_description'
+                and optional 'context'
+            
+        Returns:
+            List[dict]: One user stories result (or ErrorSchema dict) per feature, in input order
+        """
+        chunks = [features[i:i + self.MAX_BATCH_SIZE] for i in range(0, len(features), self.MAX_BATCH_SIZE)]
+        results = await run_many(self._generate_user_stories_chunk(chunk) for chunk in chunks)
+        return [stories for chunk_results in results for stories in chunk_results]
+
+    async def generate_user_stories_bulk(self, features: List[Dict[str, str]],
+                                         on_progress: Optional[Callable[[int, int], None]] = None) -> List[dict]:
+        """
+        Generate user stories for a large number of features, e.g. every feature of an epic.
+        
+        Like generate_user_stories_batch, but the batched prompts are spread out by a
+        BatchProcessor so a long list stays within the concurrency and rate limits.
+        
+        Args:
+            features (List[Dict[str, str]]): One dict per feature with 'feature_description'
+                and optional 'context'
+            on_progress (Callable, optional): Called with (batches done, total batches) as
+                each batch of up to MAX_BATCH_SIZE features completes
+            
+        Returns:
+            List[dict]: One user stories result (or ErrorSchema dict) per feature, in input order
+        """
+        chunks = [features[i:i + self.MAX_BATCH_SIZE] for i in range(0, len(features), self.MAX_BATCH_SIZE)]
+        results = await BatchProcessor().run_batch(
+            self._generate_user_stories_chunk, [{"features": chunk} for chunk in chunks], on_progress=on_progress
+        )
+        stories: List[dict] = []
+        for chunk, chunk_results in zip(chunks, results):
+            # A chunk that raised comes back as a single error dict; repeat it for each of its features
+            stories.extend(chunk_results if isinstance(chunk_results, list) else [chunk_results] * len(chunk))
+        return stories
+
+    async def _generate_user_stories_chunk(self, features: List[Dict[str, str]]) -> List[dict]:
+        """Generate stories for one batch of features with a single crew run, falling back to per-item calls."""
+        if len(features) == 1 or not self.has_valid_llm():
+            return await run_many(self.generate_user_stories(**feature) for feature in features)
+
+        pm_agent = self.product_manager.model_copy(update={"llm": self.get_structured_llm(STORIES_BATCH_SCHEMA)})
+        
+        listing = "\n".join(
+            STORIES_BATCH_ITEM.format(
+                number=number,
+                feature=feature["feature_description"],
+                context=feature.get("context", "")
+            )
+            for number, feature in enumerate(features, 1)
+        )
         story_task = Task(
-            description=f"Generate user stories for the following feature: \n"
-                      f"Feature: {feature_description}\n"
-                      f"Context: {context}\n"
-                      f"Create a JSON object containing an array of user stories, where each story has "
-                      f"'role', 'goal', 'benefit', and 'acceptance_criteria' fields.",
+            description=STORIES_BATCH_DESCRIPTION.format(count=len(features), listing=listing),
             agent=pm_agent,
-            expected_output='A JSON string containing an array of user stories. Example: \n'
-                          '{"user_stories": [\n'
-                          '  {\n'
-                          '    "role": "registered user",\n'
-                          '    "goal": "reset my password",\n'
-                          '    "benefit": "regain access to my account",\n'
-                          '    "acceptance_criteria": ["Can request reset via email", "..."]\n'
-                          '  }\n'
-                          ']}'
+            expected_output=STORIES_BATCH_EXPECTED_OUTPUT
         )
 
         crew = Crew(
@@ -92,41 +291,35 @@ class ProductAgents(AgentBase):
             verbose=0
         )
 
+        entries = None
         try:
-            logger.info(f"Generating user stories for: {feature_description[:50]}...")
-            result = crew.kickoff()
-            
-            parsed_json = robust_json_parser(str(result), context="User Stories Generation")
-            if parsed_json:
-                # Basic validation: check if 'user_stories' key exists
-                if "user_stories" in parsed_json and isinstance(parsed_json["user_stories"], list):
-                    return parsed_json
-                else:
-                    logger.warning(f"Parsed JSON for user stories is missing 'user_stories' list. Output: {str(result)[:500]}")
-                    return ErrorSchema(
-                        error="Invalid JSON Structure",
-                        message="Parsed JSON for user stories is missing 'user_stories' list or has incorrect type.",
-                        agent_type="product_manager",
-                        raw_output=str(result)
-                    ).model_dump(exclude_none=True)
-            else:
-                logger.error(f"Failed to parse JSON from user stories generation. Raw output: {str(result)[:500]}")
-                return ErrorSchema(
-                    error="JSON Parsing Error",
-                    message="Failed to parse JSON output from Product Manager Agent.",
-                    agent_type="product_manager",
-                    raw_output=str(result)
-                ).model_dump(exclude_none=True)
-                
+            logger.info("Generating user stories for a batch of %d features...", len(features))
+            result = await self._kickoff(crew)
+            raw_output = str(result)
+            entries = self._split_batch_output(
+                robust_json_parser(raw_output, context="User Stories Generation Batch"), len(features)
+            )
         except Exception as e:
-            logger.error(f"Error generating user stories: {e}", exc_info=True)
-            return ErrorSchema(
-                error="Agent Execution Error",
-                message=f"An unexpected error occurred during user story generation: {str(e)}",
-                agent_type="product_manager"
-            ).model_dump(exclude_none=True)
+            logger.error("Error during batched user story generation: %s: %s", type(e).__name__, e)
+            logger.debug("Batched user story generation traceback", exc_info=True)
+            
+        if entries is None:
+            logger.warning("Batched user story generation failed; falling back to per-item calls")
+            entries = [None] * len(features)
+            
+        # Features the batch did not answer are handled individually
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        retried = await run_many(self.generate_user_stories(**features[i]) for i in missing)
+        results = [
+            self._validate_user_stories(entry, raw_output) if entry is not None else None
+            for entry in entries
+        ]
+        for i, stories in zip(missing, retried):
+            results[i] = stories
+        return results
 
-    async def analyze_ux(self, feature_description: str, user_stories: list, context: str = "") -> Union[dict, ErrorSchema]:
+    async def analyze_ux(self, feature_description: str, user_stories: list, context: str = "",
+                         use_cache: bool = True) -> Union[dict, ErrorSchema]:
         """
         Analyze UX implications of a feature using the UX designer agent.
         
@@ -134,117 +327,61 @@ class ProductAgents(AgentBase):
             feature_description (str): Description of the feature to analyze
             user_stories (list): List of user stories to consider
             context (str, optional): Additional context about the feature or project
+            use_cache (bool, optional): Reuse the analysis made for identical inputs earlier
             
         Returns:
             dict: UX analysis and recommendations
         """
-        if not self.has_valid_llm():
-            logger.warning("UX designer agent has no valid LLM configuration")
+        # Nothing to analyze (e.g. story generation failed upstream); don't pay for an LLM call
+        if not isinstance(user_stories, list) or not user_stories:
             return ErrorSchema(
-                error="LLM Error",
-                message="LLM not configured or initialization failed for UX Designer Agent.",
+                error="Invalid Input",
+                message="user_stories must be a non-empty list.",
                 agent_type="ux_designer"
             ).model_dump(exclude_none=True)
 
-        ux_agent = self.make_ux_designer()
-        
-        analysis_task = Task(
-            description=f"Analyze the UX implications of this feature and provide recommendations:\n"
-                      f"Feature: {feature_description}\n"
-                      f"User Stories: {json.dumps(user_stories, indent=2)}\n"
-                      f"Context: {context}\n"
-                      f"Provide a JSON object with UX recommendations and potential issues.",
-            agent=ux_agent,
-            expected_output='A JSON string containing UX analysis. Example:\n'
-                          '{\n'
-                          '  "recommendations": [\n'
-                          '    {\n'
-                          '      "aspect": "Navigation",\n'
-                          '      "suggestion": "Add breadcrumb navigation",\n'
-                          '      "rationale": "Improves user orientation"\n'
-                          '    }\n'
-                          '  ],\n'
-                          '  "potential_issues": ["..."],\n'
-                          '  "accessibility_considerations": ["..."]\n'
-                          '}'
-        )
-
-        crew = Crew(
-            agents=[ux_agent],
-            tasks=[analysis_task],
-            verbose=0
+        return await self._cached_result(
+            "analyze_ux",
+            {"feature": feature_description, "user_stories": user_stories, "context": context},
+            lambda: self._analyze_ux(feature_description, user_stories, context),
+            use_cache
         )
 
-        try:
-            logger.info(f"Analyzing UX for: {feature_description[:50]}...")
-            result = crew.kickoff()
-            
-            parsed_json = robust_json_parser(str(result), context="UX Analysis")
-            if parsed_json:
-                # Check for successful structure AND absence of an 'error' key from LLM
-                if "recommendations" in parsed_json and isinstance(parsed_json["recommendations"], list) and "error" not in parsed_json:
-                    return parsed_json # This is the successful data
-                else:
-                    # If "recommendations" is missing, or it's not a list, OR if an "error" key is present in the parsed JSON
-                    logger.warning(f"Parsed JSON for UX analysis is invalid or contains an error field. Output: {str(result)[:500]}")
-                    return ErrorSchema(
-                        error="Invalid JSON Structure or LLM Error",
-                        message="Parsed JSON for UX analysis is missing 'recommendations' list, has incorrect type, or contains an error indicator from the LLM.",
-                        agent_type="ux_designer",
-                        raw_output=str(result)
-                    ).model_dump(exclude_none=True)
-            else:
-                # robust_json_parser failed
-                logger.error(f"Failed to parse JSON from UX analysis. Raw output: {str(result)[:500]}")
-                return ErrorSchema(
-                    error="JSON Parsing Error",
-                    message="Failed to parse JSON output from UX Designer Agent.",
-                    agent_type="ux_designer",
-                    raw_output=str(result)
-                ).model_dump(exclude_none=True)
-                
-        except Exception as e:
-            logger.error(f"Error during UX analysis: {e}", exc_info=True)
+    async def _analyze_ux(self, feature_description: str, user_stories: list, context: str) -> Union[dict, ErrorSchema]:
+        """Run the UX designer agent; see analyze_ux."""
+        if not self.has_valid_llm():
+            logger.warning("UX designer agent has no valid LLM configuration")
             return ErrorSchema(
-                error="Agent Execution Error",
-                message=f"An unexpected error occurred during UX analysis: {str(e)}",
+                error="LLM Error",
+                message="LLM not configured or initialization failed for UX Designer Agent.",
                 agent_type="ux_designer"
             ).model_dump(exclude_none=True)
 
-if __name__ == "__main__":
-    import asyncio
-    
-    async def test_product_agents():
-        agents = ProductAgents()
-        
-        if not agents.has_valid_llm():
-            print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
-            return
-            
-        test_feature = {
-            "description": "Add a dark mode feature to the application",
-            "context": "Users have requested the ability to switch between light and dark themes"
-        }
-        
-        # Generate user stories
-        stories_result = await agents.generate_user_stories(
-            feature_description=test_feature["description"],
-            context=test_feature["context"]
+        logger.info("Analyzing UX for: %.50s...", feature_description)
+        return await self._run_agent_task(
+            self.ux_designer.model_copy(),
+            description=UX_DESCRIPTION.format(
+                feature=feature_description,
+                user_stories=dumps_compact(user_stories),
+                context=context
+            ),
+            expected_output=UX_EXPECTED_OUTPUT,
+            context="UX Analysis",
+            agent_type="ux_designer",
+            validate=self._validate_ux_analysis,
+            response_schema=UX_SCHEMA
         )
-        
-        print("\nUser Stories Result:")
-        print(json.dumps(stories_result, indent=2))
-        
-        if "user_stories" in stories_result and not stories_result.get("error"):
-            # Analyze UX implications
-            ux_result = await agents.analyze_ux(
-                feature_description=test_feature["description"],
-                user_stories=stories_result["user_stories"],
-                context=test_feature["context"]
-            )
-            
-            print("\nUX Analysis Result:")
-            print(json.dumps(ux_result, indent=2))
-            
-    # Run the test
-    asyncio.run(test_product_agents())
+
+    def _validate_ux_analysis(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check a parsed UX analysis, returning it or an ErrorSchema dict."""
+        # Check for successful structure AND absence of an 'error' key from LLM
+        if (isinstance(parsed_json, dict) and isinstance(parsed_json.get("recommendations"), list)
+                and "error" not in parsed_json):
+            return parsed_json
+        logger.warning("Parsed JSON for UX analysis is invalid or contains an error field. Output: %.500s", raw_output)
+        return ErrorSchema(
+            error="Invalid JSON Structure or LLM Error",
+            message="Parsed JSON for UX analysis is missing 'recommendations' list, has incorrect type, or contains an error indicator from the LLM.",
+            agent_type="ux_designer",
+            raw_output=raw_output
+        ).model_dump(exclude_none=True)
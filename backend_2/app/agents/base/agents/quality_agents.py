@@ -1,13 +1,171 @@
 from typing import Optional, Dict, Any, List, Union # Added Union
-from crewai import Agent, Task, Crew
-import json
+import asyncio
+from functools import cached_property
+from crewai import Agent
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
 import logging
-from ..agent_base import AgentBase
-from ....utils.json_parser import robust_json_parser # Import the new parser
+from ..agent_base import AgentBase, validation_error_paths
+from ....utils.json_parser import dumps_compact
 from ....api.v1.schemas import ErrorSchema # Import ErrorSchema for typing and structure
 
 logger = logging.getLogger(__name__)
 
+# Prompt text is built once at import; each call only fills in its inputs
+TEST_STRATEGY_DESCRIPTION = ("Design a comprehensive test strategy for this feature:\n"
+                             "Feature: {feature}\n"
+                             "User Stories: {user_stories}\n"
+                             "Technical Specs: {technical_specs}\n"
+                             "Context: {context}\n"
+                             "Create a JSON object detailing the test strategy and coverage plans.")
+TEST_STRATEGY_EXPECTED_OUTPUT = ("A JSON object with 'test_levels' (unit, integration and end-to-end tests), "
+                                 "the automation approach, the test data strategy and the quality gates.")
+# Structured output schemas; the provider enforces them, so the prompts no longer need a
+# full example of the answer
+_STRINGS = {"type": "array", "items": {"type": "string"}}
+TEST_STRATEGY_SCHEMA = {
+    "name": "test_strategy",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "test_levels": {
+                "type": "object",
+                "properties": {
+                    "unit_tests": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "component": {"type": "string"},
+                                "scenarios": _STRINGS,
+                                "coverage_targets": _STRINGS
+                            },
+                            "required": ["component", "scenarios"]
+                        }
+                    },
+                    "integration_tests": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "flow": {"type": "string"},
+                                "components": _STRINGS,
+                                "scenarios": _STRINGS
+                            },
+                            "required": ["flow", "scenarios"]
+                        }
+                    },
+                    "e2e_tests": _STRINGS
+                },
+                "required": ["unit_tests", "integration_tests", "e2e_tests"]
+            },
+            "automation_approach": _STRINGS,
+            "test_data_strategy": {"type": "string"},
+            "quality_gates": _STRINGS
+        },
+        "required": ["test_levels", "automation_approach", "test_data_strategy", "quality_gates"]
+    }
+}
+
+# Security analysis is split into two independent, narrower questions that run side by side
+# (and fit the fast model tier); their answers are merged into one security_analysis object
+SECURITY_INPUTS = ("Feature: {feature}\n"
+                   "Technical Specs: {technical_specs}\n"
+                   "Data Handling: {data_handling}\n"
+                   "Context: {context}\n")
+SECURITY_RISK_DESCRIPTION = ("Assess the security risks of this feature:\n"
+                             + SECURITY_INPUTS +
+                             "Create a JSON object with a 'risk_assessment' listing the likely vulnerabilities "
+                             "and the protection each type of data needs.")
+SECURITY_RISK_EXPECTED_OUTPUT = ("A JSON object with a 'risk_assessment' containing 'vulnerabilities' (type, "
+                                 "severity and mitigation) and 'data_protection' (data type and measures).")
+SECURITY_RISK_SCHEMA = {
+    "name": "security_risk_assessment",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "risk_assessment": {
+                "type": "object",
+                "properties": {
+                    "vulnerabilities": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "type": {"type": "string"},
+                                "severity": {"type": "string", "enum": ["Low", "Medium", "High", "Critical"]},
+                                "mitigation": {"type": "string"}
+                            },
+                            "required": ["type", "severity", "mitigation"]
+                        }
+                    },
+                    "data_protection": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "data_type": {"type": "string"},
+                                "measures": _STRINGS
+                            },
+                            "required": ["data_type", "measures"]
+                        }
+                    }
+                },
+                "required": ["vulnerabilities", "data_protection"]
+            }
+        },
+        "required": ["risk_assessment"]
+    }
+}
+
+SECURITY_REQUIREMENTS_DESCRIPTION = ("List the security requirements for this feature:\n"
+                                     + SECURITY_INPUTS +
+                                     "Create a JSON object with the security requirements, the compliance "
+                                     "considerations and your recommendations.")
+SECURITY_REQUIREMENTS_EXPECTED_OUTPUT = ("A JSON object with 'security_requirements', 'compliance_considerations' "
+                                         "and 'recommendations', each a list of strings.")
+SECURITY_REQUIREMENTS_SCHEMA = {
+    "name": "security_requirements",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "security_requirements": _STRINGS,
+            "compliance_considerations": _STRINGS,
+            "recommendations": _STRINGS
+        },
+        "required": ["security_requirements", "compliance_considerations", "recommendations"]
+    }
+}
+
+class _TestStrategyOutput(BaseModel):
+    """Minimum shape of a test strategy; anything beyond it is passed through untouched."""
+    model_config = ConfigDict(extra="allow")
+    
+    test_levels: Dict[str, Any]
+
+class _SecurityRiskOutput(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    risk_assessment: Dict[str, Any]
+
+class _SecurityRequirementsOutput(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    security_requirements: List[Any]
+    compliance_considerations: List[Any]
+    recommendations: List[Any]
+
+# Validators are compiled once at import and run in pydantic-core
+_TEST_STRATEGY_ADAPTER = TypeAdapter(_TestStrategyOutput)
+_SECURITY_RISK_ADAPTER = TypeAdapter(_SecurityRiskOutput)
+_SECURITY_REQUIREMENTS_ADAPTER = TypeAdapter(_SecurityRequirementsOutput)
+
+# Assumed when the caller does not describe how the feature handles data
+DEFAULT_DATA_HANDLING = {
+    "data_types": ["personal_info", "preferences"],
+    "storage": "encrypted_database",
+    "retention": "user_lifetime"
+}
+
 class QualityAgents(AgentBase):
     """Quality assurance and security-focused agents."""
 
@@ -45,8 +203,19 @@ class QualityAgents(AgentBase):
                      "threats and best practices in your analysis."
         )
 
+    # Built once per instance like the product and operations agents; each run gets a shallow copy
+    @cached_property
+    def qa_strategist(self) -> Agent:
+        """Cached QA strategist agent; copy it before handing it to a crew."""
+        return self.make_qa_strategist()
+
+    @cached_property
+    def security_analyst(self) -> Agent:
+        """Cached security analyst agent; copy it before handing it to a crew."""
+        return self.make_security_analyst()
+
     async def design_test_strategy(self, feature_description: str, user_stories: List[Dict],
-                               technical_specs: Dict, context: str = "") -> dict:
+                               technical_specs: Dict, context: str = "", use_cache: bool = True) -> dict:
         """
         Design a comprehensive test strategy using the QA strategist agent.
         
@@ -55,95 +224,61 @@ class QualityAgents(AgentBase):
             user_stories (List[Dict]): User stories to cover in testing
             technical_specs (Dict): Technical specifications and implementation details
             context (str, optional): Additional context about the project
+            use_cache (bool, optional): Reuse the strategy designed for identical inputs earlier
             
         Returns:
             dict: Test strategy and coverage plans
         """
-        if not self.has_valid_llm():
-            logger.warning("QA strategist agent has no valid LLM configuration")
+        # Without technical specs (e.g. task breakdown failed upstream) there is nothing to plan against
+        if not isinstance(technical_specs, dict) or not technical_specs:
             return ErrorSchema(
-                error="LLM Error",
-                message="LLM not configured or initialization failed for QA Strategist Agent.",
+                error="Invalid Input",
+                message="technical_specs must be a non-empty dict.",
                 agent_type="qa_strategist"
             ).model_dump(exclude_none=True)
 
-        qa = self.make_qa_strategist()
-        
-        strategy_task = Task(
-            description=f"Design a comprehensive test strategy for this feature:\n"
-                      f"Feature: {feature_description}\n"
-                      f"User Stories: {json.dumps(user_stories, indent=2)}\n"
-                      f"Technical Specs: {json.dumps(technical_specs, indent=2)}\n"
-                      f"Context: {context}\n"
-                      f"Create a JSON object detailing the test strategy and coverage plans.",
-            agent=qa,
-            expected_output='A JSON object containing test strategy. Example:\n'
-                          '{\n'
-                          '  "test_levels": {\n'
-                          '    "unit_tests": [\n'
-                          '      {\n'
-                          '        "component": "UserPreferences",\n'
-                          '        "scenarios": ["Valid input", "Invalid input"],\n'
-                          '        "coverage_targets": ["Methods", "Edge cases"]\n'
-                          '      }\n'
-                          '    ],\n'
-                          '    "integration_tests": [\n'
-                          '      {\n'
-                          '        "flow": "Save preferences",\n'
-                          '        "components": ["API", "Database"],\n'
-                          '        "scenarios": ["Success", "Failure"]\n'
-                          '      }\n'
-                          '    ],\n'
-                          '    "e2e_tests": ["Complete user workflow"]\n'
-                          '  },\n'
-                          '  "automation_approach": ["Jest", "Cypress"],\n'
-                          '  "test_data_strategy": "Mock external services",\n'
-                          '  "quality_gates": ["80% coverage", "Zero high-severity bugs"]\n'
-                          '}'
-        )
-
-        crew = Crew(
-            agents=[qa],
-            tasks=[strategy_task],
-            verbose=0
+        return await self._cached_result(
+            "design_test_strategy",
+            {
+                "feature": feature_description,
+                "user_stories": user_stories,
+                "technical_specs": technical_specs,
+                "context": context
+            },
+            lambda: self._design_test_strategy(feature_description, user_stories, technical_specs, context),
+            use_cache
         )
 
-        try:
-            logger.info(f"Designing test strategy for: {feature_description[:50]}...")
-            result = crew.kickoff()
-            
-            parsed_json = robust_json_parser(str(result), context="Test Strategy Design")
-            if parsed_json:
-                # Basic validation: check if 'test_levels' key exists (as per example output)
-                if "test_levels" in parsed_json and isinstance(parsed_json["test_levels"], dict):
-                    return parsed_json
-                else:
-                    logger.warning(f"Parsed JSON for test strategy is missing 'test_levels' dict. Output: {str(result)[:500]}")
-                    return ErrorSchema(
-                        error="Invalid JSON Structure",
-                        message="Parsed JSON for test strategy is missing 'test_levels' dict or has incorrect type.",
-                        agent_type="qa_strategist",
-                        raw_output=str(result)
-                    ).model_dump(exclude_none=True)
-            else:
-                logger.error(f"Failed to parse JSON from test strategy design. Raw output: {str(result)[:500]}")
-                return ErrorSchema(
-                    error="JSON Parsing Error",
-                    message="Failed to parse JSON output from QA Strategist Agent.",
-                    agent_type="qa_strategist",
-                    raw_output=str(result)
-                ).model_dump(exclude_none=True)
-                
-        except Exception as e:
-            logger.error(f"Error during test strategy design: {e}", exc_info=True)
+    async def _design_test_strategy(self, feature_description: str, user_stories: List[Dict],
+                                    technical_specs: Dict, context: str) -> dict:
+        """Run the QA strategist agent; see design_test_strategy."""
+        if not self.has_valid_llm():
+            logger.warning("QA strategist agent has no valid LLM configuration")
             return ErrorSchema(
-                error="Agent Execution Error",
-                message=f"An unexpected error occurred during test strategy design: {str(e)}",
+                error="LLM Error",
+                message="LLM not configured or initialization failed for QA Strategist Agent.",
                 agent_type="qa_strategist"
             ).model_dump(exclude_none=True)
 
+        logger.info("Designing test strategy for: %.50s...", feature_description)
+        return await self._run_agent_task(
+            self.qa_strategist.model_copy(),
+            description=TEST_STRATEGY_DESCRIPTION.format(
+                feature=feature_description,
+                user_stories=dumps_compact(user_stories),
+                technical_specs=dumps_compact(technical_specs),
+                context=context
+            ),
+            expected_output=TEST_STRATEGY_EXPECTED_OUTPUT,
+            context="Test Strategy Design",
+            agent_type="qa_strategist",
+            validate=self._validate_test_strategy,
+            response_schema=TEST_STRATEGY_SCHEMA
+        )
+
     async def analyze_security(self, feature_description: str, technical_specs: Dict,
-                           data_handling: Dict = None, context: str = "") -> Union[dict, ErrorSchema]:
+                           data_handling: Dict = None, context: str = "",
+                           use_cache: bool = True) -> Union[dict, ErrorSchema]:
         """
         Analyze security implications using the security analyst agent.
         
@@ -152,10 +287,26 @@ class QualityAgents(AgentBase):
             technical_specs (Dict): Technical specifications and implementation details
             data_handling (Dict, optional): Information about data processing and storage
             context (str, optional): Additional context about the project
+            use_cache (bool, optional): Reuse the analysis made for identical inputs earlier
             
         Returns:
             dict: Security analysis and recommendations
         """
+        return await self._cached_result(
+            "analyze_security",
+            {
+                "feature": feature_description,
+                "technical_specs": technical_specs,
+                "data_handling": data_handling,
+                "context": context
+            },
+            lambda: self._analyze_security(feature_description, technical_specs, data_handling, context),
+            use_cache
+        )
+
+    async def _analyze_security(self, feature_description: str, technical_specs: Dict,
+                                data_handling: Optional[Dict], context: str) -> Union[dict, ErrorSchema]:
+        """Run the security analyst agent; see analyze_security."""
         if not self.has_valid_llm():
             logger.warning("Security analyst agent has no valid LLM configuration")
             return ErrorSchema(
@@ -164,132 +315,119 @@ class QualityAgents(AgentBase):
                 agent_type="security_analyst"
             ).model_dump(exclude_none=True)
 
-        analyst = self.make_security_analyst()
+        analyst = self.security_analyst.model_copy()
         
         if data_handling is None:
-            data_handling = {
-                "data_types": ["personal_info", "preferences"],
-                "storage": "encrypted_database",
-                "retention": "user_lifetime"
-            }
+            data_handling = DEFAULT_DATA_HANDLING
+        inputs = {
+            "feature": feature_description,
+            "technical_specs": dumps_compact(technical_specs),
+            "data_handling": dumps_compact(data_handling),
+            "context": context
+        }
         
-        analysis_task = Task(
-            description=f"Analyze security implications for this feature:\n"
-                      f"Feature: {feature_description}\n"
-                      f"Technical Specs: {json.dumps(technical_specs, indent=2)}\n"
-                      f"Data Handling: {json.dumps(data_handling, indent=2)}\n"
-                      f"Context: {context}\n"
-                      f"Create a JSON object with security analysis and recommendations.",
-            agent=analyst,
-            expected_output='A JSON object containing security analysis. Example:\n'
-                          '{\n'
-                          '  "risk_assessment": {\n'
-                          '    "vulnerabilities": [\n'
-                          '      {\n'
-                          '        "type": "Injection",\n'
-                          '        "severity": "High",\n'
-                          '        "mitigation": "Input validation"\n'
-                          '      }\n'
-                          '    ],\n'
-                          '    "data_protection": [\n'
-                          '      {\n'
-                          '        "data_type": "personal_info",\n'
-                          '        "measures": ["encryption", "access_control"]\n'
-                          '      }\n'
-                          '    ]\n'
-                          '  },\n'
-                          '  "security_requirements": ["Authentication", "Authorization"],\n'
-                          '  "compliance_considerations": ["GDPR", "CCPA"],\n'
-                          '  "recommendations": ["Implement rate limiting"]\n'
-                          '}'
+        logger.info("Analyzing security for: %.50s...", feature_description)
+        risks, requirements = await asyncio.gather(
+            self._run_agent_task_routed(
+                True,
+                agent=analyst,
+                description=SECURITY_RISK_DESCRIPTION.format(**inputs),
+                expected_output=SECURITY_RISK_EXPECTED_OUTPUT,
+                context="Security Risk Assessment",
+                agent_type="security_analyst",
+                validate=self._validate_security_risks,
+                response_schema=SECURITY_RISK_SCHEMA
+            ),
+            self._run_agent_task_routed(
+                True,
+                agent=analyst,
+                description=SECURITY_REQUIREMENTS_DESCRIPTION.format(**inputs),
+                expected_output=SECURITY_REQUIREMENTS_EXPECTED_OUTPUT,
+                context="Security Requirements",
+                agent_type="security_analyst",
+                validate=self._validate_security_requirements,
+                response_schema=SECURITY_REQUIREMENTS_SCHEMA
+            )
         )
+        
+        # Both halves are needed for a complete analysis; report the first failure
+        for part in (risks, requirements):
+            if "error" in part:
+                return part
+        return {**risks, **requirements}
 
-        crew = Crew(
-            agents=[analyst],
-            tasks=[analysis_task],
-            verbose=0
+    async def analyze_quality(self, feature_description: str, user_stories: List[Dict],
+                              technical_specs: Dict, data_handling: Dict = None,
+                              context: str = "", use_cache: bool = True) -> Dict[str, dict]:
+        """
+        Design the test strategy and analyze security for a feature concurrently.
+
+        Neither agent needs the other's answer, so their LLM calls run side by side and
+        the pair takes as long as the slower of the two rather than their sum.
+
+        Args:
+            feature_description (str): Description of the feature
+            user_stories (List[Dict]): User stories to cover in testing
+            technical_specs (Dict): Technical specifications and implementation details
+            data_handling (Dict, optional): Information about data processing and storage
+            context (str, optional): Additional context about the project
+            use_cache (bool, optional): Reuse results made for identical inputs earlier
+
+        Returns:
+            Dict[str, dict]: 'test_strategy' and 'security_analysis', each the agent's
+            result or an ErrorSchema dict
+        """
+        test_strategy, security_analysis = await asyncio.gather(
+            self.design_test_strategy(feature_description, user_stories, technical_specs, context, use_cache),
+            self.analyze_security(feature_description, technical_specs, data_handling, context, use_cache)
         )
+        return {
+            "test_strategy": test_strategy,
+            "security_analysis": security_analysis
+        }
 
+    def _validate_test_strategy(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check a parsed test strategy, returning it or an ErrorSchema dict."""
         try:
-            logger.info(f"Analyzing security for: {feature_description[:50]}...")
-            result = crew.kickoff()
-            
-            parsed_json = robust_json_parser(str(result), context="Security Analysis")
-            if parsed_json:
-                # Check for successful structure AND absence of an 'error' key from LLM
-                if "risk_assessment" in parsed_json and isinstance(parsed_json["risk_assessment"], dict) and "error" not in parsed_json:
-                    return parsed_json # This is the successful data
-                else:
-                    # If "risk_assessment" is missing, or it's not a dict, OR if an "error" key is present in the parsed JSON
-                    logger.warning(f"Parsed JSON for security analysis is invalid or contains an error field. Output: {str(result)[:500]}")
-                    return ErrorSchema(
-                        error="Invalid JSON Structure or LLM Error",
-                        message="Parsed JSON for security analysis is missing 'risk_assessment' dict, has incorrect type, or contains an error indicator from the LLM.",
-                        agent_type="security_analyst",
-                        raw_output=str(result)
-                    ).model_dump(exclude_none=True)
-            else:
-                # robust_json_parser failed
-                logger.error(f"Failed to parse JSON from security analysis. Raw output: {str(result)[:500]}")
-                return ErrorSchema(
-                    error="JSON Parsing Error",
-                    message="Failed to parse JSON output from Security Analyst Agent.",
-                    agent_type="security_analyst",
-                    raw_output=str(result)
-                ).model_dump(exclude_none=True)
-                
-        except Exception as e:
-            logger.error(f"Error during security analysis: {e}", exc_info=True)
+            _TEST_STRATEGY_ADAPTER.validate_python(parsed_json)
+            return parsed_json
+        except ValidationError as e:
+            logger.warning("Parsed JSON for test strategy failed validation: %s. Output: %.500s", validation_error_paths(e), raw_output)
             return ErrorSchema(
-                error="Agent Execution Error",
-                message=f"An unexpected error occurred during security analysis: {str(e)}",
-                agent_type="security_analyst"
+                error="Invalid JSON Structure",
+                message="Parsed JSON for test strategy is missing 'test_levels' dict or has incorrect type.",
+                agent_type="qa_strategist",
+                raw_output=raw_output
             ).model_dump(exclude_none=True)
 
-if __name__ == "__main__":
-    import asyncio
-    
-    async def test_quality_agents():
-        agents = QualityAgents()
-        
-        if not agents.has_valid_llm():
-            print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
-            return
-            
-        # Test data
-        feature = {
-            "description": "User authentication system with OAuth",
-            "user_stories": [
-                {
-                    "role": "user",
-                    "goal": "log in with Google account",
-                    "benefit": "quick and secure access"
-                }
-            ],
-            "technical_specs": {
-                "auth_provider": "OAuth2",
-                "user_data": ["email", "profile"],
-                "session_management": "JWT"
-            }
-        }
-        
-        # Test test strategy design
-        test_strategy = await agents.design_test_strategy(
-            feature_description=feature["description"],
-            user_stories=feature["user_stories"],
-            technical_specs=feature["technical_specs"]
-        )
-        print("\nTest Strategy Result:")
-        print(json.dumps(test_strategy, indent=2))
-        
-        # Test security analysis
-        if not test_strategy.get("error"):
-            security_analysis = await agents.analyze_security(
-                feature_description=feature["description"],
-                technical_specs=feature["technical_specs"]
-            )
-            print("\nSecurity Analysis Result:")
-            print(json.dumps(security_analysis, indent=2))
-            
-    # Run the test
-    asyncio.run(test_quality_agents())
+    def _validate_security_risks(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check the risk half of a security analysis, returning it or an ErrorSchema dict."""
+        # Check for successful structure AND absence of an 'error' key from LLM
+        if isinstance(parsed_json, dict) and "error" not in parsed_json:
+            try:
+                _SECURITY_RISK_ADAPTER.validate_python(parsed_json)
+                return {"risk_assessment": parsed_json["risk_assessment"]}
+            except ValidationError as e:
+                logger.warning("Parsed JSON for security risk assessment failed validation: %s. Output: %.500s", validation_error_paths(e), raw_output)
+        else:
+            logger.warning("Parsed JSON for security risk assessment is invalid or contains an error field. Output: %.500s", raw_output)
+        return ErrorSchema(
+            error="Invalid JSON Structure or LLM Error",
+            message="Parsed JSON for security analysis is missing 'risk_assessment' dict, has incorrect type, or contains an error indicator from the LLM.",
+            agent_type="security_analyst",
+            raw_output=raw_output
+        ).model_dump(exclude_none=True)
+
+    def _validate_security_requirements(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check the requirements half of a security analysis, returning it or an ErrorSchema dict."""
+        try:
+            _SECURITY_REQUIREMENTS_ADAPTER.validate_python(parsed_json)
+            return {field: parsed_json[field] for field in _SecurityRequirementsOutput.model_fields}
+        except ValidationError as e:
+            logger.warning("Parsed JSON for security requirements failed validation: %s. Output: %.500s", validation_error_paths(e), raw_output)
+        return ErrorSchema(
+            error="Invalid JSON Structure",
+            message="Parsed JSON for security requirements is missing 'security_requirements', 'compliance_considerations' or 'recommendations' list.",
+            agent_type="security_analyst",
+            raw_output=raw_output
+        ).model_dump(exclude_none=True)
@@ -1,38 +1,139 @@
-from typing import Optional, Dict, Union # Added Dict, Union
-from crewai import Agent, Task, Crew
-import json
+from typing import Optional, Dict, List, Union # Added Dict, Union
+from crewai import Agent
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
 import logging
-from ..agent_base import AgentBase
+from ..agent_base import AgentBase, get_llm_semaphore, call_with_retries, mark_cached_prefix, run_many
+from ..result_cache import result_cache
+from ....core.config import settings
+from ....utils import normalize_text
 from ....utils.json_parser import robust_json_parser # Import the new parser
 from ....api.v1.schemas import ErrorSchema # Import ErrorSchema for typing and structure
 
 logger = logging.getLogger(__name__)
 
+# Response schema for the provider's JSON mode; constrains output to the two expected keys
+TASK_ANALYSIS_SCHEMA = {
+    "name": "task_analysis",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "category": {"type": "string", "enum": settings.VALID_CATEGORIES},
+            "priority": {"type": "string", "enum": settings.VALID_PRIORITIES}
+        },
+        "required": ["category", "priority"]
+    }
+}
+
+# Batched variant: one entry per input task, matched back to it by 'index'
+TASK_ANALYSIS_BATCH_SCHEMA = {
+    "name": "task_analysis_batch",
+    "schema": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "index": {"type": "integer"},
+                "category": {"type": "string", "enum": settings.VALID_CATEGORIES},
+                "priority": {"type": "string", "enum": settings.VALID_PRIORITIES}
+            },
+            "required": ["index", "category", "priority"]
+        }
+    }
+}
+
+ANALYZER_ROLE = "Task Analyzer Agent"
+ANALYZER_BACKSTORY = ("You are an expert project management assistant. Your strength lies in quickly "
+                      "understanding the nature of a software development task and assigning it an "
+                      "appropriate category and priority based on its description, user story, and any "
+                      "provided context. You aim for consistency and clarity. "
+                      "Predefined categories are: Bug Fix, Feature Request, Documentation, Research, Testing, Chore. "
+                      "Predefined priorities are: High, Medium, Low.")
+
+def _analyzer_goal(batch: bool) -> str:
+    """Build the analyzer's goal, asking for a single object or a per-task array."""
+    if batch:
+        output_rule = ("You MUST ONLY output a valid JSON array with one object per task, each with the keys "
+                       "'index', 'category' and 'priority'. ")
+    else:
+        output_rule = "You MUST ONLY output a single, valid JSON string with two keys: 'category' and 'priority'. "
+    return ("Analyze a given task description (and optional user story/context) to determine its category and priority. "
+            + output_rule +
+            "The 'category' MUST be one of: Bug Fix, Feature Request, Documentation, Research, Testing, Chore. "
+            "The 'priority' MUST be one of: High, Medium, Low.")
+
+def _analyzer_persona(batch: bool) -> str:
+    """System prompt for the analyzer, in the same shape CrewAI uses for an agent."""
+    return f"You are {ANALYZER_ROLE}. {ANALYZER_BACKSTORY}\nYour personal goal is: {_analyzer_goal(batch)}"
+
+# Prompts are parsed once at import; each analysis only fills in the task details, so identical
+# tasks always render to identical prompt bytes (and identical cache keys). The output format and
+# its example sit in the system message with the persona, so every call shares that whole prefix.
+ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _analyzer_persona(batch=False) + "\n\n"
+               "Return only a JSON object with 'category' and 'priority' keys.\n"
+               "Expected output: only the raw JSON object, without markdown or commentary. "
+               'For example: {{"category": "Bug Fix", "priority": "High"}}'),
+    ("human", "Analyze the following task details and determine its category and priority. "
+              "Description: '{description}'. "
+              "User Story: '{user_story}'. "
+              "Context: '{context}'.")
+])
+BATCH_ANALYSIS_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", _analyzer_persona(batch=True) + "\n\n"
+               "Return only a JSON array with one object per task, using the task's number as 'index'.\n"
+               "Expected output: only the raw JSON array, without markdown or commentary. For example: "
+               '[{{"index": 0, "category": "Bug Fix", "priority": "High"}}, '
+               '{{"index": 1, "category": "Documentation", "priority": "Low"}}]'),
+    ("human", "Analyze each of the following {count} tasks and determine its category and priority.\n"
+              "{listing}")
+])
+BATCH_ITEM_TEMPLATE = "[{index}] Description: '{description}'. User Story: '{user_story}'. Context: '{context}'."
+
 class TaskAnalyzerAgent(AgentBase):
     """Agent responsible for analyzing tasks and determining their category and priority."""
 
-    def make_agent(self) -> Agent:
+    def __init__(self):
+        super().__init__()
+        # Single agent, single task: the LLM is called directly with the module-level prompts
+        # rather than through a per-call Agent/Task/Crew
+        self.batch_chain = (
+            BATCH_ANALYSIS_PROMPT
+            | (lambda prompt: mark_cached_prefix(prompt.to_messages()))
+            | self.get_structured_llm(TASK_ANALYSIS_BATCH_SCHEMA)
+            | StrOutputParser()
+            if self.has_valid_llm() else None
+        )
+
+    def make_agent(self, batch: bool = False) -> Agent:
         """
         Create a task analyzer agent with specific role configuration.
         
+        Args:
+            batch (bool, optional): Configure the agent to analyze several tasks at once
+                and answer with a JSON array instead of a single object
+        
         Returns:
             Agent: Configured task analyzer agent instance
         """
         return self.create_agent(
-            role="Task Analyzer Agent",
-            goal="Analyze a given task description (and optional user story/context) to determine its category and priority. "
-                 "You MUST ONLY output a single, valid JSON string with two keys: 'category' and 'priority'. "
-                 "The 'category' MUST be one of: Bug Fix, Feature Request, Documentation, Research, Testing, Chore. "
-                 "The 'priority' MUST be one of: High, Medium, Low.",
-            backstory="You are an expert project management assistant. Your strength lies in quickly "
-                     "understanding the nature of a software development task and assigning it an "
-                     "appropriate category and priority based on its description, user story, and any "
-                     "provided context. You aim for consistency and clarity. "
-                     "Predefined categories are: Bug Fix, Feature Request, Documentation, Research, Testing, Chore. "
-                     "Predefined priorities are: High, Medium, Low."
+            role=ANALYZER_ROLE,
+            goal=_analyzer_goal(batch),
+            backstory=ANALYZER_BACKSTORY,
+            response_schema=TASK_ANALYSIS_BATCH_SCHEMA if batch else TASK_ANALYSIS_SCHEMA
         )
 
-    async def analyze_task(self, description: str, user_story: str = "", context: str = "") -> dict:
+    @staticmethod
+    def _analysis_inputs(description: str, user_story: Optional[str] = "", context: Optional[str] = "") -> Dict[str, str]:
+        """The task details as they appear in the prompt, which is all an analysis depends on."""
+        return {
+            "description": normalize_text(description),
+            "user_story": normalize_text(user_story),
+            "context": normalize_text(context)
+        }
+
+    async def analyze_task(self, description: str, user_story: str = "", context: str = "",
+                           use_cache: bool = True) -> dict:
         """
         Analyze a task using the task analyzer agent.
         
@@ -40,10 +141,22 @@ class TaskAnalyzerAgent(AgentBase):
             description (str): The task description to analyze
             user_story (str, optional): Related user story for context
             context (str, optional): Additional context about the task
+            use_cache (bool, optional): Reuse the analysis of an equivalent task made earlier;
+                identical analyses already running are joined rather than repeated
             
         Returns:
             dict: Analysis result with 'category' and 'priority' keys, plus optional 'error' key
         """
+        inputs = self._analysis_inputs(description, user_story, context)
+        return await self._cached_result(
+            "analyze_task",
+            inputs,
+            lambda: self._analyze_task(**inputs),
+            use_cache
+        )
+
+    async def _analyze_task(self, description: str, user_story: str, context: str) -> dict:
+        """Run the task analysis on normalized task details; see analyze_task."""
         if not self.has_valid_llm():
             logger.warning("Task analyzer agent has no valid LLM configuration")
             # For this agent, the return type in TaskService is directly Dict[str, Optional[str]]
@@ -56,30 +169,19 @@ class TaskAnalyzerAgent(AgentBase):
                 "error": "LLM Error: LLM not configured or initialization failed for Task Analyzer Agent."
             }
 
-        analyzer = self.make_agent()
-        
-        analysis_task = Task(
-            description=f"Analyze the following task details and determine its category and priority. "
-                      f"Description: '{description}'. "
-                      f"User Story: '{user_story}'. "
-                      f"Context: '{context}'. "
-                      f"Return the category and priority as a JSON string with 'category' and 'priority' keys.",
-            agent=analyzer,
-            expected_output="A JSON string containing the 'category' and 'priority'. For example: "
-                          '"{ \\"category\\": \\"Bug Fix\\", \\"priority\\": \\"High\\" }"'
-        )
-
-        crew = Crew(
-            agents=[analyzer],
-            tasks=[analysis_task],
-            verbose=0
-        )
+        # Case, whitespace and trailing punctuation don't change the analysis, so equivalent
+        # tasks render to the same prompt and hit the same LLM cache entry
+        messages = mark_cached_prefix(ANALYSIS_PROMPT.format_messages(
+            description=description,
+            user_story=user_story,
+            context=context
+        ))
 
         try:
-            logger.info(f"Analyzing task: {description[:50]}...")
-            result = crew.kickoff()
+            logger.info("Analyzing task: %.50s...", description)
+            result = await self._stream_json_object(messages, self.get_structured_llm(TASK_ANALYSIS_SCHEMA))
             
-            parsed_json = robust_json_parser(str(result), context="Task Analysis (Category/Priority)")
+            parsed_json = robust_json_parser(result, context="Task Analysis (Category/Priority)")
             
             if parsed_json:
                 category = parsed_json.get("category")
@@ -87,7 +189,7 @@ class TaskAnalyzerAgent(AgentBase):
                 llm_error = parsed_json.get("error") # Check if LLM included an error field
 
                 if llm_error: # If LLM itself reported an error in its JSON
-                    logger.warning(f"LLM reported an error in its JSON for task analysis: {llm_error}. Output: {str(result)[:500]}")
+                    logger.warning("LLM reported an error in its JSON for task analysis: %s. Output: %.500s", llm_error, result)
                     return {
                         "category": None,
                         "priority": None,
@@ -102,14 +204,14 @@ class TaskAnalyzerAgent(AgentBase):
                         "error": None # Explicitly set error to None on success
                     }
                 else: # Keys missing, structure is invalid
-                    logger.warning(f"Parsed JSON for task analysis is missing 'category' or 'priority'. Output: {str(result)[:500]}")
+                    logger.warning("Parsed JSON for task analysis is missing 'category' or 'priority'. Output: %.500s", result)
                     return {
                         "category": None,
                         "priority": None,
                         "error": "Invalid JSON Structure: Parsed JSON for task analysis is missing 'category' or 'priority'."
                     }
             else: # robust_json_parser failed
-                logger.error(f"Failed to parse JSON from task analysis. Raw output: {str(result)[:500]}")
+                logger.error("Failed to parse JSON from task analysis. Raw output: %.500s", result)
                 return {
                     "category": None,
                     "priority": None,
@@ -117,41 +219,121 @@ class TaskAnalyzerAgent(AgentBase):
                 }
                 
         except Exception as e:
-            logger.error(f"Error during task analysis: {e}", exc_info=True)
+            logger.error("Error during task analysis: %s: %s", type(e).__name__, e)
+            logger.debug("Task analysis traceback", exc_info=True)
             return {
                 "category": None,
                 "priority": None,
                 "error": f"Agent Execution Error: An unexpected error occurred during task analysis: {str(e)}"
             }
 
-
-if __name__ == "__main__":
-    import asyncio
-    
-    async def test_analyzer():
-        analyzer = TaskAnalyzerAgent()
+    async def analyze_tasks(self, items: List[Dict[str, str]]) -> List[dict]:
+        """
+        Analyze any number of tasks, one LLM call per TASK_ANALYSIS_BATCH_SIZE tasks.
         
-        if not analyzer.has_valid_llm():
-            print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
-            return
+        Meant for bulk classification (e.g. an imported task list): the calls run concurrently,
+        bounded by the shared LLM semaphore, instead of one request per task in a loop.
+        
+        Args:
+            items (List[Dict[str, str]]): Tasks to analyze, each with a 'description' and
+                optional 'user_story' and 'context'
             
-        test_task = {
-            "description": "The login button is not responding on the main page after recent deployment",
-            "user_story": "As a user, I want to be able to log in to access my account",
-            "context": "This is affecting all users trying to access the platform"
-        }
+        Returns:
+            List[dict]: One result per item, in input order, shaped like the result of analyze_task
+        """
+        size = settings.TASK_ANALYSIS_BATCH_SIZE
+        chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        results = await run_many(self.analyze_task_batch(chunk) for chunk in chunks)
+        return [result for chunk_results in results for result in chunk_results]
+
+    async def analyze_task_batch(self, items: List[Dict[str, str]]) -> List[dict]:
+        """
+        Analyze several tasks with a single LLM call.
         
-        result = await analyzer.analyze_task(
-            description=test_task["description"],
-            user_story=test_task["user_story"],
-            context=test_task["context"]
-        )
+        Tasks analyzed before are answered from the result cache, and a task that appears
+        more than once in the batch is sent to the LLM only once.
         
-        print("\nAnalysis Result:")
-        print(f"Category: {result.get('category')}")
-        print(f"Priority: {result.get('priority')}")
-        if result.get('error'):
-            print(f"Error: {result.get('error')}")
+        Args:
+            items (List[Dict[str, str]]): Tasks to analyze, each with a 'description' and
+                optional 'user_story' and 'context'
             
-    # Run the test
-    asyncio.run(test_analyzer())
+        Returns:
+            List[dict]: One result per item, in input order, shaped like the result of analyze_task
+        """
+        keys = [
+            result_cache.make_key("analyze_task", self._analysis_inputs(
+                item["description"], item.get("user_story"), item.get("context")
+            ))
+            for item in items
+        ]
+        results = [result_cache.get(key) for key in keys]
+        pending: Dict[str, Dict[str, str]] = {}
+        for key, item, result in zip(keys, items, results):
+            if result is None:
+                pending.setdefault(key, item)
+        if not pending:
+            return results
+            
+        answers = dict(zip(pending, await self._analyze_task_batch(list(pending.values()))))
+        for key, answer in answers.items():
+            if not answer.get("error"):
+                result_cache.set(key, answer)
+        return [result if result is not None else dict(answers[key]) for key, result in zip(keys, results)]
+
+    async def _analyze_task_batch(self, items: List[Dict[str, str]]) -> List[dict]:
+        """Analyze distinct, uncached tasks with a single LLM call; see analyze_task_batch."""
+        if len(items) == 1:
+            item = items[0]
+            return [await self.analyze_task(
+                description=item["description"],
+                user_story=item.get("user_story", ""),
+                context=item.get("context", "")
+            )]
+
+        def error_results(message: str) -> List[dict]:
+            return [{"category": None, "priority": None, "error": message} for _ in items]
+
+        if not self.has_valid_llm():
+            logger.warning("Task analyzer agent has no valid LLM configuration")
+            return error_results("LLM Error: LLM not configured or initialization failed for Task Analyzer Agent.")
+
+        listing = "\n".join(
+            BATCH_ITEM_TEMPLATE.format(
+                index=index,
+                description=normalize_text(item["description"]),
+                user_story=normalize_text(item.get("user_story")),
+                context=normalize_text(item.get("context"))
+            )
+            for index, item in enumerate(items)
+        )
+
+        try:
+            logger.info("Analyzing batch of %d tasks...", len(items))
+            async def attempt() -> str:
+                async with get_llm_semaphore():
+                    return await self.batch_chain.ainvoke({"count": len(items), "listing": listing})
+            result = await call_with_retries(attempt, "Batched task analysis")
+            
+            parsed_json = robust_json_parser(result, context="Task Analysis Batch (Category/Priority)")
+            if not isinstance(parsed_json, list):
+                logger.error("Failed to parse JSON array from batched task analysis. Raw output: %.500s", result)
+                return error_results("JSON Parsing Error: Failed to parse JSON output from Task Analyzer Agent.")
+            
+            results = error_results("Invalid JSON Structure: Batched task analysis returned no entry for this task.")
+            for entry in parsed_json:
+                if not isinstance(entry, dict):
+                    continue
+                index = entry.get("index")
+                if (isinstance(index, int) and 0 <= index < len(items) and
+                        entry.get("category") is not None and entry.get("priority") is not None):
+                    results[index] = {
+                        "category": entry["category"],
+                        "priority": entry["priority"],
+                        "error": None
+                    }
+            return results
+                
+        except Exception as e:
+            logger.error("Error during batched task analysis: %s: %s", type(e).__name__, e)
+            logger.debug("Batched task analysis traceback", exc_info=True)
+            return error_results(f"Agent Execution Error: An unexpected error occurred during task analysis: {str(e)}")
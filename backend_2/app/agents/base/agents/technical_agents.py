@@ -1,16 +1,115 @@
-from typing import Optional, Dict, Any, List, Union
+from typing import Optional, Dict, Any, List, Union, Callable
+from functools import cached_property
 from crewai import Agent, Task, Crew
-import json
 import logging
-from ..agent_base import AgentBase
-from ....utils.json_parser import robust_json_parser # Import the new parser
+from ..agent_base import AgentBase, JSON_OBJECT_FORMAT, run_many
+from ..batch import BatchProcessor
+from ....utils.json_parser import robust_json_parser, dumps_compact # Import the new parser
 from ....api.v1.schemas import ErrorSchema # Import ErrorSchema for typing and structure
 
 logger = logging.getLogger(__name__)
 
+# Prompt text is built once at import; each call only fills in its inputs, after the fixed
+# instructions, so every run of an agent starts with the same text (a cacheable prefix)
+DB_DESIGN_DESCRIPTION = ("Design a database schema based on the user stories below.\n"
+                         "Create a JSON object defining the database schema. The main key should be 'tables', containing a list of table objects.\n"
+                         "Each table object must have 'name' (string), 'fields' (list of field objects), and can optionally have 'relationships' (list of relationship objects) and 'indexes' (list of strings).\n"
+                         "Each field object must have 'name' (string) and 'type' (string, e.g., VARCHAR(255), INTEGER, TEXT, BOOLEAN, TIMESTAMP, UUID). Optional field attributes are 'primary_key' (boolean), 'indexed' (boolean, but prefer defining specific indexes in the table's 'indexes' list), 'unique' (boolean), 'not_null' (boolean), 'default' (any), and 'description' (string).\n"
+                         "Each relationship object (if present) should specify 'table' (string, related table name), 'type' (string, e.g., 'one_to_one', 'one_to_many'), and 'foreign_key' (string, column name).\n"
+                         "The 'indexes' field for a table (if present) must be a list of strings. Each string represents a column to be indexed (e.g., 'email') or a comma-separated list of columns for a composite index (e.g., 'user_id,order_date').\n"
+                         "Optionally, include a top-level 'recommendations' key with a list of strings for best practices.\n"
+                         "User Stories: {user_stories}\n"
+                         "Context: {context}")
+DB_DESIGN_EXPECTED_OUTPUT = ('A JSON object containing database design. Example:\n'
+                             '{\n'
+                             '  "tables": [\n'
+                             '    {\n'
+                             '      "name": "users",\n'
+                             '      "fields": [\n'
+                             '        {"name": "id", "type": "uuid", "primary_key": true},\n'
+                             '        {"name": "email", "type": "varchar", "indexed": true}\n'
+                             '      ],\n'
+                             '      "relationships": [\n'
+                             '        {"table": "profiles", "type": "one_to_one"}\n'
+                             '      ],\n'
+                             '      "indexes": ["email"]\n'
+                             '    }\n'
+                             '  ],\n'
+                             '  "recommendations": ["Add composite index for search performance"]\n'
+                             '}')
+
+TASK_BREAKDOWN_DESCRIPTION = ("Break down this feature into technical tasks:\n"
+                              "Feature: {feature}\n"
+                              "User Stories: {user_stories}\n"
+                              "Database Design: {database_design}\n"
+                              "Context: {context}\n"
+                              "Create a JSON object with implementation tasks and technical considerations.")
+TASK_BREAKDOWN_EXPECTED_OUTPUT = ('A JSON object containing tasks breakdown. Example:\n'
+                                  '{\n'
+                                  '  "tasks": [\n'
+                                  '    {\n'
+                                  '      "id": "BE-1",\n'
+                                  '      "title": "Implement user model",\n'
+                                  '      "description": "Create user model with fields...",\n'
+                                  '      "type": "backend",\n'
+                                  '      "dependencies": [],\n'
+                                  '      "estimated_hours": 4\n'
+                                  '    }\n'
+                                  '  ],\n'
+                                  '  "technical_considerations": ["API versioning needed"],\n'
+                                  '  "architectural_decisions": ["Use repository pattern"]\n'
+                                  '}')
+
+CODE_REVIEW_DESCRIPTION = ("Review these implementation tasks and code snippets:\n"
+                           "Tasks: {tasks}\n"
+                           "Code Snippets: {code_snippets}\n"
+                           "Provide a JSON object with code review feedback and recommendations.")
+CODE_REVIEW_EXPECTED_OUTPUT = ('A JSON object containing review feedback. Example:\n'
+                               '{\n'
+                               '  "feedback": [\n'
+                               '    {\n'
+                               '      "file": "user_model.py",\n'
+                               '      "line": 23,\n'
+                               '      "type": "suggestion",\n'
+                               '      "message": "Consider adding input validation"\n'
+                               '    }\n'
+                               '  ],\n'
+                               '  "best_practices": ["Add error handling"],\n'
+                               '  "security_considerations": ["Sanitize user input"]\n'
+                               '}')
+
+CODE_REVIEW_BATCH_ITEM = ("#{number}:\n"
+                          "Tasks: {tasks}\n"
+                          "Code Snippets: {code_snippets}")
+CODE_REVIEW_BATCH_DESCRIPTION = ("Review each of these {count} sets of implementation tasks and code snippets "
+                                 "separately:\n"
+                                 "{listing}\n"
+                                 "Create a JSON array with one code review per set, tagged with its id.")
+CODE_REVIEW_BATCH_EXPECTED_OUTPUT = ('A JSON array with one code review per set. Example:\n'
+                                     '[\n'
+                                     '  {\n'
+                                     '    "id": "#1",\n'
+                                     '    "feedback": [\n'
+                                     '      {"file": "user_model.py", "line": 23, "type": "suggestion", "message": "Consider adding input validation"}\n'
+                                     '    ],\n'
+                                     '    "best_practices": ["Add error handling"],\n'
+                                     '    "security_considerations": ["Sanitize user input"]\n'
+                                     '  }\n'
+                                     ']')
+
+def story_digest(user_stories: List[Any]) -> str:
+    """One 'role: goal' line per story, short enough for the semantic cache to embed whole."""
+    return "\n".join(
+        f"{story.get('role', '')}: {story.get('goal', '')}" if isinstance(story, dict) else str(story)
+        for story in user_stories
+    )
+
 class TechnicalAgents(AgentBase):
     """Technical agents for architecture and implementation planning."""
 
+    # Items per batched prompt; beyond this, answer quality drops faster than the shared prompt saves
+    MAX_BATCH_SIZE = 8
+
     def make_db_architect(self) -> Agent:
         """
         Create a database architect agent for schema design.
@@ -26,7 +125,8 @@ class TechnicalAgents(AgentBase):
                      "scalable database schemas for modern web applications. You excel at understanding "
                      "complex data relationships and optimizing for both performance and maintainability. "
                      "You consider factors like data integrity, scalability, and query optimization in "
-                     "your designs."
+                     "your designs.",
+            response_schema=JSON_OBJECT_FORMAT
         )
 
     def make_tech_lead(self) -> Agent:
@@ -43,7 +143,8 @@ class TechnicalAgents(AgentBase):
             backstory="You are a seasoned full-stack developer and software architect with years of "
                      "experience leading development teams. You excel at breaking down complex features "
                      "into manageable tasks while ensuring architectural consistency and code quality. "
-                     "You always consider scalability, maintainability, and testing in your planning."
+                     "You always consider scalability, maintainability, and testing in your planning.",
+            response_schema=JSON_OBJECT_FORMAT
         )
 
     def make_code_reviewer(self) -> Agent:
@@ -60,20 +161,51 @@ class TechnicalAgents(AgentBase):
             backstory="You are a senior developer with expertise in code quality and software design "
                      "patterns. You have extensive experience reviewing code across various languages "
                      "and frameworks. You focus on maintainability, readability, and adherence to "
-                     "best practices while being pragmatic about real-world constraints."
+                     "best practices while being pragmatic about real-world constraints.",
+            response_schema=JSON_OBJECT_FORMAT
         )
 
-    async def design_database(self, user_stories: List[Dict], context: str = "") -> dict:
+    # Built once per instance like the other agent groups; each run gets a shallow copy
+    @cached_property
+    def db_architect(self) -> Agent:
+        """Cached database architect agent; copy it before handing it to a crew."""
+        return self.make_db_architect()
+
+    @cached_property
+    def tech_lead(self) -> Agent:
+        """Cached tech lead agent; copy it before handing it to a crew."""
+        return self.make_tech_lead()
+
+    @cached_property
+    def code_reviewer(self) -> Agent:
+        """Cached code reviewer agent; copy it before handing it to a crew."""
+        return self.make_code_reviewer()
+
+    async def design_database(self, user_stories: List[Dict], context: str = "",
+                              use_cache: bool = True) -> dict:
         """
         Design database schema based on user stories using the DB architect agent.
         
         Args:
             user_stories (List[Dict]): List of user stories to base the schema on
             context (str, optional): Additional context about the project
+            use_cache (bool, optional): Reuse the design made for identical inputs earlier (or,
+                with AGENT_SEMANTIC_CACHE, for reworded but near-identical user stories)
             
         Returns:
             dict: Database design recommendations and schema
         """
+        stories_json = dumps_compact(user_stories)
+        return await self._cached_result(
+            "design_database",
+            {"user_stories": user_stories, "context": context},
+            lambda: self._design_database(stories_json, context),
+            use_cache,
+            similarity_text=f"{story_digest(user_stories)}\n{context}"
+        )
+
+    async def _design_database(self, stories_json: str, context: str) -> dict:
+        """Run the DB architect agent on already serialized user stories; see design_database."""
         if not self.has_valid_llm():
             logger.warning("DB architect agent has no valid LLM configuration")
             return ErrorSchema(
@@ -82,82 +214,40 @@ class TechnicalAgents(AgentBase):
                 agent_type="db_architect"
             ).model_dump(exclude_none=True)
 
-        architect = self.make_db_architect()
-        
-        design_task = Task(
-            description=(
-                f"Design a database schema based on these user stories:\n"
-                f"{json.dumps(user_stories, indent=2)}\n"
-                f"Context: {context}\n"
-                f"Create a JSON object defining the database schema. The main key should be 'tables', containing a list of table objects.\n"
-                f"Each table object must have 'name' (string), 'fields' (list of field objects), and can optionally have 'relationships' (list of relationship objects) and 'indexes' (list of strings).\n"
-                f"Each field object must have 'name' (string) and 'type' (string, e.g., VARCHAR(255), INTEGER, TEXT, BOOLEAN, TIMESTAMP, UUID). Optional field attributes are 'primary_key' (boolean), 'indexed' (boolean, but prefer defining specific indexes in the table's 'indexes' list), 'unique' (boolean), 'not_null' (boolean), 'default' (any), and 'description' (string).\n"
-                f"Each relationship object (if present) should specify 'table' (string, related table name), 'type' (string, e.g., 'one_to_one', 'one_to_many'), and 'foreign_key' (string, column name).\n"
-                f"The 'indexes' field for a table (if present) must be a list of strings. Each string represents a column to be indexed (e.g., 'email') or a comma-separated list of columns for a composite index (e.g., 'user_id,order_date').\n"
-                f"Optionally, include a top-level 'recommendations' key with a list of strings for best practices."
+        logger.info("Designing database schema...")
+        return await self._run_agent_task(
+            self.db_architect.model_copy(),
+            description=DB_DESIGN_DESCRIPTION.format(
+                user_stories=stories_json,
+                context=context
             ),
-            agent=architect,
-            expected_output='A JSON object containing database design. Example:\n'
-                          '{\n'
-                          '  "tables": [\n'
-                          '    {\n'
-                          '      "name": "users",\n'
-                          '      "fields": [\n'
-                          '        {"name": "id", "type": "uuid", "primary_key": true},\n'
-                          '        {"name": "email", "type": "varchar", "indexed": true}\n'
-                          '      ],\n'
-                          '      "relationships": [\n'
-                          '        {"table": "profiles", "type": "one_to_one"}\n'
-                          '      ],\n'
-                          '      "indexes": ["email"]\n'
-                          '    }\n'
-                          '  ],\n'
-                          '  "recommendations": ["Add composite index for search performance"]\n'
-                          '}'
+            expected_output=DB_DESIGN_EXPECTED_OUTPUT,
+            context="DB Schema Design",
+            agent_type="db_architect",
+            validate=self._validate_database_design,
+            response_schema=JSON_OBJECT_FORMAT
         )
 
-        crew = Crew(
-            agents=[architect],
-            tasks=[design_task],
-            verbose=0
-        )
-
-        try:
-            logger.info("Designing database schema...")
-            result = crew.kickoff()
+    async def design_database_bulk(self, designs: List[Dict[str, Any]],
+                                   on_progress: Optional[Callable[[int, int], None]] = None) -> List[dict]:
+        """
+        Design database schemas for many features at once, e.g. every feature of an epic.
+        
+        Each design is its own design_database call (with its caching and coalescing); a
+        BatchProcessor runs them concurrently within the concurrency and rate limits.
+        
+        Args:
+            designs (List[Dict]): One dict per feature with 'user_stories' and optional 'context'
+            on_progress (Callable, optional): Called with (designs done, total designs)
             
-            parsed_json = robust_json_parser(str(result), context="DB Schema Design")
-            if parsed_json:
-                # Basic validation: check if 'tables' key exists, adapt as needed
-                if "tables" in parsed_json and isinstance(parsed_json["tables"], list):
-                    return parsed_json
-                else:
-                    logger.warning(f"Parsed JSON for DB schema design is missing 'tables' list. Output: {str(result)[:500]}")
-                    return ErrorSchema(
-                        error="Invalid JSON Structure",
-                        message="Parsed JSON for DB schema design is missing 'tables' list or has incorrect type.",
-                        agent_type="db_architect",
-                        raw_output=str(result)
-                    ).model_dump(exclude_none=True)
-            else:
-                logger.error(f"Failed to parse JSON from DB schema design. Raw output: {str(result)[:500]}")
-                return ErrorSchema(
-                    error="JSON Parsing Error",
-                    message="Failed to parse JSON output from DB Architect Agent.",
-                    agent_type="db_architect",
-                    raw_output=str(result)
-                ).model_dump(exclude_none=True)
-                
-        except Exception as e:
-            logger.error(f"Error during schema design: {e}", exc_info=True)
-            return ErrorSchema(
-                error="Agent Execution Error",
-                message=f"An unexpected error occurred during DB schema design: {str(e)}",
-                agent_type="db_architect"
-            ).model_dump(exclude_none=True)
+        Returns:
+            List[dict]: One database design (or ErrorSchema dict) per input, in input order
+        """
+        return await BatchProcessor().run_batch(self.design_database, designs, on_progress=on_progress)
 
     async def break_down_tasks(self, feature_description: str, user_stories: List[Dict], 
-                             database_design: Dict, context: str = "") -> Union[dict, ErrorSchema]:
+                             database_design: Dict, context: str = "",
+                             use_cache: bool = True) -> Union[dict, ErrorSchema]:
         """
         Break down implementation into technical tasks using the tech lead agent.
         
@@ -166,10 +256,26 @@ class TechnicalAgents(AgentBase):
             user_stories (List[Dict]): User stories to implement
             database_design (Dict): Database schema design
             context (str, optional): Additional context
+            use_cache (bool, optional): Reuse the breakdown made for identical inputs earlier
             
         Returns:
             dict: Technical tasks and implementation plan
         """
+        return await self._cached_result(
+            "break_down_tasks",
+            {
+                "feature": feature_description,
+                "user_stories": user_stories,
+                "database_design": database_design,
+                "context": context
+            },
+            lambda: self._break_down_tasks(feature_description, user_stories, database_design, context),
+            use_cache
+        )
+
+    async def _break_down_tasks(self, feature_description: str, user_stories: List[Dict],
+                                database_design: Dict, context: str) -> Union[dict, ErrorSchema]:
+        """Run the tech lead agent; see break_down_tasks."""
         if not self.has_valid_llm():
             logger.warning("Tech lead agent has no valid LLM configuration")
             return ErrorSchema(
@@ -178,84 +284,44 @@ class TechnicalAgents(AgentBase):
                 agent_type="tech_lead"
             ).model_dump(exclude_none=True)
 
-        tech_lead = self.make_tech_lead()
-        
-        planning_task = Task(
-            description=f"Break down this feature into technical tasks:\n"
-                      f"Feature: {feature_description}\n"
-                      f"User Stories: {json.dumps(user_stories, indent=2)}\n"
-                      f"Database Design: {json.dumps(database_design, indent=2)}\n"
-                      f"Context: {context}\n"
-                      f"Create a JSON object with implementation tasks and technical considerations.",
-            agent=tech_lead,
-            expected_output='A JSON object containing tasks breakdown. Example:\n'
-                          '{\n'
-                          '  "tasks": [\n'
-                          '    {\n'
-                          '      "id": "BE-1",\n'
-                          '      "title": "Implement user model",\n'
-                          '      "description": "Create user model with fields...",\n'
-                          '      "type": "backend",\n'
-                          '      "dependencies": [],\n'
-                          '      "estimated_hours": 4\n'
-                          '    }\n'
-                          '  ],\n'
-                          '  "technical_considerations": ["API versioning needed"],\n'
-                          '  "architectural_decisions": ["Use repository pattern"]\n'
-                          '}'
-        )
-
-        crew = Crew(
-            agents=[tech_lead],
-            tasks=[planning_task],
-            verbose=0
+        logger.info("Breaking down tasks for: %.50s...", feature_description)
+        return await self._run_agent_task(
+            self.tech_lead.model_copy(),
+            description=TASK_BREAKDOWN_DESCRIPTION.format(
+                feature=feature_description,
+                user_stories=dumps_compact(user_stories),
+                database_design=dumps_compact(database_design),
+                context=context
+            ),
+            expected_output=TASK_BREAKDOWN_EXPECTED_OUTPUT,
+            context="Task Breakdown",
+            agent_type="tech_lead",
+            validate=self._validate_task_breakdown,
+            response_schema=JSON_OBJECT_FORMAT
         )
 
-        try:
-            logger.info(f"Breaking down tasks for: {feature_description[:50]}...")
-            result = crew.kickoff()
-            
-            parsed_json = robust_json_parser(str(result), context="Task Breakdown")
-            if parsed_json:
-                # Basic validation: check if 'tasks' key exists, adapt as needed
-                if "tasks" in parsed_json and isinstance(parsed_json["tasks"], list):
-                    return parsed_json
-                else:
-                    logger.warning(f"Parsed JSON for task breakdown is missing 'tasks' list. Output: {str(result)[:500]}")
-                    return ErrorSchema(
-                        error="Invalid JSON Structure",
-                        message="Parsed JSON for task breakdown is missing 'tasks' list or has incorrect type.",
-                        agent_type="tech_lead",
-                        raw_output=str(result)
-                    ).model_dump(exclude_none=True)
-            else:
-                logger.error(f"Failed to parse JSON from task breakdown. Raw output: {str(result)[:500]}")
-                return ErrorSchema(
-                    error="JSON Parsing Error",
-                    message="Failed to parse JSON output from Tech Lead Agent.",
-                    agent_type="tech_lead",
-                    raw_output=str(result)
-                ).model_dump(exclude_none=True)
-                
-        except Exception as e:
-            logger.error(f"Error during task breakdown: {e}", exc_info=True)
-            return ErrorSchema(
-                error="Agent Execution Error",
-                message=f"An unexpected error occurred during task breakdown: {str(e)}",
-                agent_type="tech_lead"
-            ).model_dump(exclude_none=True)
-
-    async def review_implementation(self, tasks: List[Dict], code_snippets: List[Dict]) -> Union[dict, ErrorSchema]:
+    async def review_implementation(self, tasks: List[Dict], code_snippets: List[Dict],
+                                    use_cache: bool = True) -> Union[dict, ErrorSchema]:
         """
         Review implementation plan and code snippets using the code reviewer agent.
         
         Args:
             tasks (List[Dict]): Technical tasks to review
             code_snippets (List[Dict]): Code snippets to analyze
+            use_cache (bool, optional): Reuse the review made for identical inputs earlier
             
         Returns:
             dict: Code review feedback and recommendations
         """
+        return await self._cached_result(
+            "review_implementation",
+            {"tasks": tasks, "code_snippets": code_snippets},
+            lambda: self._review_implementation(tasks, code_snippets),
+            use_cache
+        )
+
+    async def _review_implementation(self, tasks: List[Dict], code_snippets: List[Dict]) -> Union[dict, ErrorSchema]:
+        """Run the code reviewer agent; see review_implementation."""
         if not self.has_valid_llm():
             logger.warning("Code reviewer agent has no valid LLM configuration")
             return ErrorSchema(
@@ -264,27 +330,93 @@ class TechnicalAgents(AgentBase):
                 agent_type="code_reviewer"
             ).model_dump(exclude_none=True)
 
-        reviewer = self.make_code_reviewer()
+        logger.info("Reviewing implementation plan...")
+        return await self._run_agent_task(
+            self.code_reviewer.model_copy(),
+            description=CODE_REVIEW_DESCRIPTION.format(
+                tasks=dumps_compact(tasks),
+                code_snippets=dumps_compact(code_snippets)
+            ),
+            expected_output=CODE_REVIEW_EXPECTED_OUTPUT,
+            context="Code Review",
+            agent_type="code_reviewer",
+            validate=self._validate_review,
+            response_schema=JSON_OBJECT_FORMAT
+        )
+
+    def _validate_database_design(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check a parsed database design, returning it or an ErrorSchema dict."""
+        # Basic validation: check if 'tables' key exists, adapt as needed
+        if isinstance(parsed_json, dict) and isinstance(parsed_json.get("tables"), list):
+            return parsed_json
+        logger.warning("Parsed JSON for DB schema design is missing 'tables' list. Output: %.500s", raw_output)
+        return ErrorSchema(
+            error="Invalid JSON Structure",
+            message="Parsed JSON for DB schema design is missing 'tables' list or has incorrect type.",
+            agent_type="db_architect",
+            raw_output=raw_output
+        ).model_dump(exclude_none=True)
+
+    def _validate_task_breakdown(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check a parsed task breakdown, returning it or an ErrorSchema dict."""
+        # Basic validation: check if 'tasks' key exists, adapt as needed
+        if isinstance(parsed_json, dict) and isinstance(parsed_json.get("tasks"), list):
+            return parsed_json
+        logger.warning("Parsed JSON for task breakdown is missing 'tasks' list. Output: %.500s", raw_output)
+        return ErrorSchema(
+            error="Invalid JSON Structure",
+            message="Parsed JSON for task breakdown is missing 'tasks' list or has incorrect type.",
+            agent_type="tech_lead",
+            raw_output=raw_output
+        ).model_dump(exclude_none=True)
+
+    def _validate_review(self, parsed_json: Any, raw_output: str) -> dict:
+        """Check a parsed code review, returning it or an ErrorSchema dict."""
+        # Check for successful structure AND absence of an 'error' key from LLM
+        if isinstance(parsed_json, dict) and isinstance(parsed_json.get("feedback"), list) and "error" not in parsed_json:
+            return parsed_json # This is the successful data
+        # If "feedback" is missing, or it's not a list, OR if an "error" key is present in the parsed JSON
+        logger.warning("Parsed JSON for code review is invalid or contains an error field. Output: %.500s", raw_output)
+        return ErrorSchema(
+            error="Invalid JSON Structure or LLM Error",
+            message="Parsed JSON for code review is missing 'feedback' list, has incorrect type, or contains an error indicator from the LLM.",
+            agent_type="code_reviewer",
+            raw_output=raw_output
+        ).model_dump(exclude_none=True)
+
+    async def review_implementation_batch(self, reviews: List[Dict[str, List[Dict]]]) -> List[dict]:
+        """
+        Review several sets of tasks and code snippets, sharing one prompt per batch of MAX_BATCH_SIZE.
         
+        Args:
+            reviews (List[Dict]): One dict per review with 'tasks' and 'code_snippets'
+            
+        Returns:
+            List[dict]: One code review (or ErrorSchema dict) per input, in input order
+        """
+        chunks = [reviews[i:i + self.MAX_BATCH_SIZE] for i in range(0, len(reviews), self.MAX_BATCH_SIZE)]
+        results = await run_many(self._review_implementation_chunk(chunk) for chunk in chunks)
+        return [review for chunk_results in results for review in chunk_results]
+
+    async def _review_implementation_chunk(self, reviews: List[Dict[str, List[Dict]]]) -> List[dict]:
+        """Review one batch with a single crew run, falling back to per-item calls."""
+        if len(reviews) == 1 or not self.has_valid_llm():
+            return await run_many(self.review_implementation(**review) for review in reviews)
+
+        reviewer = self.code_reviewer.model_copy()
+        
+        listing = "\n".join(
+            CODE_REVIEW_BATCH_ITEM.format(
+                number=number,
+                tasks=dumps_compact(review["tasks"]),
+                code_snippets=dumps_compact(review["code_snippets"])
+            )
+            for number, review in enumerate(reviews, 1)
+        )
         review_task = Task(
-            description=f"Review these implementation tasks and code snippets:\n"
-                      f"Tasks: {json.dumps(tasks, indent=2)}\n"
-                      f"Code Snippets: {json.dumps(code_snippets, indent=2)}\n"
-                      f"Provide a JSON object with code review feedback and recommendations.",
+            description=CODE_REVIEW_BATCH_DESCRIPTION.format(count=len(reviews), listing=listing),
             agent=reviewer,
-            expected_output='A JSON object containing review feedback. Example:\n'
-                          '{\n'
-                          '  "feedback": [\n'
-                          '    {\n'
-                          '      "file": "user_model.py",\n'
-                          '      "line": 23,\n'
-                          '      "type": "suggestion",\n'
-                          '      "message": "Consider adding input validation"\n'
-                          '    }\n'
-                          '  ],\n'
-                          '  "best_practices": ["Add error handling"],\n'
-                          '  "security_considerations": ["Sanitize user input"]\n'
-                          '}'
+            expected_output=CODE_REVIEW_BATCH_EXPECTED_OUTPUT
         )
 
         crew = Crew(
@@ -293,91 +425,29 @@ class TechnicalAgents(AgentBase):
             verbose=0
         )
 
+        entries = None
         try:
-            logger.info("Reviewing implementation plan...")
-            result = crew.kickoff()
-            
-            parsed_json = robust_json_parser(str(result), context="Code Review")
-            if parsed_json:
-                # Check for successful structure AND absence of an 'error' key from LLM
-                if "feedback" in parsed_json and isinstance(parsed_json["feedback"], list) and "error" not in parsed_json:
-                    return parsed_json # This is the successful data
-                else:
-                    # If "feedback" is missing, or it's not a list, OR if an "error" key is present in the parsed JSON
-                    logger.warning(f"Parsed JSON for code review is invalid or contains an error field. Output: {str(result)[:500]}")
-                    return ErrorSchema(
-                        error="Invalid JSON Structure or LLM Error",
-                        message="Parsed JSON for code review is missing 'feedback' list, has incorrect type, or contains an error indicator from the LLM.",
-                        agent_type="code_reviewer",
-                        raw_output=str(result)
-                    ).model_dump(exclude_none=True)
-            else:
-                # robust_json_parser failed
-                logger.error(f"Failed to parse JSON from code review. Raw output: {str(result)[:500]}")
-                return ErrorSchema(
-                    error="JSON Parsing Error",
-                    message="Failed to parse JSON output from Code Reviewer Agent.",
-                    agent_type="code_reviewer",
-                    raw_output=str(result)
-                ).model_dump(exclude_none=True)
-                
-        except Exception as e:
-            logger.error(f"Error during code review: {e}", exc_info=True)
-            return ErrorSchema(
-                error="Agent Execution Error",
-                message=f"An unexpected error occurred during code review: {str(e)}",
-                agent_type="code_reviewer"
-            ).model_dump(exclude_none=True)
-
-if __name__ == "__main__":
-    import asyncio
-    
-    async def test_technical_agents():
-        agents = TechnicalAgents()
-        
-        if not agents.has_valid_llm():
-            print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
-            return
-            
-        # Test data
-        user_stories = [
-            {
-                "role": "user",
-                "goal": "store my preferences",
-                "benefit": "customize my experience",
-                "acceptance_criteria": [
-                    "Save theme preference",
-                    "Persist settings across sessions"
-                ]
-            }
-        ]
-        
-        # Test database design
-        db_design = await agents.design_database(user_stories)
-        print("\nDatabase Design Result:")
-        print(json.dumps(db_design, indent=2))
-        
-        if "tables" in db_design and not db_design.get("error"):
-            # Test task breakdown
-            tasks = await agents.break_down_tasks(
-                feature_description="Implement user preferences storage",
-                user_stories=user_stories,
-                database_design=db_design
+            logger.info("Reviewing a batch of %d implementations...", len(reviews))
+            result = await self._kickoff(crew)
+            raw_output = str(result)
+            entries = self._split_batch_output(
+                robust_json_parser(raw_output, context="Code Review Batch"), len(reviews)
             )
-            print("\nTask Breakdown Result:")
-            print(json.dumps(tasks, indent=2))
+        except Exception as e:
+            logger.error("Error during batched code review: %s: %s", type(e).__name__, e)
+            logger.debug("Batched code review traceback", exc_info=True)
             
-            if "tasks" in tasks and not tasks.get("error"):
-                # Test code review
-                code_snippets = [
-                    {
-                        "file": "models/user_preferences.py",
-                        "code": "class UserPreferences:\n    def __init__(self, theme='light'):\n        self.theme = theme"
-                    }
-                ]
-                review = await agents.review_implementation(tasks["tasks"], code_snippets)
-                print("\nCode Review Result:")
-                print(json.dumps(review, indent=2))
+        if entries is None:
+            logger.warning("Batched code review failed; falling back to per-item calls")
+            entries = [None] * len(reviews)
             
-    # Run the test
-    asyncio.run(test_technical_agents())
+        # Items the batch did not answer are reviewed individually
+        missing = [i for i, entry in enumerate(entries) if entry is None]
+        retried = await run_many(self.review_implementation(**reviews[i]) for i in missing)
+        results = [
+            self._validate_review(entry, raw_output) if entry is not None else None
+            for entry in entries
+        ]
+        for i, review in zip(missing, retried):
+            results[i] = review
+        return results
@@ -0,0 +1,97 @@
+"""Rate-limited, bounded-concurrency fan-out of agent calls over many inputs."""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from ...core.config import settings
+from ...api.v1.schemas import ErrorSchema
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Async token bucket allowing `rate_per_minute` acquisitions per minute.
+
+    The bucket starts full, so a burst of up to `rate_per_minute` calls goes out at once and
+    later calls are spaced evenly as tokens refill.
+    """
+
+    def __init__(self, rate_per_minute: int):
+        self.capacity = float(rate_per_minute)
+        self.refill_per_second = rate_per_minute / 60.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.refill_per_second)
+
+class BatchProcessor:
+    """
+    Run one agent method over many inputs with bounded concurrency and a request rate limit.
+
+    Calls still go through the agents' own LLM semaphore and retries; the processor only
+    keeps a large batch from flooding them, and from exceeding the provider's requests
+    per minute when a caller fans out over dozens of features at once.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, rate_limit: Optional[int] = None):
+        """
+        Args:
+            max_concurrency (int, optional): Calls in flight at once, defaults to MAX_LLM_CONCURRENCY
+            rate_limit (int, optional): Calls started per minute, defaults to LLM_REQUESTS_PER_MINUTE;
+                0 disables the limit
+        """
+        self.max_concurrency = max_concurrency or settings.MAX_LLM_CONCURRENCY
+        rate_limit = settings.LLM_REQUESTS_PER_MINUTE if rate_limit is None else rate_limit
+        self._bucket = TokenBucket(rate_limit) if rate_limit > 0 else None
+
+    async def run_batch(self, agent_method: Callable[..., Awaitable[Any]], inputs: List[Dict[str, Any]],
+                        on_progress: Optional[Callable[[int, int], None]] = None) -> List[Any]:
+        """
+        Call `agent_method(**item)` for every item in inputs.
+
+        Args:
+            agent_method (Callable): Async agent method, e.g. ``ProductAgents.generate_user_stories``
+            inputs (List[Dict]): Keyword arguments for each call
+            on_progress (Callable, optional): Called with (completed, total) after each call finishes
+
+        Returns:
+            List[Any]: One result per input, in input order; a call that raised is reported as an
+            ErrorSchema dict instead of failing the whole batch
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        total = len(inputs)
+        completed = 0
+
+        async def run_one(item: Dict[str, Any]) -> Any:
+            nonlocal completed
+            async with semaphore:
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+                try:
+                    result = await agent_method(**item)
+                except Exception as e:
+                    logger.error("Error in batched call to %s: %s: %s", getattr(agent_method, '__name__', agent_method), type(e).__name__, e)
+                    logger.debug("Batched call traceback", exc_info=True)
+                    result = ErrorSchema(
+                        error="Agent Execution Error",
+                        message=f"An unexpected error occurred during batch processing: {str(e)}"
+                    ).model_dump(exclude_none=True)
+            completed += 1
+            if on_progress is not None:
+                on_progress(completed, total)
+            return result
+
+        return await asyncio.gather(*(run_one(item) for item in inputs))
@@ -0,0 +1,81 @@
+"""Cache of parsed agent results keyed by a canonical hash of the agent's inputs."""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import hashlib
+import logging
+import time
+
+import orjson
+
+try:
+    import diskcache  # Optional, shares results across worker processes and restarts
+except ImportError:
+    diskcache = None
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class AgentResultCache:
+    """
+    Two-level cache for agent results: an in-process LRU, optionally backed by diskcache.
+
+    Values are stored as orjson bytes, so every hit hands out a fresh copy that callers
+    may mutate without corrupting the cache.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: int = 3600, directory: Optional[str] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk = None
+        if directory:
+            if diskcache is None:
+                logger.warning("diskcache is not installed; agent results are cached in memory only")
+            else:
+                self._disk = diskcache.Cache(directory)
+
+    @staticmethod
+    def make_key(operation: str, inputs: Dict[str, Any]) -> str:
+        """Hash an operation name and its inputs; key order in the inputs does not matter."""
+        payload = orjson.dumps({"operation": operation, "inputs": inputs},
+                               option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        return hashlib.blake2b(payload, digest_size=20).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss or an expired entry."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, data = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return orjson.loads(data)
+            del self._entries[key]
+
+        if self._disk is not None:
+            data = self._disk.get(key)
+            if data is not None:
+                self._remember(key, data)
+                return orjson.loads(data)
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a value under key for the configured TTL."""
+        data = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        self._remember(key, data)
+        if self._disk is not None:
+            self._disk.set(key, data, expire=self.ttl)
+
+    def _remember(self, key: str, data: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+# Shared by every agent instance in the process
+result_cache = AgentResultCache(
+    maxsize=settings.AGENT_RESULT_CACHE_SIZE,
+    ttl=settings.CACHE_TTL,
+    directory=settings.AGENT_RESULT_CACHE_DIR
+)
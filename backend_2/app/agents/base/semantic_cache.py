@@ -0,0 +1,87 @@
+"""Embedding index that maps reworded agent inputs onto results already in the result cache."""
+
+from collections import OrderedDict
+from typing import Dict, Optional
+import logging
+import threading
+
+try:
+    import numpy as np
+    from fastembed import TextEmbedding  # Optional, small CPU-only embedding models
+except ImportError:
+    np = None
+    TextEmbedding = None
+
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class SemanticIndex:
+    """
+    Nearest-neighbour lookup from input text to result cache keys, per agent operation.
+
+    Texts are embedded with a small local model and compared by cosine similarity with a
+    brute-force dot product: the index never holds more entries than the result cache, so
+    that is cheaper than maintaining an ANN structure. Keys whose results have since been
+    evicted simply miss when the caller looks them up in the result cache.
+
+    Texts longer than max_chars are not indexed: small embedding models only read the first
+    few hundred tokens, so two long texts that differ after that would look identical.
+    """
+
+    def __init__(self, model_name: str, threshold: float, maxsize: int = 256, max_chars: int = 1000):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.max_chars = max_chars
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._entries: Dict[str, "OrderedDict[str, object]"] = {}
+
+    @property
+    def available(self) -> bool:
+        """Whether fastembed is installed, so texts can be embedded at all."""
+        return TextEmbedding is not None
+
+    def accepts(self, text: str) -> bool:
+        """Whether text is short enough for the model to embed all of it."""
+        return len(text) <= self.max_chars
+
+    def embed(self, text: str) -> "np.ndarray":
+        """Embed text as a unit vector; blocking, so call it off the event loop."""
+        with self._model_lock:
+            if self._model is None:
+                logger.info("Loading embedding model %s for semantic result caching", self.model_name)
+                self._model = TextEmbedding(model_name=self.model_name)
+            vector = next(iter(self._model.embed([text])))
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def nearest(self, operation: str, vector: "np.ndarray") -> Optional[str]:
+        """Return the cache key of the most similar earlier input, if it clears the threshold."""
+        entries = self._entries.get(operation)
+        if not entries:
+            return None
+        keys = list(entries)
+        similarities = np.stack([entries[key] for key in keys]) @ vector
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.threshold:
+            return None
+        logger.info("Semantic cache match for %s (cosine similarity %.3f)", operation, similarities[best])
+        return keys[best]
+
+    def add(self, operation: str, vector: "np.ndarray", key: str) -> None:
+        """Index the embedding of an input whose result was stored under key."""
+        entries = self._entries.setdefault(operation, OrderedDict())
+        entries[key] = vector
+        entries.move_to_end(key)
+        while len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+# Shared by every agent instance in the process; only consulted when AGENT_SEMANTIC_CACHE is on
+semantic_index = SemanticIndex(
+    model_name=settings.AGENT_SEMANTIC_CACHE_MODEL,
+    threshold=settings.AGENT_SEMANTIC_CACHE_THRESHOLD,
+    maxsize=settings.AGENT_RESULT_CACHE_SIZE
+)
+if settings.AGENT_SEMANTIC_CACHE and not semantic_index.available:
+    logger.warning("AGENT_SEMANTIC_CACHE is enabled but fastembed is not installed; only exact cache hits are used")
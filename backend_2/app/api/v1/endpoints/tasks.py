@@ -1,19 +1,38 @@
-from typing import List, Optional, Dict
-from fastapi import APIRouter, HTTPException, Query
+from typing import Any, List, Mapping, Optional, Dict, Type
+from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from datetime import datetime
+import orjson
 
 from app.core.db import database
+from app.core.responses import ORJSONResponse
 from app.services.task_service import TaskAnalysisService
 from app.api.v1.schemas import (
     Task, TaskCreate, TaskUpdate, TaskAnalysisResult,
-    AgentExecution, AgentConfig, ErrorResponse
+    AgentExecution, AgentConfig, ErrorResponse, AnalysisJobStatus
 )
 
 router = APIRouter()
-service = TaskAnalysisService()
+
+def get_task_service(request: Request) -> TaskAnalysisService:
+    """Return the application-wide TaskAnalysisService created at startup."""
+    return request.app.state.task_service
+
+def project_row(row: Mapping[str, Any], model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Keep only the columns that are fields of the response model.
+    
+    Rows encoded directly skip the response_model, so internal columns such as
+    analysis_hash would otherwise leak into the response.
+    """
+    return {field: row[field] for field in model.model_fields}
 
 @router.post("/", response_model=TaskAnalysisResult, status_code=201)
-async def create_task(task: TaskCreate):
+async def create_task(
+    task: TaskCreate,
+    service: TaskAnalysisService = Depends(get_task_service)
+):
     """
     Create a new task and perform comprehensive AI analysis.
     
@@ -50,39 +69,106 @@ async def get_tasks(
     status: Optional[str] = None,
     category: Optional[str] = None,
     priority: Optional[str] = None,
-    limit: int = Query(default=10, ge=1, le=100)
+    limit: int = Query(default=10, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    service: TaskAnalysisService = Depends(get_task_service)
 ):
     """
-    Retrieve all tasks with optional filtering.
+    Retrieve tasks with optional filtering, one page at a time.
     
     Parameters:
     - status: Filter by task status
     - category: Filter by task category
     - priority: Filter by task priority
     - limit: Maximum number of tasks to return
+    - offset: Number of tasks to skip
+    
+    Rows are streamed as a JSON array while they are read from the database.
     """
+    rows = service.iterate_tasks(status, category, priority, limit, offset)
     try:
-        tasks = await service.get_all_tasks()
-        
-        # Apply filters if provided
-        if status:
-            tasks = [t for t in tasks if t["status"] == status]
-        if category:
-            tasks = [t for t in tasks if t["category"] == category]
-        if priority:
-            tasks = [t for t in tasks if t["priority"] == priority]
-            
-        # Apply limit
-        return tasks[:limit]
-        
+        # Run the query before the 200 goes out, so a database error still becomes a 500
+        first = await anext(rows, None)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to retrieve tasks: {str(e)}"
         )
+        
+    async def encode_tasks():
+        if first is None:
+            yield b"[]"
+            return
+        # Column names come back as str subclasses, which orjson only accepts with OPT_NON_STR_KEYS
+        yield b"[" + orjson.dumps(project_row(first, Task), option=orjson.OPT_NON_STR_KEYS)
+        async for task in rows:
+            yield b"," + orjson.dumps(project_row(task, Task), option=orjson.OPT_NON_STR_KEYS)
+        yield b"]"
+        
+    return StreamingResponse(encode_tasks(), media_type="application/json")
+
+@router.post("/jobs", response_model=AnalysisJobStatus, status_code=202)
+async def create_task_job(
+    task: TaskCreate,
+    service: TaskAnalysisService = Depends(get_task_service)
+):
+    """
+    Create a task and analyze it in the background.
+    
+    Returns immediately with a job id. Poll `GET /jobs/{job_id}` for the fields analyzed
+    so far and the final result, or subscribe to `GET /jobs/{job_id}/events` to have
+    each step pushed as a server-sent event.
+    """
+    job = service.analysis_jobs.submit(task.dict())
+    return ORJSONResponse(job.snapshot(), status_code=202)
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobStatus)
+async def get_task_job(
+    job_id: str,
+    service: TaskAnalysisService = Depends(get_task_service)
+):
+    """Retrieve the status, partial results and final result of a background analysis."""
+    job = service.analysis_jobs.get(job_id)
+    
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Analysis job not found"
+        )
+        
+    return ORJSONResponse(job.snapshot())
+
+@router.get("/jobs/{job_id}/events")
+async def stream_task_job_events(
+    job_id: str,
+    service: TaskAnalysisService = Depends(get_task_service)
+):
+    """
+    Stream a background analysis as server-sent events.
+    
+    Sends `started`, one `step` event per analysis field as its agent finishes, then
+    `completed` (with the full result) or `failed`. Events that already happened are
+    replayed first, so subscribing late does not lose any.
+    """
+    job = service.analysis_jobs.get(job_id)
+    
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Analysis job not found"
+        )
+        
+    async def encode_events():
+        async for event in job.stream():
+            yield b"event: " + event["event"].encode() + b"\ndata: " + orjson.dumps(event) + b"\n\n"
+            
+    return StreamingResponse(encode_events(), media_type="text/event-stream")
 
 @router.get("/{task_id}", response_model=Task)
-async def get_task(task_id: int):
+async def get_task(
+    task_id: int,
+    service: TaskAnalysisService = Depends(get_task_service)
+):
     """Retrieve a specific task by ID."""
     task = await service.get_task(task_id)
     
@@ -92,10 +178,16 @@ async def get_task(task_id: int):
             detail="Task not found"
         )
         
-    return task
+    # Rows come back from the driver already typed; encode them directly instead of
+    # revalidating through the response model (which is kept for the OpenAPI schema)
+    return ORJSONResponse(project_row(task._mapping, Task))
 
 @router.patch("/{task_id}", response_model=Task)
-async def update_task(task_id: int, task_update: TaskUpdate):
+async def update_task(
+    task_id: int,
+    task_update: TaskUpdate,
+    service: TaskAnalysisService = Depends(get_task_service)
+):
     """
     Update a task's information.
     
@@ -118,10 +210,13 @@ async def update_task(task_id: int, task_update: TaskUpdate):
             detail="Task not found"
         )
         
-    return updated_task
+    return ORJSONResponse(project_row(updated_task._mapping, Task))
 
 @router.get("/{task_id}/executions", response_model=List[AgentExecution])
-async def get_task_executions(task_id: int):
+async def get_task_executions(
+    task_id: int,
+    service: TaskAnalysisService = Depends(get_task_service)
+):
     """
     Retrieve the execution history for a task.
     Shows all agent operations performed on the task.
@@ -134,10 +229,13 @@ async def get_task_executions(task_id: int):
             detail="No executions found for this task"
         )
         
-    return executions
+    return ORJSONResponse([project_row(execution._mapping, AgentExecution) for execution in executions])
 
 @router.post("/{task_id}/reanalyze", response_model=TaskAnalysisResult)
-async def reanalyze_task(task_id: int):
+async def reanalyze_task(
+    task_id: int,
+    service: TaskAnalysisService = Depends(get_task_service)
+):
     """
     Perform a fresh analysis of an existing task.
     Useful when task details have been updated.
@@ -151,11 +249,12 @@ async def reanalyze_task(task_id: int):
         )
     
     try:
+        # Skip every cached answer; a reanalysis that replays the old result is pointless
         analysis_result = await service.analyze_task({
             "description": task["description"],
             "user_story": task["user_story"],
             "context": task["context"]
-        })
+        }, use_cache=False)
         
         if "error" in analysis_result:
             raise HTTPException(
@@ -175,7 +274,7 @@ async def reanalyze_task(task_id: int):
         )
 
 @router.get("/stats/categories", response_model=Dict[str, int])
-async def get_category_stats():
+async def get_category_stats(service: TaskAnalysisService = Depends(get_task_service)):
     """Get task count by category."""
     try:
         tasks = await service.get_all_tasks()
@@ -194,7 +293,7 @@ async def get_category_stats():
         )
 
 @router.get("/stats/priorities", response_model=Dict[str, int])
-async def get_priority_stats():
+async def get_priority_stats(service: TaskAnalysisService = Depends(get_task_service)):
     """Get task count by priority."""
     try:
         tasks = await service.get_all_tasks()
@@ -213,7 +312,7 @@ async def get_priority_stats():
         )
 
 @router.get("/stats/agent-performance", response_model=Dict[str, Dict[str, float]])
-async def get_agent_performance_stats():
+async def get_agent_performance_stats(service: TaskAnalysisService = Depends(get_task_service)):
     """
     Get performance statistics for each agent type.
     Returns average execution time and success rate.
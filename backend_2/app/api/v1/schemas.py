@@ -178,6 +178,14 @@ class TaskAnalysisResult(BaseModel):
     infrastructure_plan: Optional[Union[InfrastructureConfig, ErrorSchema]] = None
     error: Optional[str] = None # This field might become redundant if errors are per-analysis-item
 
+class AnalysisJobStatus(BaseModel):
+    """State of a background task analysis"""
+    job_id: str
+    status: str  # queued, running, completed or failed
+    steps: Dict[str, Any] = {}  # Analysis fields filled in so far
+    result: Optional[TaskAnalysisResult] = None
+    error: Optional[str] = None
+
 class AgentConfig(BaseModel):
     """Agent configuration"""
     id: int
@@ -1,10 +1,19 @@
 from typing import List, Union, Optional
 from pydantic import Field, validator
 from pydantic_settings import BaseSettings
+from dotenv import load_dotenv
 import os
 import json
 from pathlib import Path
 
+# backend_2/ directory, used to locate the .env file regardless of the working directory
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# The .env file is only read for local development, and only here. Deployments set real
+# environment variables (APP_ENV=production in the Docker image), which Settings reads directly.
+if os.getenv("APP_ENV", "dev") == "dev":
+    load_dotenv(PROJECT_ROOT / ".env")
+
 class Settings(BaseSettings):
     """Application settings with environment variable support."""
     
@@ -53,12 +62,77 @@ class Settings(BaseSettings):
         description="Alternative Google API key"
     )
     
+    # LLM Model Settings
+    LLM_MODEL: str = Field(
+        default="gemini/gemini-2.0-flash",
+        description="LiteLLM model for the strong tier, used by default"
+    )
+    LLM_FAST_MODEL: str = Field(
+        default="gemini/gemini-2.0-flash-lite",
+        description="Cheaper LiteLLM model for the fast tier, tried first on simple requests"
+    )
+    LLM_PROMPT_CACHE_CONTROL: bool = Field(
+        default=False,
+        description="Mark the static system prompt of agent runs with cache_control so the provider caches the prefix (needs a provider/model with explicit prompt caching)"
+    )
+    LLM_TIER_ROUTING: bool = Field(
+        default=True,
+        description="Try simple requests on the fast tier and escalate to the strong tier only if the answer fails validation"
+    )
+    
+    # LLM Cache Settings
+    LLM_CACHE_BACKEND: str = Field(
+        default="sqlite",
+        pattern="^(none|sqlite|redis)$",
+        description="Backend for the LLM response cache"
+    )
+    LLM_CACHE_PATH: str = Field(
+        default="data/llm_cache.db",
+        description="SQLite file used when LLM_CACHE_BACKEND is sqlite"
+    )
+    REDIS_URL: Optional[str] = Field(
+        default=None,
+        description="Redis connection string used when LLM_CACHE_BACKEND is redis"
+    )
+    
     # Agent Settings
     AGENT_VERBOSE: bool = True
     CREW_VERBOSE: int = Field(
         default=0,
         description="Crew verbosity level (0=minimal, 1=basic, 2=detailed)"
     )
+    MAX_LLM_CONCURRENCY: int = Field(
+        default=5,
+        description="Maximum number of LLM calls in flight at once across all agents"
+    )
+    LLM_BATCH_DELAY_SECONDS: float = Field(
+        default=0.0,
+        description="Pause between batches of concurrent LLM calls, to stay under provider rate limits"
+    )
+    LLM_REQUESTS_PER_MINUTE: int = Field(
+        default=100,
+        description="Calls started per minute by bulk agent operations (0 disables the limit)"
+    )
+    CREW_KICKOFF_WORKERS: int = Field(
+        default=32,
+        description="Threads reserved for running synchronous crew kickoffs off the event loop"
+    )
+    LLM_TIMEOUT_SECONDS: float = Field(
+        default=60.0,
+        description="Upper bound on a single LLM call or crew run, or on the wait for each chunk of a streamed one, before it is abandoned and retried"
+    )
+    LLM_MAX_ATTEMPTS: int = Field(
+        default=3,
+        description="Attempts per LLM call on timeouts and transient provider errors, with exponential backoff between them"
+    )
+    AGENT_FORMAT_ATTEMPTS: int = Field(
+        default=3,
+        description="Attempts per agent task when its answer is not valid JSON or lacks required fields; retries add a format reminder"
+    )
+    AGENT_STREAMING: bool = Field(
+        default=True,
+        description="Stream single-task agent runs straight from the LLM and stop once the JSON answer is complete, instead of running a Crew"
+    )
     
     # Logging Settings
     LOG_LEVEL: str = Field(
@@ -84,6 +158,26 @@ class Settings(BaseSettings):
         default=3600,
         description="Cache time-to-live in seconds"
     )
+    AGENT_RESULT_CACHE_SIZE: int = Field(
+        default=256,
+        description="Number of parsed agent results kept in memory per process"
+    )
+    AGENT_RESULT_CACHE_DIR: Optional[str] = Field(
+        default=None,
+        description="diskcache directory for sharing agent results across processes (disabled when unset)"
+    )
+    AGENT_SEMANTIC_CACHE: bool = Field(
+        default=False,
+        description="Reuse cached user stories and database designs for reworded but near-identical inputs (needs fastembed); trades exactness for fewer LLM calls"
+    )
+    AGENT_SEMANTIC_CACHE_MODEL: str = Field(
+        default="sentence-transformers/all-MiniLM-L6-v2",
+        description="fastembed model used to embed inputs for the semantic cache"
+    )
+    AGENT_SEMANTIC_CACHE_THRESHOLD: float = Field(
+        default=0.95,
+        description="Minimum cosine similarity for a semantic cache hit"
+    )
     
     # Task Analysis Settings
     DEFAULT_TASK_PRIORITY: str = "Medium"
@@ -98,6 +192,25 @@ class Settings(BaseSettings):
         "Chore"
     ]
     
+    HEURISTIC_CLASSIFIER_ENABLED: bool = Field(
+        default=True,
+        description="Classify tasks with obvious keywords without calling the LLM"
+    )
+    
+    # Concurrent analyze requests arriving within the wait window are sent to the LLM as one batch
+    TASK_ANALYSIS_BATCH_SIZE: int = Field(
+        default=16,
+        description="Maximum number of tasks analyzed in a single LLM call"
+    )
+    TASK_ANALYSIS_BATCH_WAIT_MS: int = Field(
+        default=30,
+        description="How long to wait for more requests before sending a batch"
+    )
+    ANALYSIS_JOB_RETENTION: int = Field(
+        default=500,
+        description="Background analysis jobs kept in memory for polling; the oldest finished ones are dropped first"
+    )
+    
     # Performance Settings
     PERFORMANCE_LOG_INTERVAL: int = Field(
         default=300,
@@ -106,7 +219,6 @@ class Settings(BaseSettings):
     
     class Config:
         case_sensitive = True
-        env_file = ".env"
         
     @validator("UPLOAD_DIR", pre=True)
     def create_upload_dir(cls, v: Union[str, Path]) -> Path:
@@ -138,4 +250,4 @@ settings = Settings()
 os.makedirs("logs", exist_ok=True)
 os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
-__all__ = ['settings']
+__all__ = ['settings', 'PROJECT_ROOT']
@@ -1,21 +1,17 @@
 import os
+from functools import lru_cache
 from typing import Dict, Any
 from sqlalchemy import (
     Table, Column, Integer, String, JSON, DateTime, MetaData,
-    create_engine, Text, Float, Boolean
+    create_engine, Text, Float, Boolean, Index, inspect
 )
 from databases import Database
 from datetime import datetime
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from app.core.config import settings
 
-# Get database URL from environment or use default SQLite database
-DATABASE_URL = os.getenv(
-    "DATABASE_URL",
-    "sqlite:///./test.db"
-)
+# Database URL is read once from the cached application settings
+DATABASE_URL = settings.DATABASE_URL
 
 # SQLite specific configuration
 if DATABASE_URL.startswith("sqlite"):
@@ -36,13 +32,14 @@ tasks = Table(
     Column("description", String, nullable=False),
     Column("user_story", Text),
     Column("context", Text),
-    Column("created_at", DateTime, default=datetime.utcnow),
+    Column("created_at", DateTime, default=datetime.utcnow, index=True),
     Column("updated_at", DateTime, default=datetime.utcnow, onupdate=datetime.utcnow),
-    Column("status", String, default="Open"),
+    Column("status", String, default="Open", index=True),
     
-    # Task Analyzer results
-    Column("category", String),
-    Column("priority", String),
+    # Task Analyzer results (filterable on the list endpoint)
+    Column("category", String, index=True),
+    Column("priority", String, index=True),
+    Column("analysis_hash", String, index=True),  # content hash of the analyzed text, reused across identical tasks
     
     # Product Manager and UX results
     Column("user_stories", JSON),  # Detailed user stories
@@ -62,12 +59,15 @@ tasks = Table(
     Column("infrastructure_plan", JSON),  # Infrastructure requirements
 )
 
+# Status filter combined with newest-first ordering
+Index("ix_tasks_status_created", tasks.c.status, tasks.c.created_at.desc())
+
 # Agents execution history for tracking and analysis
 agent_executions = Table(
     "agent_executions",
     metadata,
     Column("id", Integer, primary_key=True),
-    Column("task_id", Integer),
+    Column("task_id", Integer, index=True),
     Column("agent_type", String, nullable=False),
     Column("executed_at", DateTime, default=datetime.utcnow),
     Column("input_data", JSON),
@@ -106,13 +106,38 @@ async def disconnect_db():
         print(f"Error disconnecting from database: {e}")
         raise
 
+@lru_cache(maxsize=None)
+def get_sync_engine():
+    """Get the synchronous engine used for DDL, created once and reused with its connection pool."""
+    return create_engine(DATABASE_URL.replace("+aiosqlite", ""))
+
+def migrate_schema(engine):
+    """
+    Bring existing tables up to date with the metadata.
+    
+    create_all skips tables that already exist, including their indexes, so add any
+    column or index that was introduced after the table was created.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}')
+                    
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
 def create_tables():
     """Create database tables if they don't exist."""
     # Use a purely synchronous engine for DDL operations
-    sync_db_url = DATABASE_URL.replace("+aiosqlite", "")
-    engine = create_engine(sync_db_url)
+    engine = get_sync_engine()
     try:
         metadata.create_all(engine)
+        migrate_schema(engine)
         print("Successfully created database tables")
     except Exception as e:
         print(f"Error creating database tables: {e}")
@@ -2,8 +2,8 @@
 
 from typing import Any, Dict
 from fastapi import Request
-from fastapi.responses import JSONResponse
 
+from app.core.responses import ORJSONResponse
 from app.utils import format_datetime
 
 class TaskAnalysisError(Exception):
@@ -27,9 +27,9 @@ class ValidationError(TaskAnalysisError):
     def __init__(self, message: str):
         super().__init__(message=message, status_code=422)
 
-async def error_handler(request: Request, exc: TaskAnalysisError) -> JSONResponse:
+async def error_handler(request: Request, exc: TaskAnalysisError) -> ORJSONResponse:
     """Handle all task analysis errors."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.__class__.__name__,
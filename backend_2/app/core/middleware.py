@@ -20,8 +20,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
         
         # Log request
         logger.info(
-            f"Request: {request.method} {request.url.path} "
-            f"from {request.client.host}"
+            "Request: %s %s from %s",
+            request.method, request.url.path, request.client.host
         )
         
         try:
@@ -33,8 +33,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             
             # Log response
             logger.info(
-                f"Response: {response.status_code} for {request.method} "
-                f"{request.url.path} took {format_duration(duration)}"
+                "Response: %s for %s %s took %s",
+                response.status_code, request.method, request.url.path, format_duration(duration)
             )
             
             # Add timing header
@@ -45,8 +45,8 @@ class LoggingMiddleware(BaseHTTPMiddleware):
             # Log error
             duration = time.time() - start_time
             logger.error(
-                f"Error processing {request.method} {request.url.path}: {str(e)} "
-                f"after {format_duration(duration)}"
+                "Error processing %s %s: %s after %s",
+                request.method, request.url.path, e, format_duration(duration)
             )
             raise
 
@@ -113,7 +113,7 @@ def track_execution(category: str, operation: str, metadata: Optional[Dict[str,
         yield
     except Exception as e:
         success = False
-        logger.error(f"Error in {category}.{operation}: {str(e)}")
+        logger.error("Error in %s.%s: %s", category, operation, e)
         raise
     finally:
         duration = time.time() - start_time
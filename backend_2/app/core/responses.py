@@ -0,0 +1,18 @@
+"""Response classes for the AI Task Analysis System."""
+
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+    
+    Equivalent to FastAPI's own ORJSONResponse, which newer FastAPI releases deprecate;
+    keeping it here gives the same fast encoding on every supported FastAPI version.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
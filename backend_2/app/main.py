@@ -10,6 +10,9 @@ from app.core.db import connect_db, disconnect_db, create_tables
 from app.core.logging_config import setup_logging
 from app.core.middleware import setup_middleware
 from app.core.errors import setup_error_handlers
+from app.core.responses import ORJSONResponse
+from app.agents.base.agent_base import shutdown_kickoff_executor
+from app.services.task_service import TaskAnalysisService
 
 # Configure logging
 setup_logging()
@@ -18,7 +21,8 @@ setup_logging()
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="AI-powered task analysis system with multiple specialized agents"
+    description="AI-powered task analysis system with multiple specialized agents",
+    default_response_class=ORJSONResponse
 )
 
 # Set up CORS
@@ -41,13 +45,19 @@ app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 @app.on_event("startup")
 async def startup():
-    """Connect to database and create tables on startup."""
+    """Connect to database, create tables and build shared services on startup."""
     await connect_db()
     await asyncio.to_thread(create_tables) # Create tables in a separate thread
+    # Build the agents and their LLM clients once and share them across requests
+    app.state.task_service = TaskAnalysisService()
+    app.state.task_service.analysis_batcher.start()
 
 @app.on_event("shutdown")
 async def shutdown():
-    """Disconnect from database on shutdown."""
+    """Stop background workers and disconnect from database on shutdown."""
+    await app.state.task_service.analysis_jobs.stop()
+    await app.state.task_service.analysis_batcher.stop()
+    shutdown_kickoff_executor()
     await disconnect_db()
 
 @app.get("/health")
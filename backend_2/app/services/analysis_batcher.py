@@ -0,0 +1,120 @@
+"""Dynamic batching of task analyzer requests."""
+
+import asyncio
+import logging
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from app.agents import TaskAnalyzerAgent
+
+logger = logging.getLogger(__name__)
+
+class TaskAnalysisBatcher:
+    """
+    Coalesces concurrent task analysis requests into batched LLM calls.
+
+    Requests submitted within ``max_wait_ms`` of the first one in a batch (up to
+    ``max_batch`` of them) are analyzed with a single prompt, so a burst of task
+    creations costs one LLM round trip instead of one per task.
+    """
+
+    def __init__(self, analyzer: TaskAnalyzerAgent, max_batch: int = 16, max_wait_ms: int = 30):
+        self.analyzer = analyzer
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def start(self):
+        """Start the background worker. Must be called from within the running event loop."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker, let dispatched batches finish and fail requests still waiting."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        await asyncio.gather(*self._inflight, return_exceptions=True)
+
+        pending = []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail_cancelled(pending)
+
+    async def submit(self, description: str, user_story: str = "", context: str = "") -> Dict[str, Any]:
+        """
+        Queue a task for analysis and wait for its result.
+
+        Falls back to a direct, unbatched call when the worker is not running.
+
+        Returns:
+            Dict[str, Any]: Analysis result with 'category', 'priority' and 'error' keys
+        """
+        item = {"description": description, "user_story": user_story, "context": context}
+        if self._worker is None:
+            return await self.analyzer.analyze_task(**item)
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _run(self):
+        """Collect queued requests into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # Requests already taken off the queue would otherwise never get an answer
+                self._fail_cancelled(batch)
+                raise
+
+            # Dispatch in the background so the next batch can start filling up meanwhile
+            dispatch = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(dispatch)
+            dispatch.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Dict[str, str], asyncio.Future]]):
+        """Analyze one batch and hand each result back to its waiting request."""
+        try:
+            results = await self.analyzer.analyze_task_batch([item for item, _ in batch])
+        except Exception as e:
+            logger.error("Error during batched task analysis: %s", e, exc_info=True)
+            results = [{
+                "category": None,
+                "priority": None,
+                "error": f"Agent Execution Error: An unexpected error occurred during task analysis: {str(e)}"
+            } for _ in batch]
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _fail_cancelled(batch: List[Tuple[Dict[str, str], asyncio.Future]]):
+        """Answer requests that will not be analyzed because the batcher is stopping."""
+        for _, future in batch:
+            if not future.done():
+                future.set_result({
+                    "category": None,
+                    "priority": None,
+                    "error": "Agent Execution Error: Task analysis was cancelled during shutdown."
+                })
@@ -0,0 +1,125 @@
+"""Background task analysis jobs with per-step progress."""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+class AnalysisJob:
+    """State of one background analysis: its status, the fields filled in so far and its events."""
+
+    def __init__(self, job_id: str, task_details: Dict[str, Any]):
+        self.id = job_id
+        self.task_details = task_details
+        self.status = "queued"
+        self.steps: Dict[str, Any] = {}
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        # Set and replaced on every event, waking up everyone streaming the job
+        self._updated = asyncio.Event()
+        self.runner: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has completed or failed."""
+        return self.status in ("completed", "failed")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The job as returned by the API."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "steps": self.steps,
+            "result": self.result,
+            "error": self.error
+        }
+
+    def record(self, event: Dict[str, Any]) -> None:
+        """Append an event and wake up everyone streaming this job."""
+        self.events.append(event)
+        updated, self._updated = self._updated, asyncio.Event()
+        updated.set()
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every event of the job, past and future, until it finishes."""
+        sent = 0
+        while True:
+            updated = self._updated
+            while sent < len(self.events):
+                yield self.events[sent]
+                sent += 1
+            if self.done:
+                return
+            await updated.wait()
+
+class AnalysisJobManager:
+    """
+    Runs task analyses in the background so the API can acknowledge them immediately.
+
+    Each job runs TaskAnalysisService.analyze_task as an asyncio task on the API's own
+    event loop; fields are published as soon as their agent finishes, so clients can
+    show user stories or the category long before the slowest agent is done. Jobs live
+    in memory: finished ones are kept for polling until `retention` newer jobs exist.
+    """
+
+    def __init__(self, service, retention: int = 500):
+        self.service = service
+        self.retention = retention
+        self._jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+
+    def submit(self, task_details: Dict[str, Any]) -> AnalysisJob:
+        """Queue a task for analysis and return its job without waiting for the result."""
+        job = AnalysisJob(uuid.uuid4().hex, task_details)
+        self._jobs[job.id] = job
+        self._evict()
+        job.runner = asyncio.create_task(self._run(job))
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        """Look up a job by id; None if it never existed or has been evicted."""
+        return self._jobs.get(job_id)
+
+    async def stop(self) -> None:
+        """Cancel jobs that are still running."""
+        running = [job.runner for job in self._jobs.values() if job.runner and not job.runner.done()]
+        for runner in running:
+            runner.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run(self, job: AnalysisJob) -> None:
+        job.status = "running"
+        job.record({"event": "started", "job_id": job.id})
+
+        def on_step(field: str, value: Any) -> None:
+            job.steps[field] = value
+            job.record({"event": "step", "field": field, "value": value})
+
+        try:
+            result = await self.service.analyze_task(job.task_details, on_step=on_step)
+        except asyncio.CancelledError:
+            job.error = "Analysis was cancelled during shutdown."
+            job.status = "failed"
+            job.record({"event": "failed", "error": job.error})
+            raise
+        except Exception as e:
+            logger.error("Error in background analysis job %s: %s", job.id, e, exc_info=True)
+            result = {"error": f"Analysis failed: {str(e)}"}
+
+        if "error" in result:
+            job.error = result["error"]
+            job.status = "failed"
+            job.record({"event": "failed", "error": job.error})
+        else:
+            job.result = result
+            job.status = "completed"
+            job.record({"event": "completed", "result": result})
+
+    def _evict(self) -> None:
+        """Drop the oldest finished jobs beyond the retention limit; running jobs are kept."""
+        excess = len(self._jobs) - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:max(excess, 0)]:
+            del self._jobs[job_id]
@@ -0,0 +1,93 @@
+"""Keyword-based fast path for task categorization."""
+
+import re
+from collections import Counter
+from typing import Dict, Optional
+
+# One alternation with a named group per signal, so a single pass over the text finds all of them
+_KEYWORDS = re.compile(
+    r"\b(?:"
+    r"(?P<bug>bugs?|crash(?:es|ed|ing)?|errors?|broken|fail(?:s|ed|ing|ure)?|fix(?:es|ed)?|regression)"
+    r"|(?P<docs>docs?|document(?:s|ed|ation)?|readme|docstrings?)"
+    r"|(?P<testing>tests?|testing|coverage|qa)"
+    r"|(?P<research>research|investigate|spike|evaluate)"
+    r"|(?P<chore>refactor|cleanup|clean up|upgrade|bump|dependenc(?:y|ies)|lint)"
+    r"|(?P<high>urgent|critical|outage|production|security|vulnerability|data loss|blocker|all users)"
+    r"|(?P<low>typo|cosmetic|minor|nice to have)"
+    r")\b"
+)
+
+# A description that opens with one of these verbs states its category outright
+_LEADING_VERBS = re.compile(
+    r"^\s*(?:"
+    r"(?P<bug>fix(?:es|ed)?)"
+    r"|(?P<docs>document)"
+    r"|(?P<testing>test)"
+    r"|(?P<research>research|investigate|spike|evaluate)"
+    r"|(?P<chore>refactor|clean up|upgrade|bump|lint)"
+    r")\b"
+)
+
+# Keyword hits needed for a category when the description does not open with its verb;
+# a single word like "error" or "test" is as likely to describe a feature
+_MIN_KEYWORD_HITS = 2
+
+_CATEGORIES = {
+    "bug": "Bug Fix",
+    "docs": "Documentation",
+    "testing": "Testing",
+    "research": "Research",
+    "chore": "Chore",
+}
+
+# Priority used when the text carries no urgency signal either way
+_DEFAULT_PRIORITIES = {
+    "Bug Fix": "Medium",
+    "Documentation": "Low",
+    "Testing": "Medium",
+    "Research": "Medium",
+    "Chore": "Low",
+}
+
+def heuristic_classify(description: str, user_story: str = "", context: str = "") -> Optional[Dict[str, Optional[str]]]:
+    """
+    Classify a task from keywords alone, without calling the LLM.
+
+    Only answers when the keywords point at exactly one category, and either the description
+    opens with that category's verb ("Fix ...", "Document ...") or the category has at least
+    two keyword hits. Feature requests and anything ambiguous return None so the caller falls
+    back to the task analyzer agent.
+
+    Args:
+        description (str): The task description
+        user_story (str, optional): Related user story
+        context (str, optional): Additional context about the task
+
+    Returns:
+        Optional[Dict[str, Optional[str]]]: Result shaped like TaskAnalyzerAgent.analyze_task,
+        or None if the heuristic is not confident
+    """
+    text = f"{description}\n{user_story}\n{context}".lower()
+    hits = Counter(match.lastgroup for match in _KEYWORDS.finditer(text))
+
+    signals = [signal for signal in hits if signal in _CATEGORIES]
+    if len(signals) != 1:
+        return None
+    signal = signals[0]
+    leading = _LEADING_VERBS.match(description.lower())
+    if hits[signal] < _MIN_KEYWORD_HITS and not (leading and leading.lastgroup == signal):
+        return None
+    category = _CATEGORIES[signal]
+
+    if hits["high"]:
+        priority = "High"
+    elif hits["low"]:
+        priority = "Low"
+    else:
+        priority = _DEFAULT_PRIORITIES[category]
+
+    return {
+        "category": category,
+        "priority": priority,
+        "error": None
+    }
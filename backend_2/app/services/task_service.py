@@ -1,8 +1,10 @@
-from typing import Dict, Any, Optional, List, Union # Added Union
+from typing import Dict, Any, Optional, List, Union, AsyncIterator, Callable # Added Union
+import asyncio
 import logging
 import time
 from datetime import datetime
 
+from app.core.config import settings
 from app.core.db import database, tasks, agent_executions
 from app.agents import (
     TaskAnalyzerAgent,
@@ -12,6 +14,10 @@ from app.agents import (
     QualityAgents
 )
 from app.api.v1.schemas import ErrorSchema # Import ErrorSchema
+from app.services.analysis_batcher import TaskAnalysisBatcher
+from app.services.analysis_jobs import AnalysisJobManager
+from app.services.heuristic_classifier import heuristic_classify
+from app.utils import content_hash
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +35,16 @@ class TaskAnalysisService:
         self.operations_agents = OperationsAgents()
         self.quality_agents = QualityAgents()
         
+        # Coalesces concurrent category/priority analyses into single LLM calls
+        self.analysis_batcher = TaskAnalysisBatcher(
+            self.task_analyzer,
+            max_batch=settings.TASK_ANALYSIS_BATCH_SIZE,
+            max_wait_ms=settings.TASK_ANALYSIS_BATCH_WAIT_MS
+        )
+        
+        # Full analyses started through the jobs API run in the background
+        self.analysis_jobs = AnalysisJobManager(self, retention=settings.ANALYSIS_JOB_RETENTION)
+        
         # Track agent availability
         self.ai_enabled = all([
             self.task_analyzer.has_valid_llm(),
@@ -65,9 +81,33 @@ class TaskAnalysisService:
                 )
             )
         except Exception as e:
-            logger.error(f"Error logging agent execution: {e}")
+            logger.error("Error logging agent execution: %s", e)
+
+    async def _find_previous_analysis(self, analysis_hash: str) -> Optional[Dict[str, Any]]:
+        """Reuse category and priority from an earlier task with the same normalized content."""
+        try:
+            query = (
+                tasks.select()
+                .with_only_columns(tasks.c.category, tasks.c.priority)
+                .where(tasks.c.analysis_hash == analysis_hash)
+                .where(tasks.c.category.is_not(None))
+                .where(tasks.c.category != "Error")
+                .limit(1)
+            )
+            row = await database.fetch_one(query)
+        except Exception as e:
+            logger.error("Error looking up previous analysis: %s", e)
+            return None
+        if row is None or row["priority"] in (None, "Error"):
+            return None
+        return {"category": row["category"], "priority": row["priority"], "error": None}
 
-    async def analyze_task(self, task_details: Dict[str, Any]) -> Dict[str, Any]:
+    async def analyze_task(
+        self,
+        task_details: Dict[str, Any],
+        on_step: Optional[Callable[[str, Any], None]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
         """
         Perform comprehensive task analysis using all available agents.
         
@@ -76,6 +116,10 @@ class TaskAnalysisService:
                 - description: Task description
                 - user_story: Optional user story
                 - context: Optional additional context
+            on_step: Called with (field, value) as each analysis field is filled in,
+                so callers can surface partial results before the whole pipeline finishes
+            use_cache: Reuse earlier results (from identical tasks in the DB and from the
+                agents' result caches); False forces every agent to run again
                 
         Returns:
             Dictionary containing analysis results from all agents
@@ -97,6 +141,11 @@ class TaskAnalysisService:
                 "infrastructure_plan": None
             }
 
+            def publish(field: str, value: Any):
+                analysis_result[field] = value
+                if on_step is not None:
+                    on_step(field, value)
+
             # Helper to check for error in agent output
             def is_error_output(output: Union[Dict, ErrorSchema]) -> bool:
                 if isinstance(output, ErrorSchema):
@@ -105,114 +154,161 @@ class TaskAnalysisService:
                     return True
                 return False
 
-            # Step 1: Initial task analysis
-            category_priority_raw = await self.task_analyzer.analyze_task(
-                description=task_details["description"],
-                user_story=task_details.get("user_story", ""),
-                context=task_details.get("context", "")
+            description = task_details["description"]
+            context = task_details.get("context", "")
+            analysis_hash = content_hash(
+                description,
+                task_details.get("user_story"),
+                task_details.get("context")
             )
-            if is_error_output(category_priority_raw):
-                logger.warning(f"Task Analyzer Agent failed: {category_priority_raw.get('error')}")
-                # Store the error message or a generic one if the structure is unexpected
-                analysis_result["category"] = "Error"
-                analysis_result["priority"] = "Error"
-                # Optionally, store the detailed error in a separate field or log it
-            else:
-                analysis_result["category"] = category_priority_raw.get("category")
-                analysis_result["priority"] = category_priority_raw.get("priority")
 
-            # Step 2: User story generation and UX analysis
-            stories_result_raw = await self.product_agents.generate_user_stories(
-                feature_description=task_details["description"],
-                context=task_details.get("context", "")
-            )
-            
-            current_user_stories = None # For dependent agents
-            if is_error_output(stories_result_raw):
-                analysis_result["user_stories"] = stories_result_raw # Assign ErrorSchema dict
-                analysis_result["ux_recommendations"] = ErrorSchema( # UX depends on stories
-                    error="Dependency Error",
-                    message="UX analysis skipped due to failure in user story generation.",
-                    agent_type="ux_designer"
-                ).model_dump(exclude_none=True)
-            else:
-                analysis_result["user_stories"] = stories_result_raw.get("user_stories") # Extract list for Task schema
-                current_user_stories = stories_result_raw.get("user_stories", [])
-                
-                # Proceed with UX analysis only if user stories were successful
+            # The agents form a small dependency graph. Classification depends on nothing;
+            # UX and database design both need the stories; quality, security and operations
+            # all need the task breakdown. Independent branches run concurrently, so the
+            # pipeline takes as long as its longest chain instead of the sum of all calls.
+
+            async def classify():
+                # Step 1: Initial task analysis
+                # Obvious cases are classified from keywords; only the rest go to the LLM
+                category_priority_raw = None
+                if settings.HEURISTIC_CLASSIFIER_ENABLED:
+                    category_priority_raw = heuristic_classify(
+                        description,
+                        task_details.get("user_story", ""),
+                        context
+                    )
+                if category_priority_raw is None and use_cache:
+                    # An identical task analyzed before (in any process, before any restart) answers from the DB
+                    category_priority_raw = await self._find_previous_analysis(analysis_hash)
+                if category_priority_raw is None and not use_cache:
+                    # The batcher serves cached analyses, so a forced re-run goes to the agent directly
+                    category_priority_raw = await self.task_analyzer.analyze_task(
+                        description=description,
+                        user_story=task_details.get("user_story", ""),
+                        context=context,
+                        use_cache=False
+                    )
+                if category_priority_raw is None:
+                    category_priority_raw = await self.analysis_batcher.submit(
+                        description=description,
+                        user_story=task_details.get("user_story", ""),
+                        context=context
+                    )
+                if is_error_output(category_priority_raw):
+                    logger.warning("Task Analyzer Agent failed: %s", category_priority_raw.get('error'))
+                    # Store the error message or a generic one if the structure is unexpected
+                    publish("category", "Error")
+                    publish("priority", "Error")
+                    # Optionally, store the detailed error in a separate field or log it
+                else:
+                    publish("category", category_priority_raw.get("category"))
+                    publish("priority", category_priority_raw.get("priority"))
+
+            async def analyze_ux(user_stories: List[Dict]):
                 ux_result_raw = await self.product_agents.analyze_ux(
-                    feature_description=task_details["description"],
-                    user_stories=current_user_stories, # Pass successful stories
-                    context=task_details.get("context", "")
+                    feature_description=description,
+                    user_stories=user_stories, # Pass successful stories
+                    context=context,
+                    use_cache=use_cache
                 )
                 if is_error_output(ux_result_raw):
-                    analysis_result["ux_recommendations"] = ux_result_raw # Assign ErrorSchema dict
+                    publish("ux_recommendations", ux_result_raw) # Assign ErrorSchema dict
                 else:
-                    analysis_result["ux_recommendations"] = ux_result_raw.get("recommendations") # Extract list for Task schema
+                    publish("ux_recommendations", ux_result_raw.get("recommendations")) # Extract list for Task schema
 
-            # Step 3: Technical analysis
-            db_design_raw = await self.technical_agents.design_database(
-                user_stories=current_user_stories if current_user_stories else [], 
-                context=task_details.get("context", "")
-            )
-            
-            current_db_design = None # For dependent agents
-            if is_error_output(db_design_raw):
-                analysis_result["database_design"] = db_design_raw # Assign ErrorSchema dict
-            else:
-                analysis_result["database_design"] = db_design_raw.get("tables") # Extract list for Task schema
-                current_db_design = db_design_raw # Store full dict for dependent agents
-            
-            tech_tasks_raw = await self.technical_agents.break_down_tasks(
-                feature_description=task_details["description"],
-                user_stories=current_user_stories if current_user_stories else [],
-                database_design=current_db_design if current_db_design else {}, 
-                context=task_details.get("context", "")
-            )
+            async def analyze_technical(user_stories: List[Dict]):
+                # Step 3: Technical analysis
+                db_design_raw = await self.technical_agents.design_database(
+                    user_stories=user_stories,
+                    context=context,
+                    use_cache=use_cache
+                )
+                
+                current_db_design = None # For dependent agents
+                if is_error_output(db_design_raw):
+                    publish("database_design", db_design_raw) # Assign ErrorSchema dict
+                else:
+                    publish("database_design", db_design_raw.get("tables")) # Extract list for Task schema
+                    current_db_design = db_design_raw # Store full dict for dependent agents
+                
+                tech_tasks_raw = await self.technical_agents.break_down_tasks(
+                    feature_description=description,
+                    user_stories=user_stories,
+                    database_design=current_db_design if current_db_design else {},
+                    context=context,
+                    use_cache=use_cache
+                )
 
-            current_tech_tasks_list = None # For dependent agents (e.g., timeline)
-            current_tech_tasks_dict = None # For dependent agents (e.g., quality, ops)
-            if is_error_output(tech_tasks_raw):
-                analysis_result["technical_tasks"] = tech_tasks_raw # Assign ErrorSchema dict
-            else:
-                analysis_result["technical_tasks"] = tech_tasks_raw.get("tasks") # Extract list for Task schema
-                current_tech_tasks_list = tech_tasks_raw.get("tasks", [])
-                current_tech_tasks_dict = tech_tasks_raw # Store full dict for dependent agents
+                current_tech_tasks_list = None # For dependent agents (e.g., timeline)
+                current_tech_tasks_dict = None # For dependent agents (e.g., quality, ops)
+                if is_error_output(tech_tasks_raw):
+                    publish("technical_tasks", tech_tasks_raw) # Assign ErrorSchema dict
+                else:
+                    publish("technical_tasks", tech_tasks_raw.get("tasks")) # Extract list for Task schema
+                    current_tech_tasks_list = tech_tasks_raw.get("tasks", [])
+                    current_tech_tasks_dict = tech_tasks_raw # Store full dict for dependent agents
 
+                # Steps 4 and 5: Quality analysis and operations planning, all concurrently
+                quality_raw, operations_raw = await asyncio.gather(
+                    self.quality_agents.analyze_quality(
+                        feature_description=description,
+                        user_stories=user_stories,
+                        technical_specs=current_tech_tasks_dict if current_tech_tasks_dict else {},
+                        context=context,
+                        use_cache=use_cache
+                    ),
+                    self.operations_agents.run_operations_bundle(
+                        tasks=current_tech_tasks_list if current_tech_tasks_list else [],
+                        feature_description=description,
+                        technical_requirements=current_tech_tasks_dict if current_tech_tasks_dict else {},
+                        context=context,
+                        use_cache=use_cache
+                    )
+                )
+                publish("test_strategy", quality_raw["test_strategy"])
+                publish("security_analysis", quality_raw["security_analysis"])
+                publish("timeline_estimate", operations_raw["timeline_estimate"])
+                publish("infrastructure_plan", operations_raw["infrastructure_plan"])
 
-            # Step 4: Quality analysis
-            test_strategy_raw = await self.quality_agents.design_test_strategy(
-                feature_description=task_details["description"],
-                user_stories=current_user_stories if current_user_stories else [],
-                technical_specs=current_tech_tasks_dict if current_tech_tasks_dict else {},
-                context=task_details.get("context", "")
-            )
-            analysis_result["test_strategy"] = test_strategy_raw
-            
-            security_analysis_raw = await self.quality_agents.analyze_security(
-                feature_description=task_details["description"],
-                technical_specs=current_tech_tasks_dict if current_tech_tasks_dict else {},
-                context=task_details.get("context", "")
-            )
-            analysis_result["security_analysis"] = security_analysis_raw
-            
-            # Step 5: Operations planning
-            timeline_raw = await self.operations_agents.estimate_timeline(
-                tasks=current_tech_tasks_list if current_tech_tasks_list else []
-            )
-            analysis_result["timeline_estimate"] = timeline_raw
-            
-            infrastructure_raw = await self.operations_agents.plan_infrastructure(
-                feature_description=task_details["description"],
-                technical_requirements=current_tech_tasks_dict if current_tech_tasks_dict else {},
-                context=task_details.get("context", "")
-            )
-            analysis_result["infrastructure_plan"] = infrastructure_raw
+            async def analyze_feature():
+                # Step 2: User story generation, then UX and technical analysis side by side
+                # Stories are reported one by one as they stream in, ahead of the final list
+                streamed_stories: List[Dict] = []
+                def on_story(story: Dict):
+                    streamed_stories.append(story)
+                    on_step("user_stories", list(streamed_stories))
+
+                stories_result_raw = await self.product_agents.generate_user_stories(
+                    feature_description=description,
+                    context=context,
+                    use_cache=use_cache,
+                    on_story=on_story if on_step is not None else None
+                )
+                
+                if is_error_output(stories_result_raw):
+                    publish("user_stories", stories_result_raw) # Assign ErrorSchema dict
+                    publish("ux_recommendations", ErrorSchema( # UX depends on stories
+                        error="Dependency Error",
+                        message="UX analysis skipped due to failure in user story generation.",
+                        agent_type="ux_designer"
+                    ).model_dump(exclude_none=True))
+                    await analyze_technical([])
+                else:
+                    publish("user_stories", stories_result_raw.get("user_stories")) # Extract list for Task schema
+                    current_user_stories = stories_result_raw.get("user_stories", [])
+                    # Proceed with UX analysis only if user stories were successful
+                    await asyncio.gather(
+                        analyze_ux(current_user_stories),
+                        analyze_technical(current_user_stories)
+                    )
+
+            await asyncio.gather(classify(), analyze_feature())
             
             # Create task record in database
             # The Pydantic model `Task` in schemas.py now uses Union for these fields,
             # so it can accept ErrorSchema dicts or the actual data.
-            task_id = await database.execute(
+            # RETURNING gives back the new id in the same round trip as the insert.
+            task_id = await database.fetch_val(
                 tasks.insert().values(
                     description=task_details["description"],
                     user_story=task_details.get("user_story"),
@@ -223,6 +319,7 @@ class TaskAnalysisService:
                     # Assign from analysis_result which now holds either data or ErrorSchema dicts
                     category=analysis_result["category"],
                     priority=analysis_result["priority"],
+                    analysis_hash=analysis_hash,
                     user_stories=analysis_result["user_stories"],
                     ux_recommendations=analysis_result["ux_recommendations"],
                     database_design=analysis_result["database_design"],
@@ -231,7 +328,7 @@ class TaskAnalysisService:
                     security_analysis=analysis_result["security_analysis"],
                     timeline_estimate=analysis_result["timeline_estimate"],
                     infrastructure_plan=analysis_result["infrastructure_plan"],
-                )
+                ).returning(tasks.c.id)
             )
             
             # Log agent executions
@@ -247,7 +344,7 @@ class TaskAnalysisService:
             return analysis_result
             
         except Exception as e:
-            logger.error(f"Error during comprehensive task analysis: {e}")
+            logger.error("Error during comprehensive task analysis: %s", e)
             return {
                 "error": f"Analysis failed: {str(e)}"
             }
@@ -258,7 +355,7 @@ class TaskAnalysisService:
             query = tasks.select().where(tasks.c.id == task_id)
             return await database.fetch_one(query)
         except Exception as e:
-            logger.error(f"Error retrieving task {task_id}: {e}")
+            logger.error("Error retrieving task %s: %s", task_id, e)
             return None
 
     async def get_all_tasks(self) -> List[Dict[str, Any]]:
@@ -267,21 +364,63 @@ class TaskAnalysisService:
             query = tasks.select()
             return await database.fetch_all(query)
         except Exception as e:
-            logger.error(f"Error retrieving tasks: {e}")
+            logger.error("Error retrieving tasks: %s", e)
             return []
 
+    async def iterate_tasks(
+        self,
+        status: Optional[str] = None,
+        category: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream one page of tasks matching the given filters, in id order.
+        
+        Filtering and pagination happen in SQL, and rows are yielded as they are read
+        instead of being loaded into a list first.
+        """
+        query = tasks.select()
+        if status:
+            query = query.where(tasks.c.status == status)
+        if category:
+            query = query.where(tasks.c.category == category)
+        if priority:
+            query = query.where(tasks.c.priority == priority)
+        query = query.order_by(tasks.c.id).limit(limit).offset(offset)
+        
+        async for row in database.iterate(query):
+            yield dict(row._mapping)
+
     async def update_task(self, task_id: int, updates: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update a task with new information or analysis results."""
+        if not updates:
+            # Nothing to write (e.g. an empty PATCH body); an UPDATE without values is invalid SQL
+            return await self.get_task(task_id)
+            
+        if updates.keys() & {"description", "user_story", "context"}:
+            # The hash must follow the text, or later tasks with the old text would reuse this analysis
+            current = await self.get_task(task_id)
+            if current is None:
+                return None
+            text = {field: updates.get(field, current[field]) for field in ("description", "user_story", "context")}
+            updates = {
+                **updates,
+                "analysis_hash": content_hash(text["description"], text["user_story"], text["context"])
+            }
+            
         try:
+            # RETURNING hands back the updated row (or nothing if the id is unknown) without a re-select
             query = (
                 tasks.update()
                 .where(tasks.c.id == task_id)
                 .values(**updates)
+                .returning(tasks)
             )
-            await database.execute(query)
-            return await self.get_task(task_id)
+            return await database.fetch_one(query)
         except Exception as e:
-            logger.error(f"Error updating task {task_id}: {e}")
+            logger.error("Error updating task %s: %s", task_id, e)
             return None
 
     async def get_agent_executions(self, task_id: int) -> List[Dict[str, Any]]:
@@ -290,5 +429,5 @@ class TaskAnalysisService:
             query = agent_executions.select().where(agent_executions.c.task_id == task_id)
             return await database.fetch_all(query)
         except Exception as e:
-            logger.error(f"Error retrieving agent executions for task {task_id}: {e}")
+            logger.error("Error retrieving agent executions for task %s: %s", task_id, e)
             return []
@@ -5,6 +5,7 @@ from typing import Any, Dict, Optional
 import json
 import uuid
 import re
+import hashlib
 
 def generate_id(prefix: str = "") -> str:
     """Generate a unique ID with optional prefix."""
@@ -18,6 +19,16 @@ def sanitize_string(text: str) -> str:
     # Normalize whitespace
     return ' '.join(text.split())
 
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation, so equivalent texts compare equal."""
+    return _WHITESPACE.sub(" ", (text or "").strip().lower()).rstrip(".!?;, ")
+
+def content_hash(*parts: Optional[str]) -> str:
+    """SHA-256 hex digest over the normalized parts, usable as a stable lookup key."""
+    return hashlib.sha256("\x1f".join(normalize_text(p) for p in parts).encode()).hexdigest()
+
 def utc_now() -> datetime:
     """Get current UTC datetime."""
     return datetime.now(timezone.utc)
@@ -103,6 +114,8 @@ def format_duration(seconds: float) -> str:
 __all__ = [
     'generate_id',
     'sanitize_string',
+    'normalize_text',
+    'content_hash',
     'utc_now',
     'format_datetime',
     'parse_datetime',
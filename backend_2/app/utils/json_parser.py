@@ -1,17 +1,264 @@
 import json
 import re
 import logging
-from typing import Any, Optional
+import threading
+from typing import Any, List, Optional, Tuple
+
+import orjson
+
+try:
+    import simdjson  # pysimdjson, optional SIMD-accelerated decoder
+except ImportError:
+    simdjson = None
 
 logger = logging.getLogger(__name__)
 
+# Compiled once at import; these run on every LLM response
+_MARKDOWN_JSON_RE = re.compile(r"```(?:json)?\s*([\s\S]*?)\s*```", re.IGNORECASE)
+# The bracket scanner jumps between the only characters that matter to it instead of
+# stepping through the text one character at a time in Python
+_STRUCTURAL_RE = re.compile(r'[{}\[\]"]')
+_STRING_SPECIAL_RE = re.compile(r'["\\]')
+
+# simdjson parsers reuse their internal buffers but are not thread-safe, so keep one per thread
+_parser_local = threading.local()
+
+def _loads(text: str) -> Any:
+    """
+    Decode a JSON document, using simdjson when it is installed and orjson otherwise.
+    
+    Both are stricter than stdlib json (they reject NaN/Infinity, for one), so anything they
+    refuse gets a second chance with json.loads before being reported as invalid; the same
+    text parses the same way whichever decoder is installed.
+    
+    Raises:
+        ValueError: If the text is not valid JSON (json.JSONDecodeError is a subclass).
+    """
+    try:
+        if simdjson is None:
+            return orjson.loads(text)
+        parser = getattr(_parser_local, "parser", None)
+        if parser is None:
+            parser = _parser_local.parser = simdjson.Parser()
+        return parser.parse(text.encode(), True)
+    except ValueError:
+        return json.loads(text)
+
+def dumps_compact(obj: Any) -> str:
+    """
+    Serialize data without whitespace for embedding in prompts.
+    
+    Indentation only costs tokens: the model reads compact JSON just as well. orjson is also
+    several times faster than json.dumps and keeps non-ASCII text as-is rather than escaping it.
+    """
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+class JsonObjectStream:
+    """
+    Incrementally scans streamed text for the first complete top-level JSON value.
+    
+    Tracks bracket depth outside of string literals, so a caller consuming LLM output
+    chunk by chunk can stop as soon as the closing '}' (or ']', for an answer that is an
+    array) arrives instead of waiting for the end of the completion. Anything before the
+    first '{' or '[' is skipped, the same start robust_json_parser's bracket matching uses.
+    """
+    
+    def __init__(self):
+        self._buffer = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.result: Optional[str] = None
+        
+    def feed(self, chunk: str) -> Optional[str]:
+        """
+        Consume the next chunk of text.
+        
+        Returns:
+            Optional[str]: The complete JSON object or array text once it has been seen, otherwise None.
+        """
+        if self.result is not None:
+            return self.result
+            
+        for ch in chunk:
+            if self._depth == 0:
+                if ch not in '{[':
+                    continue # Skip leading prose or markdown fences
+                self._depth = 1
+                self._buffer.append(ch)
+                continue
+                
+            self._buffer.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self.result = "".join(self._buffer)
+                    return self.result
+        return None
+
+class JsonArrayItemStream:
+    """
+    Incrementally picks the items of one array out of a streamed JSON object.
+    
+    Given the key of a top-level array of objects (e.g. "user_stories"), each call to feed
+    returns the items that were completed by that chunk, so a caller can act on the first
+    item while the model is still writing the rest.
+    """
+    
+    def __init__(self, key: str):
+        self._key_re = re.compile(r'"' + re.escape(key) + r'"\s*:\s*$')
+        self._text = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._in_array = False
+        self._item: Optional[List[str]] = None
+        
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume the next chunk of text.
+        
+        Returns:
+            List[Any]: Each array item completed within this chunk, decoded
+        """
+        items = []
+        for ch in chunk:
+            if self._item is not None:
+                self._item.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in '{[':
+                if self._depth == 1 and ch == '[' and self._key_re.search("".join(self._text[-64:])):
+                    self._in_array = True
+                elif self._in_array and self._depth == 2 and ch == '{':
+                    self._item = [ch]
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._in_array and self._depth == 2 and self._item is not None:
+                    try:
+                        items.append(_loads("".join(self._item)))
+                    except ValueError:
+                        pass # Malformed item; the full answer still goes through the normal parser
+                    self._item = None
+                elif self._in_array and self._depth == 1:
+                    self._in_array = False
+            # Only the text just before a '[' at depth 1 is ever inspected, to match the key
+            if self._depth <= 1:
+                self._text.append(ch)
+                if len(self._text) > 256:
+                    del self._text[:-64]
+        return items
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+def _scan_json(text: str) -> Tuple[int, int, List[str], bool]:
+    """
+    Bracket-match the first JSON value in text, skipping anything inside string literals.
+    
+    Returns:
+        Tuple[int, int, List[str], bool]: Start index of the first '{' or '[' (-1 if none),
+        end index just past its matching bracket (-1 if it never closes), the brackets still
+        open at the end of the text (empty if a closer did not match its opener) and whether
+        the text ends inside a string literal
+    """
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    if not starts:
+        return -1, -1, [], False
+    start = min(starts)
+        
+    stack: List[str] = []
+    in_string = False
+    pos = start
+    while True:
+        match = (_STRING_SPECIAL_RE if in_string else _STRUCTURAL_RE).search(text, pos)
+        if match is None:
+            break
+        i = match.start()
+        ch = text[i]
+        pos = i + 1
+        if in_string:
+            if ch == '\\':
+                pos = i + 2 # Skip the escaped character
+            else:
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+        else:
+            if not stack or _CLOSERS[stack[-1]] != ch:
+                return start, -1, [], False # Mismatched bracket; not repairable by closing
+            stack.pop()
+            if not stack:
+                return start, i + 1, [], False
+    # A trailing backslash leaves pos past the end while still inside the string
+    return start, -1, stack, in_string
+
+def _balanced_json_span(text: str) -> Optional[str]:
+    """The first complete, bracket-balanced JSON object or array in text, if any."""
+    start, end, _, _ = _scan_json(text)
+    return text[start:end] if end != -1 else None
+
+def _widest_json_span(text: str) -> Optional[str]:
+    """
+    From the first '{' or '[' to the last matching closer, whether or not the brackets pair up.
+    
+    Plain find/rfind rather than a greedy regex, which backtracks quadratically on output with
+    many openers and no closer.
+    """
+    spans = []
+    for opener, closer in _CLOSERS.items():
+        start = text.find(opener)
+        end = text.rfind(closer)
+        if start != -1 and end > start:
+            spans.append((start, end))
+    if not spans:
+        return None
+    start, end = min(spans)
+    return text[start:end + 1]
+
+def _close_truncated_json(text: str) -> Optional[str]:
+    """
+    Complete a JSON value that was cut off mid-way (e.g. by the output token limit).
+    
+    Closes an open string, drops a dangling comma and appends the missing closing brackets.
+    Returns None if the text has no unclosed JSON value to repair.
+    """
+    start, end, stack, in_string = _scan_json(text)
+    if start == -1 or end != -1 or not stack:
+        return None
+    repaired = text[start:] + ('"' if in_string else '')
+    repaired = repaired.rstrip().rstrip(',')
+    if repaired.endswith(':'):
+        repaired += ' null'
+    return repaired + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
 def extract_json_from_markdown(text: str) -> Optional[str]:
     """
     Extracts JSON string from markdown code blocks.
     Handles ```json ... ``` or just ``` ... ```.
     """
     # Regex to find JSON within ```json ... ``` or ``` ... ```
-    match = re.search(r"```(?:json)?\s*([\s\S]*?)\s*```", text, re.IGNORECASE)
+    match = _MARKDOWN_JSON_RE.search(text)
     if match:
         return match.group(1).strip()
     return None
@@ -28,52 +275,57 @@ def robust_json_parser(json_string: str, context: str = "Unknown") -> Optional[A
         Optional[Any]: Parsed JSON object or None if parsing fails.
     """
     if not isinstance(json_string, str):
-        logger.warning(f"Robust JSON parser received non-string input in context '{context}': {type(json_string)}")
+        logger.warning("Robust JSON parser received non-string input in context '%s': %s", context, type(json_string))
         return None
 
     original_string = json_string # Keep a copy for logging if all attempts fail
 
     # Attempt 1: Direct parsing
     try:
-        return json.loads(json_string)
-    except json.JSONDecodeError:
+        return _loads(json_string)
+    except ValueError:
         pass # Continue to next attempt
 
     # Attempt 2: Extract from markdown code block
     extracted_json = extract_json_from_markdown(json_string)
     if extracted_json:
         try:
-            return json.loads(extracted_json)
-        except json.JSONDecodeError:
+            return _loads(extracted_json)
+        except ValueError:
             # If markdown extraction also fails, log it and try to clean the extracted_json
             json_string = extracted_json # Use the extracted content for further cleaning
             pass 
     
-    # Attempt 3: Try to find JSON object or array within the string
-    # This handles cases where there might be leading/trailing text not in a code block
-    obj_match = re.search(r"\{[\s\S]*\}", json_string)
-    arr_match = re.search(r"\[[\s\S]*\]", json_string)
-
-    json_candidate = None
-    if obj_match and arr_match:
-        # If both object and array are found, pick the one that starts earlier
-        if obj_match.start() < arr_match.start():
-            json_candidate = obj_match.group(0)
-        else:
-            json_candidate = arr_match.group(0)
-    elif obj_match:
-        json_candidate = obj_match.group(0)
-    elif arr_match:
-        json_candidate = arr_match.group(0)
+    # Attempt 3: The first balanced object or array, skipping leading/trailing prose
+    # (bracket matching, so braces in trailing text don't widen the span)
+    json_candidate = _balanced_json_span(json_string)
+    if json_candidate:
+        try:
+            return _loads(json_candidate)
+        except ValueError:
+            pass
+    
+    # Attempt 4: Widest object or array span, for output where the brackets don't pair up
+    json_candidate = _widest_json_span(json_string)
 
     if json_candidate:
         try:
-            return json.loads(json_candidate)
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse extracted JSON candidate in context '{context}'. Error: {e}. Candidate: {json_candidate[:200]}...")
-            # Fall through to final log if this also fails
+            return _loads(json_candidate)
+        except ValueError as e:
+            logger.warning("Failed to parse extracted JSON candidate in context '%s'. Error: %s. Candidate: %.200s...", context, e, json_candidate)
+            # Fall through to the repair attempt
+    
+    # Attempt 5: Output truncated mid-value; close what is still open
+    repaired = _close_truncated_json(json_string)
+    if repaired:
+        try:
+            parsed = _loads(repaired)
+            logger.warning("Parsed truncated JSON in context '%s' after closing its unterminated brackets", context)
+            return parsed
+        except ValueError:
+            pass
     
-    logger.error(f"All attempts to parse JSON failed in context '{context}'. Original input (first 500 chars): {original_string[:500]}")
+    logger.error("All attempts to parse JSON failed in context '%s'. Original input (first 500 chars): %.500s", context, original_string)
     return None
 
 if __name__ == '__main__':
@@ -87,6 +339,8 @@ if __name__ == '__main__':
         ('{"bad": json, }', "Malformed JSON (trailing comma, unquoted value) - expect fail"),
         ('Explanation: \n{"key": "value with explanation"}', "JSON with leading text"),
         ('{"key": "value with trailing text"}\nSome trailing notes.', "JSON with trailing text"),
+        ('{"key": "value"}\nNote: use {braces} carefully.', "JSON with braces in trailing text"),
+        ('{"tasks": [{"id": "BE-1", "title": "Trunc', "Truncated JSON - repaired"),
         ('```json\n{\n  "user_stories": [\n    {\n      "role": "Database Administrator",\n      "goal": "Create a \'users\' table",\n      "benefit": "Ensure efficient user auth"\n    }\n  ]\n}\n```', "Real-world example")
     ]
 
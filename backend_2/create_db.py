@@ -1,22 +1,18 @@
 import asyncio
 import os
-from sqlalchemy import create_engine
-from dotenv import load_dotenv
-from app.core.db import metadata, DATABASE_URL
-
-# Load environment variables
-load_dotenv()
+from app.core.db import metadata, DATABASE_URL, get_sync_engine, migrate_schema
 
 def init_db():
     """Initialize the database with all tables."""
     print(f"Using database URL: {DATABASE_URL}")
     
-    # Create an engine instance
-    engine = create_engine(DATABASE_URL)
+    # Shared synchronous engine (the async driver prefix is stripped)
+    engine = get_sync_engine()
     
     try:
         # Create all tables
         metadata.create_all(bind=engine)
+        migrate_schema(engine)
         print("Successfully created all database tables.")
         
         # List created tables
@@ -31,8 +27,6 @@ def init_db():
 
 def setup_default_configs():
     """Set up default agent configurations in the database."""
-    engine = create_engine(DATABASE_URL)
-    
     default_configs = [
         {
             "agent_type": "task_analyzer",
@@ -0,0 +1,41 @@
+import os
+import tempfile
+from datetime import datetime
+
+# Point the app at a throwaway database before app.core.config reads the settings
+_db_dir = tempfile.mkdtemp(prefix="task-analyzer-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["LLM_CACHE_BACKEND"] = "none"
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def client():
+    """A TestClient for the whole app; startup creates the tables in the test database."""
+    from fastapi.testclient import TestClient
+
+    import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+    from app.main import app as fastapi_app
+
+    with TestClient(fastapi_app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def insert_task(client):
+    """Insert a task row directly and return its id."""
+    from app.core.db import get_sync_engine, tasks
+
+    def insert(**values):
+        row = {
+            "description": "Add a CSV export to the reports page",
+            "status": "Analyzed",
+            "created_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow(),
+            **values
+        }
+        with get_sync_engine().begin() as conn:
+            return conn.execute(tasks.insert().values(**row)).inserted_primary_key[0]
+
+    return insert
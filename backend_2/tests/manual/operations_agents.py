@@ -0,0 +1,57 @@
+"""
+Manual smoke run of the operations agents against the configured LLM.
+
+Needs a real API key. Run from backend_2: python -m tests.manual.operations_agents
+"""
+
+import asyncio
+import json
+
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.agents.base.agents.operations_agents import OperationsAgents
+
+async def test_operations_agents():
+    agents = OperationsAgents()
+
+    if not agents.has_valid_llm():
+        print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
+        return
+
+    # Test data for timeline estimation
+    tasks = [
+        {
+            "id": "BE-1",
+            "title": "Implement user preferences model",
+            "type": "backend",
+            "estimated_hours": 8
+        },
+        {
+            "id": "BE-2",
+            "title": "Create API endpoints",
+            "type": "backend",
+            "estimated_hours": 12
+        }
+    ]
+
+    # Test timeline estimation
+    timeline = await agents.estimate_timeline(tasks)
+    print("\nTimeline Estimation Result:")
+    print(json.dumps(timeline, indent=2))
+
+    # Test infrastructure planning
+    if not timeline.get("error"):
+        tech_requirements = {
+            "backend": "Python/FastAPI",
+            "database": "PostgreSQL",
+            "authentication": "JWT"
+        }
+
+        infra_plan = await agents.plan_infrastructure(
+            feature_description="User preferences system with authentication",
+            technical_requirements=tech_requirements
+        )
+        print("\nInfrastructure Planning Result:")
+        print(json.dumps(infra_plan, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(test_operations_agents())
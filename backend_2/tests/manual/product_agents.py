@@ -0,0 +1,46 @@
+"""
+Manual smoke run of the product agents against the configured LLM.
+
+Needs a real API key. Run from backend_2: python -m tests.manual.product_agents
+"""
+
+import asyncio
+import json
+
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.agents.base.agents.product_agents import ProductAgents
+
+async def test_product_agents():
+    agents = ProductAgents()
+
+    if not agents.has_valid_llm():
+        print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
+        return
+
+    test_feature = {
+        "description": "Add a dark mode feature to the application",
+        "context": "Users have requested the ability to switch between light and dark themes"
+    }
+
+    # Generate user stories
+    stories_result = await agents.generate_user_stories(
+        feature_description=test_feature["description"],
+        context=test_feature["context"]
+    )
+
+    print("\nUser Stories Result:")
+    print(json.dumps(stories_result, indent=2))
+
+    if "user_stories" in stories_result and not stories_result.get("error"):
+        # Analyze UX implications
+        ux_result = await agents.analyze_ux(
+            feature_description=test_feature["description"],
+            user_stories=stories_result["user_stories"],
+            context=test_feature["context"]
+        )
+
+        print("\nUX Analysis Result:")
+        print(json.dumps(ux_result, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(test_product_agents())
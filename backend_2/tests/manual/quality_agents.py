@@ -0,0 +1,56 @@
+"""
+Manual smoke run of the quality agents against the configured LLM.
+
+Needs a real API key. Run from backend_2: python -m tests.manual.quality_agents
+"""
+
+import asyncio
+import json
+
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.agents.base.agents.quality_agents import QualityAgents
+
+async def test_quality_agents():
+    agents = QualityAgents()
+
+    if not agents.has_valid_llm():
+        print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
+        return
+
+    # Test data
+    feature = {
+        "description": "User authentication system with OAuth",
+        "user_stories": [
+            {
+                "role": "user",
+                "goal": "log in with Google account",
+                "benefit": "quick and secure access"
+            }
+        ],
+        "technical_specs": {
+            "auth_provider": "OAuth2",
+            "user_data": ["email", "profile"],
+            "session_management": "JWT"
+        }
+    }
+
+    # Test test strategy design
+    test_strategy = await agents.design_test_strategy(
+        feature_description=feature["description"],
+        user_stories=feature["user_stories"],
+        technical_specs=feature["technical_specs"]
+    )
+    print("\nTest Strategy Result:")
+    print(json.dumps(test_strategy, indent=2))
+
+    # Test security analysis
+    if not test_strategy.get("error"):
+        security_analysis = await agents.analyze_security(
+            feature_description=feature["description"],
+            technical_specs=feature["technical_specs"]
+        )
+        print("\nSecurity Analysis Result:")
+        print(json.dumps(security_analysis, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(test_quality_agents())
@@ -0,0 +1,38 @@
+"""
+Manual smoke run of the task analyzer agent against the configured LLM.
+
+Needs a real API key. Run from backend_2: python -m tests.manual.task_analyzer_agent
+"""
+
+import asyncio
+
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.agents.base.agents.task_analyzer_agent import TaskAnalyzerAgent
+
+async def test_analyzer():
+    analyzer = TaskAnalyzerAgent()
+
+    if not analyzer.has_valid_llm():
+        print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
+        return
+
+    test_task = {
+        "description": "The login button is not responding on the main page after recent deployment",
+        "user_story": "As a user, I want to be able to log in to access my account",
+        "context": "This is affecting all users trying to access the platform"
+    }
+
+    result = await analyzer.analyze_task(
+        description=test_task["description"],
+        user_story=test_task["user_story"],
+        context=test_task["context"]
+    )
+
+    print("\nAnalysis Result:")
+    print(f"Category: {result.get('category')}")
+    print(f"Priority: {result.get('priority')}")
+    if result.get('error'):
+        print(f"Error: {result.get('error')}")
+
+if __name__ == "__main__":
+    asyncio.run(test_analyzer())
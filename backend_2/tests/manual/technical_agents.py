@@ -0,0 +1,61 @@
+"""
+Manual smoke run of the technical agents against the configured LLM.
+
+Needs a real API key. Run from backend_2: python -m tests.manual.technical_agents
+"""
+
+import asyncio
+import json
+
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.agents.base.agents.technical_agents import TechnicalAgents
+
+async def test_technical_agents():
+    agents = TechnicalAgents()
+
+    if not agents.has_valid_llm():
+        print("Error: LLM not configured. Please set GEMINI_API_KEY in environment.")
+        return
+
+    # Test data
+    user_stories = [
+        {
+            "role": "user",
+            "goal": "store my preferences",
+            "benefit": "customize my experience",
+            "acceptance_criteria": [
+                "Save theme preference",
+                "Persist settings across sessions"
+            ]
+        }
+    ]
+
+    # Test database design
+    db_design = await agents.design_database(user_stories)
+    print("\nDatabase Design Result:")
+    print(json.dumps(db_design, indent=2))
+
+    if "tables" in db_design and not db_design.get("error"):
+        # Test task breakdown
+        tasks = await agents.break_down_tasks(
+            feature_description="Implement user preferences storage",
+            user_stories=user_stories,
+            database_design=db_design
+        )
+        print("\nTask Breakdown Result:")
+        print(json.dumps(tasks, indent=2))
+
+        if "tasks" in tasks and not tasks.get("error"):
+            # Test code review
+            code_snippets = [
+                {
+                    "file": "models/user_preferences.py",
+                    "code": "class UserPreferences:\n    def __init__(self, theme='light'):\n        self.theme = theme"
+                }
+            ]
+            review = await agents.review_implementation(tasks["tasks"], code_snippets)
+            print("\nCode Review Result:")
+            print(json.dumps(review, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(test_technical_agents())
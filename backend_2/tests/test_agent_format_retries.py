@@ -0,0 +1,99 @@
+import pytest
+
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.agents import ProductAgents, QualityAgents
+from app.agents.base import agent_base
+from app.core.config import settings
+
+
+class FakeAgent:
+    """Just enough of a crewai Agent for _run_agent_task."""
+    role = "Fake"
+    llm = None
+
+    def model_copy(self, update=None):
+        return self
+
+
+def scripted(agents, monkeypatch, agent_name, answers):
+    """Make the agent answer with each of answers in turn; returns the prompts it was sent."""
+    prompts = []
+    queue = list(answers)
+
+    async def stream_json_object(messages, llm, item_key=None, on_item=None):
+        prompts.append(messages)
+        return queue.pop(0)
+
+    monkeypatch.setattr(settings, "AGENT_STREAMING", True)
+    monkeypatch.setattr(settings, "AGENT_FORMAT_ATTEMPTS", 3)
+    monkeypatch.setattr(agents, "has_valid_llm", lambda: True)
+    monkeypatch.setattr(agents, "_get_llm", lambda response_schema=None, tier="strong": None)
+    monkeypatch.setattr(agents, "_agent_messages", lambda agent, description, expected_output: description)
+    monkeypatch.setattr(agents, "_stream_json_object", stream_json_object)
+    agents.__dict__[agent_name] = FakeAgent()
+    return prompts
+
+
+@pytest.fixture
+def product_agents():
+    return ProductAgents.__new__(ProductAgents)
+
+
+@pytest.fixture
+def quality_agents():
+    return QualityAgents.__new__(QualityAgents)
+
+
+async def test_ux_analysis_is_asked_again_after_invalid_json(product_agents, monkeypatch):
+    """Unparseable UX output is retried with the JSON reminder."""
+    prompts = scripted(product_agents, monkeypatch, "ux_designer",
+                       ["Sorry, here are my thoughts", '{"recommendations": []}'])
+
+    result = await product_agents.analyze_ux("Export invoices", [{"role": "owner"}], use_cache=False)
+
+    assert result == {"recommendations": []}
+    assert prompts[1].endswith(agent_base.FORMAT_REMINDER_JSON)
+
+
+async def test_ux_analysis_is_asked_again_after_wrong_structure(product_agents, monkeypatch):
+    """UX output without a recommendations list is retried with the structure reminder."""
+    prompts = scripted(product_agents, monkeypatch, "ux_designer",
+                       ['{"ideas": []}', '{"recommendations": [{"aspect": "layout"}]}'])
+
+    result = await product_agents.analyze_ux("Export invoices", [{"role": "owner"}], use_cache=False)
+
+    assert result["recommendations"] == [{"aspect": "layout"}]
+    assert prompts[1].endswith(agent_base.FORMAT_REMINDER_STRUCTURE)
+
+
+async def test_ux_analysis_gives_up_after_the_last_attempt(product_agents, monkeypatch):
+    """After AGENT_FORMAT_ATTEMPTS unusable answers the error is returned."""
+    prompts = scripted(product_agents, monkeypatch, "ux_designer", ["nope"] * 3)
+
+    result = await product_agents.analyze_ux("Export invoices", [{"role": "owner"}], use_cache=False)
+
+    assert result["error"] == "JSON Parsing Error"
+    assert len(prompts) == 3
+
+
+async def test_test_strategy_is_asked_again_after_invalid_json(quality_agents, monkeypatch):
+    """Unparseable test strategy output is retried with the JSON reminder."""
+    strategy = '{"test_levels": {"unit": [], "integration": [], "e2e": []}}'
+    prompts = scripted(quality_agents, monkeypatch, "qa_strategist", ["not json", strategy])
+
+    result = await quality_agents.design_test_strategy("Export invoices", [{"role": "owner"}], {"tasks": [{"id": "BE-1"}]}, use_cache=False)
+
+    assert "error" not in result
+    assert "test_levels" in result
+    assert prompts[1].endswith(agent_base.FORMAT_REMINDER_JSON)
+
+
+async def test_null_error_field_is_a_valid_answer(product_agents, monkeypatch):
+    """An explicit "error": null does not count as a failure and is not retried."""
+    prompts = scripted(product_agents, monkeypatch, "product_manager",
+                       ['{"user_stories": [{"role": "owner"}], "error": null}'])
+
+    result = await product_agents.generate_user_stories("Export invoices", use_cache=False)
+
+    assert result == {"user_stories": [{"role": "owner"}], "error": None}
+    assert len(prompts) == 1
@@ -0,0 +1,85 @@
+import asyncio
+
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.services.analysis_batcher import TaskAnalysisBatcher
+
+
+class FakeAnalyzer:
+    """Stands in for TaskAnalyzerAgent and records the batches it is given."""
+
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.batches = []
+
+    async def analyze_task_batch(self, items):
+        self.batches.append(items)
+        await asyncio.sleep(self.delay)
+        return [{"category": "Chore", "priority": "Low", "error": None, "description": item["description"]}
+                for item in items]
+
+    async def analyze_task(self, description, user_story="", context=""):
+        return {"category": "Chore", "priority": "Low", "error": None, "description": description}
+
+
+async def test_concurrent_requests_share_one_batch():
+    """Requests arriving within max_wait_ms are analyzed with a single call."""
+    analyzer = FakeAnalyzer()
+    batcher = TaskAnalysisBatcher(analyzer, max_batch=8, max_wait_ms=50)
+    batcher.start()
+    try:
+        results = await asyncio.gather(*(batcher.submit(f"task {i}") for i in range(3)))
+    finally:
+        await batcher.stop()
+
+    assert len(analyzer.batches) == 1
+    assert [result["description"] for result in results] == ["task 0", "task 1", "task 2"]
+
+
+async def test_batches_are_capped_at_max_batch():
+    """A burst larger than max_batch is split over several calls."""
+    analyzer = FakeAnalyzer()
+    batcher = TaskAnalysisBatcher(analyzer, max_batch=2, max_wait_ms=50)
+    batcher.start()
+    try:
+        await asyncio.gather(*(batcher.submit(f"task {i}") for i in range(5)))
+    finally:
+        await batcher.stop()
+
+    assert sorted(len(batch) for batch in analyzer.batches) == [1, 2, 2]
+
+
+async def test_submit_without_worker_calls_analyzer_directly():
+    """Before start() the batcher passes requests straight through."""
+    analyzer = FakeAnalyzer()
+    result = await TaskAnalysisBatcher(analyzer).submit("task")
+
+    assert result["description"] == "task"
+    assert analyzer.batches == []
+
+
+async def test_stop_fails_requests_the_worker_was_collecting():
+    """Requests taken off the queue but not yet dispatched get an error on shutdown."""
+    batcher = TaskAnalysisBatcher(FakeAnalyzer(), max_wait_ms=10_000)
+    batcher.start()
+    pending = asyncio.create_task(batcher.submit("task"))
+    await asyncio.sleep(0.01)  # Let the worker pick it up and start waiting for more
+
+    await batcher.stop()
+    result = await asyncio.wait_for(pending, 1)
+
+    assert result["category"] is None
+    assert "cancelled during shutdown" in result["error"]
+
+
+async def test_stop_waits_for_dispatched_batches():
+    """Batches already sent to the analyzer finish with their real result."""
+    analyzer = FakeAnalyzer(delay=0.05)
+    batcher = TaskAnalysisBatcher(analyzer, max_wait_ms=1)
+    batcher.start()
+    pending = asyncio.create_task(batcher.submit("task"))
+    await asyncio.sleep(0.02)  # Dispatched, analyzer still working
+
+    await batcher.stop()
+
+    assert pending.done()
+    assert pending.result()["error"] is None
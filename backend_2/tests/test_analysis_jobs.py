@@ -0,0 +1,81 @@
+import asyncio
+
+from app.services.analysis_jobs import AnalysisJobManager
+
+
+class FakeService:
+    """Publishes two steps, then finishes with the given result."""
+
+    def __init__(self, result, delay: float = 0):
+        self.result = result
+        self.delay = delay
+
+    async def analyze_task(self, task_details, on_step=None):
+        on_step("category", "Chore")
+        await asyncio.sleep(self.delay)
+        on_step("priority", "Low")
+        return self.result
+
+
+async def _events(job):
+    return [event async for event in job.stream()]
+
+
+async def test_job_publishes_steps_and_completes():
+    """A job reports every step, then its result."""
+    manager = AnalysisJobManager(FakeService({"category": "Chore", "priority": "Low"}))
+    job = manager.submit({"description": "Tidy up the logging setup"})
+
+    events = await asyncio.wait_for(_events(job), 1)
+
+    assert [event["event"] for event in events] == ["started", "step", "step", "completed"]
+    assert job.snapshot()["status"] == "completed"
+    assert job.snapshot()["steps"] == {"category": "Chore", "priority": "Low"}
+
+
+async def test_late_subscriber_gets_past_events():
+    """Streaming a finished job replays everything it published."""
+    manager = AnalysisJobManager(FakeService({"category": "Chore"}))
+    job = manager.submit({"description": "Tidy up the logging setup"})
+    await job.runner
+
+    events = await asyncio.wait_for(_events(job), 1)
+
+    assert events[0]["event"] == "started"
+    assert events[-1]["event"] == "completed"
+
+
+async def test_error_result_fails_the_job():
+    """An analysis that returns an error marks the job failed."""
+    manager = AnalysisJobManager(FakeService({"error": "Analysis failed: boom"}))
+    job = manager.submit({"description": "Tidy up the logging setup"})
+    await job.runner
+
+    assert job.status == "failed"
+    assert job.error == "Analysis failed: boom"
+
+
+async def test_stop_cancels_running_jobs():
+    """Jobs still running at shutdown are failed."""
+    manager = AnalysisJobManager(FakeService({}, delay=10))
+    job = manager.submit({"description": "Tidy up the logging setup"})
+    await asyncio.sleep(0)
+
+    await manager.stop()
+
+    assert job.status == "failed"
+    assert "cancelled" in job.error
+
+
+async def test_finished_jobs_beyond_retention_are_evicted():
+    """Only the newest finished jobs are kept for polling."""
+    manager = AnalysisJobManager(FakeService({"category": "Chore"}), retention=2)
+    jobs = []
+    for _ in range(3):
+        jobs.append(manager.submit({"description": "Tidy up the logging setup"}))
+        await jobs[-1].runner
+
+    manager.submit({"description": "Tidy up the logging setup"})
+
+    assert manager.get(jobs[0].id) is None
+    assert manager.get(jobs[2].id) is jobs[2]
@@ -0,0 +1,62 @@
+import pytest
+
+from app.services.heuristic_classifier import heuristic_classify
+
+
+@pytest.mark.parametrize("description, category, priority", [
+    ("Fix crash when saving an empty form", "Bug Fix", "Medium"),
+    ("Document the setup steps in the README", "Documentation", "Low"),
+    ("Raise unit test coverage of the parser", "Testing", "Medium"),
+    ("Spike: evaluate message queues", "Research", "Medium"),
+    ("Bump dependencies to the latest versions", "Chore", "Low"),
+])
+def test_single_category_is_classified(description, category, priority):
+    """Text pointing at exactly one category is answered without the LLM."""
+    assert heuristic_classify(description) == {"category": category, "priority": priority, "error": None}
+
+
+def test_urgency_keywords_raise_priority():
+    """Urgency words override the category's default priority."""
+    assert heuristic_classify("Production outage: fix login errors")["priority"] == "High"
+
+
+def test_low_priority_keywords_lower_priority():
+    """Cosmetic work is low priority even for bugs."""
+    assert heuristic_classify("Fix typo in the error banner")["priority"] == "Low"
+
+
+def test_user_story_and_context_count():
+    """Keywords in the user story and context are considered too."""
+    result = heuristic_classify("Checkout page", user_story="", context="The page is broken and crashes after the release")
+    assert result["category"] == "Bug Fix"
+
+
+@pytest.mark.parametrize("description", [
+    "Add a dark mode toggle to the settings page",
+    "Fix the failing tests",
+    "",
+])
+def test_feature_or_ambiguous_text_falls_back(description):
+    """No signal, or signals for several categories, leaves the task to the agent."""
+    assert heuristic_classify(description) is None
+
+
+@pytest.mark.parametrize("description", [
+    "Add error messages to the signup form",
+    "Show build failure notifications in Slack",
+    "Add a test mode toggle to the payments page",
+    "Let users upload docs to their profile",
+])
+def test_single_keyword_in_a_feature_falls_back(description):
+    """One keyword hit without the category's leading verb is not enough to skip the LLM."""
+    assert heuristic_classify(description) is None
+
+
+def test_keywords_match_whole_words_only():
+    """Words that merely contain a keyword do not count."""
+    assert heuristic_classify("Prefix the dashboard titles") is None
+
+
+def test_leading_verb_is_enough_on_its_own():
+    """A description that opens with its category's verb needs no second keyword."""
+    assert heuristic_classify("Document the public API")["category"] == "Documentation"
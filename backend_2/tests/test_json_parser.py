@@ -0,0 +1,115 @@
+import math
+
+import pytest
+
+from app.utils import json_parser
+from app.utils.json_parser import robust_json_parser
+
+
+def test_json_object_stream_finds_object_across_chunks():
+    """The object is returned as soon as its closing brace arrives, prose skipped."""
+    stream = json_parser.JsonObjectStream()
+    assert stream.feed('Sure! ```json\n{"a": {"b": "}"') is None
+    assert stream.feed('}, "c": 1}\n``` more text') == '{"a": {"b": "}"}, "c": 1}'
+    assert stream.feed("ignored") == '{"a": {"b": "}"}, "c": 1}'
+
+
+def test_json_object_stream_handles_escaped_quotes():
+    """An escaped quote does not end the string."""
+    stream = json_parser.JsonObjectStream()
+    assert stream.feed('{"a": "say \\"}\\" now"}') == '{"a": "say \\"}\\" now"}'
+
+
+def test_robust_json_parser_reads_markdown_fence():
+    """JSON wrapped in a ```json fence is extracted."""
+    assert robust_json_parser('Here you go:\n```json\n{"key": "value"}\n```') == {"key": "value"}
+
+
+def test_robust_json_parser_returns_none_without_json():
+    """Plain prose gives None rather than raising."""
+    assert robust_json_parser("This is not JSON.") is None
+
+
+def test_robust_json_parser_ignores_braces_in_trailing_prose():
+    """The balanced span stops at the object's own closing brace."""
+    text = '{"key": "value"}\nNote: use {braces} carefully.'
+    assert robust_json_parser(text) == {"key": "value"}
+
+
+def test_robust_json_parser_repairs_truncated_output():
+    """Output cut off by the token limit is closed and parsed."""
+    parsed = robust_json_parser('{"tasks": [{"id": "BE-1", "title": "Trunc')
+    assert parsed == {"tasks": [{"id": "BE-1", "title": "Trunc"}]}
+
+
+def test_scan_json_reports_unclosed_brackets():
+    """Truncated text reports the brackets still open and whether a string is open."""
+    start, end, stack, in_string = json_parser._scan_json('{"a": [{"b": "unterminated')
+    assert (start, end) == (0, -1)
+    assert stack == ["{", "[", "{"]
+    assert in_string is True
+
+
+def test_close_truncated_json_drops_dangling_comma_and_key():
+    """A trailing comma is removed and a key without a value gets null."""
+    assert json_parser._close_truncated_json('{"a": 1,') == '{"a": 1}'
+    assert json_parser._close_truncated_json('{"a": 1, "b":') == '{"a": 1, "b": null}'
+
+
+def test_dumps_compact_has_no_whitespace():
+    """Prompt payloads are serialized without indentation."""
+    assert json_parser.dumps_compact({"a": [1, 2], "b": "é"}) == '{"a":[1,2],"b":"é"}'
+
+
+def test_scan_json_skips_brackets_inside_strings():
+    """Brackets and escaped quotes inside string literals do not count towards the nesting."""
+    text = 'Answer: {"note": "a } and a \\" ]", "items": [1, 2]} trailing'
+    start, end, stack, in_string = json_parser._scan_json(text)
+    assert text[start:end] == '{"note": "a } and a \\" ]", "items": [1, 2]}'
+    assert (stack, in_string) == ([], False)
+
+
+def test_json_array_item_stream_yields_items_as_they_complete():
+    """Each item of the named array is returned by the chunk that completes it."""
+    stream = json_parser.JsonArrayItemStream("user_stories")
+    assert stream.feed('{"other": [{"x": 1}], "user_stories": [{"role": "a"}, {"ro') == [{"role": "a"}]
+    assert stream.feed('le": "b"}]}') == [{"role": "b"}]
+
+
+@pytest.mark.parametrize("use_simdjson", [True, False])
+def test_loads_accepts_nan_with_either_decoder(monkeypatch, use_simdjson):
+    """NaN/Infinity parse the same whether or not simdjson is installed."""
+    if not use_simdjson:
+        monkeypatch.setattr(json_parser, "simdjson", None)
+    elif json_parser.simdjson is None:
+        pytest.skip("simdjson is not installed")
+
+    parsed = json_parser._loads('{"score": NaN, "limit": Infinity}')
+    assert math.isnan(parsed["score"])
+    assert parsed["limit"] == math.inf
+
+
+@pytest.mark.parametrize("use_simdjson", [True, False])
+def test_loads_rejects_invalid_json_with_either_decoder(monkeypatch, use_simdjson):
+    """Invalid text raises ValueError from both decoders."""
+    if not use_simdjson:
+        monkeypatch.setattr(json_parser, "simdjson", None)
+    elif json_parser.simdjson is None:
+        pytest.skip("simdjson is not installed")
+
+    with pytest.raises(ValueError):
+        json_parser._loads('{"bad": json, }')
+
+
+def test_scan_json_flags_mismatched_brackets():
+    """A closer that does not match its opener cannot be repaired by closing."""
+    start, end, stack, _ = json_parser._scan_json('{"a": ]')
+    assert end == -1
+    assert json_parser._close_truncated_json('{"a": ]') is None
+
+
+def test_json_object_stream_returns_whole_top_level_array():
+    """An answer that is an array is returned whole, not cut off after its first element."""
+    stream = json_parser.JsonObjectStream()
+    assert stream.feed('```json\n[{"id": "#1", "tags": ["a"]}, ') is None
+    assert stream.feed('{"id": "#2"}]\n```') == '[{"id": "#1", "tags": ["a"]}, {"id": "#2"}]'
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.agents.base import agent_base
+from app.agents.base.agent_base import AgentBase
+from app.core.config import settings
+
+
+class SlowStreamingLLM:
+    """Streams an answer in chunks, pausing before each one."""
+
+    def __init__(self, chunks, pause):
+        self.chunks = chunks
+        self.pause = pause
+
+    def _get_llm_string(self):
+        return "slow-llm"
+
+    async def astream(self, messages):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.pause)
+            yield AIMessage(content=chunk)
+
+
+class SlowCrew:
+    """Blocks its kickoff thread for a while, recording how many kickoffs overlap."""
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.started = 0
+        self.running = 0
+        self.most_running = 0
+        self.lock = threading.Lock()
+
+    def kickoff(self):
+        with self.lock:
+            self.started += 1
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(self.duration)
+        with self.lock:
+            self.running -= 1
+        return "done"
+
+
+@pytest.fixture
+def short_timeouts(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_TIMEOUT_SECONDS", 0.1)
+    monkeypatch.setattr(settings, "LLM_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(agent_base.random, "uniform", lambda low, high: 0)
+    monkeypatch.setattr(agent_base, "get_llm_cache", lambda: None)
+
+
+async def test_stream_timeout_applies_between_chunks(short_timeouts):
+    """A stream that keeps producing chunks may take longer than LLM_TIMEOUT_SECONDS in total."""
+    llm = SlowStreamingLLM(['{"a": ', '1, ', '"b": ', '2}'], pause=0.05)
+    messages = [HumanMessage(content="Estimate this")]
+
+    assert await AgentBase.__new__(AgentBase)._stream_json_object(messages, llm) == '{"a": 1, "b": 2}'
+
+
+async def test_stalled_stream_times_out(short_timeouts):
+    """A stream that stops producing chunks is abandoned."""
+    llm = SlowStreamingLLM(['{"a": 1}'], pause=1)
+    messages = [HumanMessage(content="Estimate this")]
+
+    with pytest.raises(asyncio.TimeoutError):
+        await AgentBase.__new__(AgentBase)._stream_json_object(messages, llm)
+
+
+async def test_timed_out_kickoff_keeps_its_semaphore_slot(short_timeouts, monkeypatch):
+    """A retry does not start another kickoff while the timed-out one is still running."""
+    semaphore = asyncio.Semaphore(1)
+    monkeypatch.setattr(agent_base, "_llm_semaphore", semaphore)
+    crew = SlowCrew(duration=0.4)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await AgentBase.__new__(AgentBase)._kickoff(crew)
+    assert semaphore.locked()
+
+    await asyncio.sleep(0.5)
+    assert (crew.started, crew.most_running) == (1, 1)
+    assert not semaphore.locked()
@@ -0,0 +1,36 @@
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.agents import OperationsAgents
+from app.agents.base.agents import operations_agents
+
+
+class FakeAgent:
+    """Just enough of a crewai Agent to build a timeline run."""
+
+    def model_copy(self, update=None):
+        return self
+
+
+async def test_failed_timeline_batch_falls_back_with_the_callers_velocity(monkeypatch):
+    """Per-item retries get team_velocity=None, so small task lists still try the fast tier."""
+    agents = OperationsAgents.__new__(OperationsAgents)
+    routed = []
+
+    async def kickoff(crew):
+        raise ConnectionError("provider unavailable")
+
+    async def run_agent_task_routed(simple, **kwargs):
+        routed.append(simple)
+        return {"total_duration_days": 3}
+
+    monkeypatch.setattr(operations_agents, "Task", lambda **kwargs: kwargs)
+    monkeypatch.setattr(operations_agents, "Crew", lambda **kwargs: kwargs)
+    monkeypatch.setattr(agents, "has_valid_llm", lambda: True)
+    monkeypatch.setattr(agents, "get_structured_llm", lambda response_schema: None)
+    monkeypatch.setattr(agents, "_kickoff", kickoff)
+    monkeypatch.setattr(agents, "_run_agent_task_routed", run_agent_task_routed)
+    agents.__dict__["project_manager"] = FakeAgent()
+
+    results = await agents.estimate_timeline_batch([[{"id": "FALLBACK-1"}], [{"id": "FALLBACK-2"}]])
+
+    assert results == [{"total_duration_days": 3}] * 2
+    assert routed == [True, True]
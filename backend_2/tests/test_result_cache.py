@@ -0,0 +1,195 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration
+
+import app.api  # Load the API package first; importing the agents on their own hits an import cycle
+from app.agents.base import agent_base
+from app.agents.base.agent_base import AgentBase
+from app.agents.base.agents.technical_agents import TechnicalAgents, story_digest
+from app.agents.base.result_cache import AgentResultCache, result_cache
+from app.agents.base.semantic_cache import SemanticIndex, semantic_index
+from app.core.config import settings
+
+
+def test_make_key_ignores_input_order():
+    """Inputs with the same content hash alike whatever order their keys are in."""
+    assert AgentResultCache.make_key("op", {"a": 1, "b": [1, 2]}) == AgentResultCache.make_key("op", {"b": [1, 2], "a": 1})
+
+
+def test_make_key_separates_operations_and_inputs():
+    """Different operations or different inputs never share a key."""
+    key = AgentResultCache.make_key("design_database", {"context": "x"})
+    assert key != AgentResultCache.make_key("break_down_tasks", {"context": "x"})
+    assert key != AgentResultCache.make_key("design_database", {"context": "y"})
+
+
+def test_get_returns_independent_copies():
+    """Mutating a cached value does not change what the next caller gets."""
+    cache = AgentResultCache(maxsize=4, ttl=60)
+    cache.set("k", {"tables": []})
+    cache.get("k")["tables"].append("mutated")
+    assert cache.get("k") == {"tables": []}
+
+
+def test_expired_entries_are_misses():
+    """Entries past their TTL are dropped."""
+    cache = AgentResultCache(maxsize=4, ttl=0)
+    cache.set("k", {"a": 1})
+    assert cache.get("k") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Beyond maxsize the entry used longest ago goes first."""
+    cache = AgentResultCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def _agent() -> AgentBase:
+    # _cached_result needs no LLM; skip __init__ so no client is created
+    return AgentBase.__new__(AgentBase)
+
+
+async def test_cached_result_computes_once_and_skips_errors():
+    """Successes are served from the cache; error results are recomputed."""
+    calls = []
+
+    async def compute(result):
+        calls.append(result)
+        return dict(result)
+
+    agent = _agent()
+    inputs = {"test": "cached_result"}
+    assert await agent._cached_result("test_op", inputs, lambda: compute({"ok": 1})) == {"ok": 1}
+    assert await agent._cached_result("test_op", inputs, lambda: compute({"ok": 2})) == {"ok": 1}
+    assert len(calls) == 1
+
+    error_inputs = {"test": "error_result"}
+    await agent._cached_result("test_op", error_inputs, lambda: compute({"error": "boom"}))
+    await agent._cached_result("test_op", error_inputs, lambda: compute({"error": "boom"}))
+    assert len(calls) == 3
+    assert result_cache.get(result_cache.make_key("test_op", error_inputs)) is None
+
+
+async def test_cached_result_bypass_always_computes():
+    """use_cache=False computes even when a result is cached."""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return {"fresh": len(calls)}
+
+    agent = _agent()
+    await agent._cached_result("test_bypass", {}, compute)
+    assert await agent._cached_result("test_bypass", {}, compute, use_cache=False) == {"fresh": 2}
+
+
+async def test_cached_result_coalesces_concurrent_calls():
+    """Identical calls running at the same time share one computation."""
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"shared": True}
+
+    agent = _agent()
+    results = await asyncio.gather(*(
+        agent._cached_result("test_single_flight", {"n": 1}, compute) for _ in range(3)
+    ))
+
+    assert results == [{"shared": True}] * 3
+    assert len(calls) == 1
+
+
+async def test_design_database_runs_once_for_identical_inputs(monkeypatch):
+    """Concurrent and repeated designs for the same stories share one DB architect run."""
+    calls = []
+
+    async def design(*args):
+        calls.append(args)
+        await asyncio.sleep(0.01)
+        return {"tables": []}
+
+    agents = TechnicalAgents.__new__(TechnicalAgents)
+    monkeypatch.setattr(agents, "_design_database", design)
+    stories = [{"role": "shop owner", "goal": "track orders"}]
+
+    results = await asyncio.gather(*(agents.design_database(stories, "test_design_database") for _ in range(2)))
+    results.append(await agents.design_database(stories, "test_design_database"))
+
+    assert results == [{"tables": []}] * 3
+    assert len(calls) == 1
+
+
+def test_story_digest_keeps_roles_and_goals_only():
+    """Database designs are looked up semantically by a short digest, not the full stories."""
+    stories = [
+        {"role": "shop owner", "goal": "track orders", "benefit": "ship on time", "acceptance_criteria": ["a"] * 50},
+        {"role": "customer", "goal": "see delivery status"},
+    ]
+    assert story_digest(stories) == "shop owner: track orders\ncustomer: see delivery status"
+
+
+async def test_semantic_lookup_skips_text_too_long_to_embed(monkeypatch):
+    """Long similarity texts only get exact hits instead of truncated embeddings."""
+    embedded = []
+    monkeypatch.setattr(settings, "AGENT_SEMANTIC_CACHE", True)
+    monkeypatch.setattr(SemanticIndex, "available", property(lambda self: True))
+    monkeypatch.setattr(semantic_index, "embed", lambda text: embedded.append(text))
+
+    async def compute():
+        return {"error": "no model"}
+
+    agent = _agent()
+    await agent._cached_result("test_semantic_length", {}, compute,
+                               similarity_text="x" * (semantic_index.max_chars + 1))
+
+    assert embedded == []
+
+
+class FakeLLMCache:
+    """In-memory stand-in for LangChain's LLM cache."""
+
+    def __init__(self, cached_text):
+        self.cached_text = cached_text
+        self.updates = []
+
+    async def alookup(self, prompt, llm_string):
+        return [ChatGeneration(message=AIMessage(content=self.cached_text))]
+
+    async def aupdate(self, prompt, llm_string, generations):
+        self.updates.append(generations[0].text)
+
+
+class FakeStreamingLLM:
+    """Streams a fixed answer in two chunks."""
+
+    def _get_llm_string(self):
+        return "fake-llm"
+
+    async def astream(self, messages):
+        for chunk in ('{"fresh": ', 'true}'):
+            yield AIMessage(content=chunk)
+
+
+async def test_llm_cache_is_used_unless_the_call_bypasses_caches(monkeypatch):
+    """Streamed runs answer from the LLM cache, except inside a use_cache=False call."""
+    llm_cache = FakeLLMCache('{"fresh": false}')
+    monkeypatch.setattr(agent_base, "get_llm_cache", lambda: llm_cache)
+    agent = _agent()
+    messages = [HumanMessage(content="Classify this task")]
+
+    async def stream():
+        return {"text": await agent._stream_json_object(messages, FakeStreamingLLM())}
+
+    cached = await agent._cached_result("test_llm_cache", {"n": 1}, stream, use_cache=True)
+    fresh = await agent._cached_result("test_llm_cache", {"n": 2}, stream, use_cache=False)
+
+    assert cached == {"text": '{"fresh": false}'}
+    assert fresh == {"text": '{"fresh": true}'}
+    assert llm_cache.updates == ['{"fresh": true}']
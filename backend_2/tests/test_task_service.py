@@ -0,0 +1,111 @@
+import pytest
+
+from app.core.db import get_sync_engine, tasks
+from app.utils import content_hash
+
+# No classifier keywords, so category and priority come from the DB or the analyzer
+DESCRIPTION = "Let account owners export their invoices as a spreadsheet"
+
+_RESULTS = {
+    "analyze_task": {"category": "Feature Request", "priority": "Medium", "error": None},
+    "generate_user_stories": {"user_stories": [{"role": "owner", "goal": "export", "benefit": "bookkeeping"}]},
+    "analyze_ux": {"recommendations": []},
+    "design_database": {"tables": []},
+    "break_down_tasks": {"tasks": []},
+    "analyze_quality": {"test_strategy": {}, "security_analysis": {}},
+    "run_operations_bundle": {"timeline_estimate": {}, "infrastructure_plan": {}},
+}
+
+
+class RecordingAgents:
+    """Stands in for every agent group and records which operations ran and with which use_cache."""
+
+    def __init__(self):
+        self.calls = []
+
+    def has_valid_llm(self):
+        return True
+
+    def __getattr__(self, name):
+        async def run(*args, use_cache=True, **kwargs):
+            self.calls.append((name, use_cache))
+            return dict(_RESULTS[name])
+        return run
+
+
+@pytest.fixture
+def service(client, monkeypatch):
+    """The app's TaskAnalysisService with its agents replaced by one RecordingAgents."""
+    service = client.app.state.task_service
+    agents = RecordingAgents()
+    for attribute in ("task_analyzer", "product_agents", "technical_agents", "quality_agents", "operations_agents"):
+        monkeypatch.setattr(service, attribute, agents)
+    monkeypatch.setattr(service.analysis_batcher, "analyzer", agents)
+    monkeypatch.setattr(service, "ai_enabled", True)
+    monkeypatch.setattr(service, "agents", agents, raising=False)
+    return service
+
+
+def stored_hash(task_id):
+    with get_sync_engine().connect() as conn:
+        return conn.execute(tasks.select().where(tasks.c.id == task_id)).one()._mapping["analysis_hash"]
+
+
+def test_identical_task_reuses_stored_category(client, service, insert_task):
+    """A task with the same normalized text takes category and priority from the DB."""
+    insert_task(description=DESCRIPTION, category="Chore", priority="Low",
+                analysis_hash=content_hash(DESCRIPTION, None, None))
+
+    result = client.portal.call(service.analyze_task, {"description": "  " + DESCRIPTION.upper()})
+
+    assert (result["category"], result["priority"]) == ("Chore", "Low")
+    assert "analyze_task" not in [name for name, _ in service.agents.calls]
+
+
+def test_analyze_without_cache_runs_every_agent_fresh(client, service, insert_task):
+    """use_cache=False skips the stored analysis and bypasses every agent cache."""
+    insert_task(description=DESCRIPTION, category="Chore", priority="Low",
+                analysis_hash=content_hash(DESCRIPTION, None, None))
+
+    result = client.portal.call(service.analyze_task, {"description": DESCRIPTION}, None, False)
+
+    assert (result["category"], result["priority"]) == ("Feature Request", "Medium")
+    assert {name for name, _ in service.agents.calls} == set(_RESULTS)
+    assert all(use_cache is False for _, use_cache in service.agents.calls)
+
+
+def test_patching_text_recomputes_analysis_hash(client, insert_task):
+    """Editing the text moves the task to the hash of its new content."""
+    task_id = insert_task(description=DESCRIPTION, context="billing",
+                          analysis_hash=content_hash(DESCRIPTION, None, "billing"))
+
+    client.patch(f"/api/v1/tasks/{task_id}", json={"description": "Send invoices by email"})
+
+    assert stored_hash(task_id) == content_hash("Send invoices by email", None, "billing")
+
+
+def test_patching_other_fields_keeps_analysis_hash(client, insert_task):
+    """Status and classification changes leave the hash alone."""
+    task_id = insert_task(description=DESCRIPTION, analysis_hash="unchanged")
+
+    client.patch(f"/api/v1/tasks/{task_id}", json={"status": "Done"})
+
+    assert stored_hash(task_id) == "unchanged"
+
+
+def test_reanalyze_bypasses_caches(client, insert_task, monkeypatch):
+    """The reanalyze endpoint asks for a fresh analysis."""
+    service = client.app.state.task_service
+    calls = []
+
+    async def analyze_task(task_details, on_step=None, use_cache=True):
+        calls.append((task_details["description"], use_cache))
+        return {"category": "Feature Request", "priority": "Medium"}
+
+    monkeypatch.setattr(service, "analyze_task", analyze_task)
+    task_id = insert_task(description=DESCRIPTION)
+
+    response = client.post(f"/api/v1/tasks/{task_id}/reanalyze")
+
+    assert response.status_code == 200
+    assert calls == [(DESCRIPTION, False)]
@@ -0,0 +1,78 @@
+def test_list_tasks_streams_stored_rows(client, insert_task):
+    """The list endpoint returns stored tasks as a complete JSON array."""
+    task_id = insert_task(category="Feature Request", priority="High",
+                          user_stories=[{"role": "user", "goal": "export", "benefit": "reporting"}])
+
+    response = client.get("/api/v1/tasks/", params={"category": "Feature Request", "limit": 100})
+
+    assert response.status_code == 200
+    listed = {task["id"]: task for task in response.json()}
+    assert listed[task_id]["priority"] == "High"
+    assert listed[task_id]["user_stories"][0]["goal"] == "export"
+
+
+def test_list_tasks_without_matches_is_empty(client):
+    """A filter that matches nothing gives an empty array."""
+    response = client.get("/api/v1/tasks/", params={"category": "No Such Category"})
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+def test_list_tasks_database_error_is_a_500(client, monkeypatch):
+    """A failing query is reported as a 500 instead of a truncated 200."""
+    async def broken_iterate_tasks(*args, **kwargs):
+        raise RuntimeError("database is locked")
+        yield
+
+    monkeypatch.setattr(client.app.state.task_service, "iterate_tasks", broken_iterate_tasks)
+
+    response = client.get("/api/v1/tasks/")
+
+    assert response.status_code == 500
+    assert "database is locked" in response.json()["detail"]
+
+
+def test_get_task_returns_only_schema_fields(client, insert_task):
+    """Internal columns such as analysis_hash are not part of the response."""
+    task_id = insert_task(analysis_hash="abc123", code_review={"feedback": []})
+
+    response = client.get(f"/api/v1/tasks/{task_id}")
+
+    assert response.status_code == 200
+    assert set(response.json()) == set(client.app.openapi()["components"]["schemas"]["Task"]["properties"])
+    assert "analysis_hash" not in response.json()
+
+
+def test_get_unknown_task_is_a_404(client):
+    """Asking for a task that does not exist gives a 404."""
+    assert client.get("/api/v1/tasks/999999").status_code == 404
+
+
+def test_list_tasks_returns_only_schema_fields(client, insert_task):
+    """Streamed rows are projected onto the Task schema as well."""
+    task_id = insert_task(category="Projection Check", analysis_hash="abc123")
+
+    response = client.get("/api/v1/tasks/", params={"category": "Projection Check"})
+
+    assert [task["id"] for task in response.json()] == [task_id]
+    assert "analysis_hash" not in response.json()[0]
+    assert "code_review" not in response.json()[0]
+
+
+def test_patch_task_updates_and_returns_schema_fields(client, insert_task):
+    """PATCH writes the given fields and answers with the Task schema."""
+    task_id = insert_task(status="Open", analysis_hash="abc123")
+
+    response = client.patch(f"/api/v1/tasks/{task_id}", json={"status": "Done", "priority": "Low"})
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "Done"
+    assert response.json()["priority"] == "Low"
+    assert "analysis_hash" not in response.json()
+    assert client.get(f"/api/v1/tasks/{task_id}").json()["status"] == "Done"
+
+
+def test_patch_unknown_task_is_a_404(client):
+    """Updating a task that does not exist gives a 404."""
+    assert client.patch("/api/v1/tasks/999999", json={"status": "Done"}).status_code == 404